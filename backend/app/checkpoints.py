@@ -0,0 +1,64 @@
+import logging
+from typing import Optional
+
+from app.database import delete_checkpoints, get_checkpoints, put_checkpoint
+
+logger = logging.getLogger(__name__)
+
+# Checkpoint holding the path of a video's downloaded audio.
+AUDIO = "audio"
+
+
+class Checkpoints:
+    """Stage results saved for one video, so a retry resumes where the last attempt failed.
+
+    Names are namespaced by stage: "audio" (the downloaded file's path),
+    "whisper:<range>" (one chunk's segments) and "llm:<request hash>"
+    (one summary call's response). The transcript itself is the stored
+    transcript_segments column, and metadata is the title/duration columns.
+    """
+
+    def __init__(self, video_id: int, saved: Optional[dict[str, str]] = None):
+        self.video_id = video_id
+        self._saved = dict(saved or {})
+
+    def get(self, name: str) -> Optional[str]:
+        return self._saved.get(name)
+
+    def count(self, prefix: str) -> int:
+        return sum(name.startswith(prefix) for name in self._saved)
+
+    async def save(self, name: str, data: str):
+        # A lost checkpoint only costs redoing the step on a retry.
+        try:
+            await put_checkpoint(self.video_id, name, data)
+            self._saved[name] = data
+        except Exception as e:
+            logger.warning(f"Could not save checkpoint {name} for video {self.video_id}: {e}")
+
+
+async def load_checkpoints(video_id: int) -> Checkpoints:
+    saved = await get_checkpoints(video_id)
+    if saved:
+        logger.info(f"Video {video_id}: resuming with {len(saved)} checkpoint(s)")
+    return Checkpoints(video_id, saved)
+
+
+async def discard_checkpoints(video_id: int):
+    """Drop a video's checkpoints and the audio file they kept, once no retry will need them.
+
+    Errors are logged rather than raised: leftovers only cost disk space,
+    and the video's own outcome is already recorded.
+    """
+    # Imported here: the transcriber imports this module.
+    from app.transcriber import discard_audio
+
+    try:
+        saved = await get_checkpoints(video_id)
+        audio_path = saved.get(AUDIO)
+        if audio_path:
+            discard_audio(audio_path)
+        if saved:
+            await delete_checkpoints(video_id)
+    except Exception as e:
+        logger.warning(f"Could not discard checkpoints of video {video_id}: {e}")
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    """A process pool whose workers don't inherit this process's threads.
+
+    The app runs aiosqlite and executor threads, and forking a multithreaded
+    process can leave a child holding a lock no thread will ever release.
+    forkserver (spawn where unavailable) starts workers from a clean process.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context(method))
+
+
+def start_cpu_pool(workers: Optional[int] = None):
+    """Start the process pool used for CPU-bound pipeline steps."""
+    global _pool
+    if workers is None:
+        workers = int(os.getenv("CPU_POOL_WORKERS", "0")) or os.cpu_count() or 1
+    _pool = create_process_pool(workers)
+    logger.info(f"CPU pool started with {workers} process(es)")
+
+
+def shutdown_cpu_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        logger.info("CPU pool stopped")
+
+
+async def run_cpu_bound(func: Callable[..., T], *args) -> T:
+    """Run func(*args) in the CPU pool so it can't hold the event loop's GIL.
+
+    `func` and its arguments must be picklable (module-level functions and
+    plain data). Falls back to a thread when no pool is running, e.g. in
+    tests and scripts that don't go through the app lifespan.
+    """
+    if _pool is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(_pool, func, *args)
@@ -1,10 +1,18 @@
+import asyncio
 import json
+import logging
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import aiosqlite
 
+from app import events
+from app.transcript_codec import decode_segments, encode_segments, transcript_text
+
+logger = logging.getLogger(__name__)
+
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/yt_transcribe.db")
 
 
@@ -17,6 +25,102 @@ async def get_db() -> aiosqlite.Connection:
     return db
 
 
+class ConnectionPool:
+    """Long-lived connections: one writer (serialized by a lock) and several readers.
+
+    SQLite in WAL mode allows concurrent readers alongside a single writer, so
+    reads never wait on each other and writes never contend for the write lock.
+    """
+
+    def __init__(self, readers: int = 4):
+        self._reader_count = max(1, readers)
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+
+    async def open(self):
+        self._writer = await get_db()
+        for _ in range(self._reader_count):
+            db = await get_db()
+            await db.execute("PRAGMA query_only=ON")
+            self._all_readers.append(db)
+            self._readers.put_nowait(db)
+
+    async def close(self):
+        for db in self._all_readers:
+            await db.close()
+        self._all_readers.clear()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+async def open_pool(readers: Optional[int] = None):
+    """Open the process-wide connection pool. Called from the app lifespan."""
+    global _pool
+    if readers is None:
+        readers = int(os.getenv("DB_READER_CONNECTIONS", "4"))
+    pool = ConnectionPool(readers)
+    await pool.open()
+    _pool = pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
+
+
+@asynccontextmanager
+async def _read_db() -> AsyncIterator[aiosqlite.Connection]:
+    """A reader from the pool, or a short-lived connection when no pool is open."""
+    if _pool is not None:
+        async with _pool.reader() as db:
+            yield db
+        return
+    db = await get_db()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+@asynccontextmanager
+async def _write_db() -> AsyncIterator[aiosqlite.Connection]:
+    """The pooled writer, or a short-lived connection when no pool is open."""
+    if _pool is not None:
+        async with _pool.writer() as db:
+            yield db
+        return
+    db = await get_db()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 async def init_db():
     db = await get_db()
     try:
@@ -29,28 +133,117 @@ async def init_db():
                 duration INTEGER,
                 status TEXT NOT NULL DEFAULT 'queued',
                 transcript_source TEXT,
-                transcript_segments TEXT,
+                transcript_segments BLOB,
                 transcript_text TEXT,
                 summary_json TEXT,
                 error_message TEXT,
                 attempt_count INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT,
                 created_at TEXT NOT NULL,
                 completed_at TEXT
             )
         """)
+        await _add_missing_columns(db)
+        await _migrate_transcripts(db)
+        await _requeue_interrupted(db)
         await db.execute("""
             CREATE UNIQUE INDEX IF NOT EXISTS idx_videos_video_id
             ON videos(video_id)
         """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_videos_created_at
+            ON videos(created_at)
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_videos_status_created_at
+            ON videos(status, created_at)
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                last_used_at TEXT NOT NULL
+            )
+        """)
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used_at
+            ON llm_cache(last_used_at)
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS video_checkpoints (
+                video_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (video_id, name)
+            )
+        """)
         await db.commit()
     finally:
         await db.close()
 
 
+# Columns added after the initial schema; older databases get them via ALTER TABLE.
+_MIGRATED_COLUMNS = {
+    "next_attempt_at": "TEXT",
+}
+
+
+async def _add_missing_columns(db: aiosqlite.Connection):
+    cursor = await db.execute("PRAGMA table_info(videos)")
+    existing = {row["name"] for row in await cursor.fetchall()}
+    for name, column_type in _MIGRATED_COLUMNS.items():
+        if name not in existing:
+            await db.execute(f"ALTER TABLE videos ADD COLUMN {name} {column_type}")
+
+
+async def _requeue_interrupted(db: aiosqlite.Connection):
+    """Requeue videos left 'processing' by a crash or kill; runs before any worker claims."""
+    cursor = await db.execute("UPDATE videos SET status = 'queued' WHERE status = 'processing'")
+    if cursor.rowcount:
+        logger.info(f"Requeued {cursor.rowcount} video(s) interrupted by the last shutdown")
+
+
+async def _migrate_transcripts(db: aiosqlite.Connection, batch_size: int = 50):
+    """Re-encode transcripts still stored as JSON text into the binary format.
+
+    transcript_text is cleared when it is just the joined segments, since it
+    is now derived on read. Runs in batches so a large database is never
+    held in memory at once.
+    """
+    last_id = 0
+    migrated = 0
+    while True:
+        cursor = await db.execute(
+            """SELECT id, transcript_segments, transcript_text FROM videos
+               WHERE id > ? AND typeof(transcript_segments) = 'text'
+               ORDER BY id LIMIT ?""",
+            (last_id, batch_size),
+        )
+        rows = await cursor.fetchall()
+        if not rows:
+            break
+        for row in rows:
+            segments = json.loads(row["transcript_segments"])
+            text = row["transcript_text"]
+            if text == transcript_text(segments):
+                text = None
+            await db.execute(
+                "UPDATE videos SET transcript_segments = ?, transcript_text = ? WHERE id = ?",
+                (encode_segments(segments), text, row["id"]),
+            )
+        await db.commit()
+        last_id = rows[-1]["id"]
+        migrated += len(rows)
+    if migrated:
+        logger.info(f"Migrated {migrated} transcript(s) to the binary format")
+
+
 async def create_video(url: str, video_id: str, title: Optional[str] = None,
                        duration: Optional[int] = None) -> dict:
-    db = await get_db()
-    try:
+    async with _write_db() as db:
         now = datetime.now(timezone.utc).isoformat()
         cursor = await db.execute(
             """INSERT INTO videos (url, video_id, title, duration, status, created_at)
@@ -58,41 +251,85 @@ async def create_video(url: str, video_id: str, title: Optional[str] = None,
             (url, video_id, title, duration, now)
         )
         await db.commit()
-        return await get_video_by_id(cursor.lastrowid, db)
-    finally:
-        await db.close()
+        from app.worker import notify_worker
+        notify_worker()
+        video = await get_video_by_id(cursor.lastrowid, db)
+    _publish_video(video)
+    return video
+
+
+async def create_videos(rows: list[dict]) -> list[dict]:
+    """Insert several videos in one transaction, returning them in input order.
+
+    Each row needs `url` and `video_id` and may set `title`, `duration`,
+    `status` (default 'queued') and `error_message`. A row whose video_id
+    already exists is not inserted; the existing record is returned instead.
+    """
+    if not rows:
+        return []
+    async with _write_db() as db:
+        now = datetime.now(timezone.utc).isoformat()
+        videos = []
+        for row in rows:
+            cursor = await db.execute(
+                """INSERT INTO videos (url, video_id, title, duration, status, error_message, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(video_id) DO NOTHING
+                   RETURNING *""",
+                (row["url"], row["video_id"], row.get("title"), row.get("duration"),
+                 row.get("status", "queued"), row.get("error_message"), now)
+            )
+            inserted = await cursor.fetchone()
+            if inserted is None:
+                cursor = await db.execute(
+                    "SELECT * FROM videos WHERE video_id = ?", (row["video_id"],)
+                )
+                inserted = await cursor.fetchone()
+            videos.append(_row_to_dict(inserted))
+        await db.commit()
+    from app.worker import notify_worker
+    notify_worker()
+    for video in videos:
+        _publish_video(video)
+    return videos
 
 
 async def get_video_by_id(video_id: int, db: Optional[aiosqlite.Connection] = None) -> Optional[dict]:
-    close_db = db is None
     if db is None:
-        db = await get_db()
-    try:
-        cursor = await db.execute("SELECT * FROM videos WHERE id = ?", (video_id,))
-        row = await cursor.fetchone()
-        if row is None:
-            return None
-        return _row_to_dict(row)
-    finally:
-        if close_db:
-            await db.close()
+        async with _read_db() as db:
+            return await get_video_by_id(video_id, db)
+    cursor = await db.execute("SELECT * FROM videos WHERE id = ?", (video_id,))
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    return _row_to_dict(row)
 
 
 async def get_video_by_video_id(yt_video_id: str) -> Optional[dict]:
-    db = await get_db()
-    try:
+    async with _read_db() as db:
         cursor = await db.execute("SELECT * FROM videos WHERE video_id = ?", (yt_video_id,))
         row = await cursor.fetchone()
         if row is None:
             return None
         return _row_to_dict(row)
-    finally:
-        await db.close()
+
+
+async def get_videos_by_video_ids(yt_video_ids: list[str]) -> dict[str, dict]:
+    """Look up many YouTube IDs in one query; returns {video_id: video} for those found."""
+    if not yt_video_ids:
+        return {}
+    unique_ids = list(dict.fromkeys(yt_video_ids))
+    placeholders = ", ".join("?" for _ in unique_ids)
+    async with _read_db() as db:
+        cursor = await db.execute(
+            f"SELECT * FROM videos WHERE video_id IN ({placeholders})", unique_ids
+        )
+        rows = await cursor.fetchall()
+        return {row["video_id"]: _row_to_dict(row) for row in rows}
 
 
 async def get_all_videos(status: Optional[str] = None) -> list[dict]:
-    db = await get_db()
-    try:
+    async with _read_db() as db:
         if status:
             cursor = await db.execute(
                 "SELECT * FROM videos WHERE status = ? ORDER BY created_at DESC",
@@ -102,13 +339,60 @@ async def get_all_videos(status: Optional[str] = None) -> list[dict]:
             cursor = await db.execute("SELECT * FROM videos ORDER BY created_at DESC")
         rows = await cursor.fetchall()
         return [_row_to_dict(row) for row in rows]
-    finally:
-        await db.close()
+
+
+# Columns needed by list views; excludes the transcript and summary blobs.
+_SUMMARY_FIELDS = (
+    "id", "url", "video_id", "title", "duration", "status", "transcript_source",
+    "error_message", "attempt_count", "next_attempt_at", "created_at", "completed_at",
+)
+_SUMMARY_COLUMNS = ", ".join(_SUMMARY_FIELDS)
+_SUMMARY_FIELDS_SET = frozenset(_SUMMARY_FIELDS)
+
+
+async def get_video_summaries(status: Optional[str] = None,
+                              limit: Optional[int] = None,
+                              after: Optional[tuple[str, int]] = None,
+                              created_after: Optional[str] = None,
+                              created_before: Optional[str] = None) -> list[dict]:
+    """Like get_all_videos, but without transcript/summary columns or JSON decoding.
+
+    Results are ordered newest first by (created_at, id). Pass the
+    (created_at, id) of the last row seen as `after` to fetch the next page;
+    the seek uses the (status, created_at) / (created_at) indexes, so page
+    latency does not depend on how deep the page is.
+    """
+    clauses = []
+    params: list = []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if created_after:
+        clauses.append("created_at >= ?")
+        params.append(created_after)
+    if created_before:
+        clauses.append("created_at < ?")
+        params.append(created_before)
+    if after:
+        clauses.append("(created_at, id) < (?, ?)")
+        params.extend(after)
+
+    query = f"SELECT {_SUMMARY_COLUMNS} FROM videos"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    async with _read_db() as db:
+        cursor = await db.execute(query, params)
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
 
 
 async def update_video(video_id: int, **kwargs) -> Optional[dict]:
-    db = await get_db()
-    try:
+    async with _write_db() as db:
         fields = []
         values = []
         for key, value in kwargs.items():
@@ -120,39 +404,170 @@ async def update_video(video_id: int, **kwargs) -> Optional[dict]:
             values
         )
         await db.commit()
-        return await get_video_by_id(video_id, db)
-    finally:
-        await db.close()
+        video = await get_video_by_id(video_id, db)
+    if video is not None and not _SUMMARY_FIELDS_SET.isdisjoint(kwargs):
+        _publish_video(video)
+    return video
 
 
 async def delete_video(video_id: int) -> bool:
-    db = await get_db()
-    try:
-        cursor = await db.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+    """Delete a video and its checkpoints.
+
+    A processing video's checkpoints are kept: its run still uses them, and
+    the worker discards them (with the audio file they name) when it ends.
+    """
+    async with _write_db() as db:
+        cursor = await db.execute("DELETE FROM videos WHERE id = ? RETURNING status", (video_id,))
+        row = await cursor.fetchone()
+        if row is not None and row[0] != "processing":
+            await db.execute("DELETE FROM video_checkpoints WHERE video_id = ?", (video_id,))
         await db.commit()
-        return cursor.rowcount > 0
-    finally:
-        await db.close()
+        deleted = row is not None
+    if deleted:
+        events.publish("video_deleted", {"id": video_id})
+    return deleted
 
 
 async def get_next_queued_video() -> Optional[dict]:
-    db = await get_db()
-    try:
+    async with _read_db() as db:
+        now = datetime.now(timezone.utc).isoformat()
         cursor = await db.execute(
-            "SELECT * FROM videos WHERE status = 'queued' ORDER BY created_at ASC LIMIT 1"
+            """SELECT * FROM videos
+               WHERE status = 'queued'
+                 AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+               ORDER BY created_at ASC LIMIT 1""",
+            (now,)
         )
         row = await cursor.fetchone()
         if row is None:
             return None
         return _row_to_dict(row)
-    finally:
-        await db.close()
+
+
+async def claim_next_queued_video() -> Optional[dict]:
+    """Atomically flip the oldest due queued video to 'processing' and return it.
+
+    The select and the status change happen in a single UPDATE statement, so
+    concurrent workers can never claim the same row. Rows whose retry is
+    scheduled in the future (next_attempt_at) are skipped.
+    """
+    async with _write_db() as db:
+        now = datetime.now(timezone.utc).isoformat()
+        cursor = await db.execute(
+            """UPDATE videos SET status = 'processing'
+               WHERE id = (
+                   SELECT id FROM videos
+                   WHERE status = 'queued'
+                     AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                   ORDER BY created_at ASC LIMIT 1
+               ) AND status = 'queued'
+               RETURNING *""",
+            (now,)
+        )
+        row = await cursor.fetchone()
+        await db.commit()
+    if row is None:
+        return None
+    video = _row_to_dict(row)
+    _publish_video(video)
+    return video
+
+
+async def requeue_videos(video_ids: list[int]) -> int:
+    """Put claimed videos whose processing was interrupted back in the queue.
+
+    Only rows still 'processing' change, and attempt_count is left alone: an
+    interrupted attempt is not a failure. Returns how many were requeued.
+    """
+    if not video_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in video_ids)
+    async with _write_db() as db:
+        cursor = await db.execute(
+            f"""UPDATE videos SET status = 'queued'
+                WHERE status = 'processing' AND id IN ({placeholders})
+                RETURNING *""",
+            video_ids,
+        )
+        rows = await cursor.fetchall()
+        await db.commit()
+    for row in rows:
+        _publish_video(_row_to_dict(row))
+    return len(rows)
+
+
+async def get_cached_llm_response(key: str) -> Optional[str]:
+    """Return a cached LLM response and mark it recently used, or None."""
+    async with _write_db() as db:
+        cursor = await db.execute(
+            "UPDATE llm_cache SET last_used_at = ? WHERE key = ? RETURNING response",
+            (datetime.now(timezone.utc).isoformat(), key),
+        )
+        row = await cursor.fetchone()
+        await db.commit()
+    return row["response"] if row else None
+
+
+async def put_cached_llm_response(key: str, response: str, max_bytes: int):
+    """Store an LLM response, then evict least recently used entries beyond max_bytes."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write_db() as db:
+        await db.execute(
+            """INSERT INTO llm_cache (key, response, size, created_at, last_used_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET
+                   response = excluded.response, size = excluded.size, last_used_at = excluded.last_used_at""",
+            (key, response, len(response.encode("utf-8")), now, now),
+        )
+        await db.execute(
+            """DELETE FROM llm_cache WHERE key IN (
+                   SELECT key FROM (
+                       SELECT key, SUM(size) OVER (ORDER BY last_used_at DESC, key) AS running_size
+                       FROM llm_cache
+                   ) WHERE running_size > ?
+               )""",
+            (max_bytes,),
+        )
+        await db.commit()
+
+
+async def get_checkpoints(video_id: int) -> dict[str, str]:
+    """All checkpoints saved for a video, by name."""
+    async with _read_db() as db:
+        cursor = await db.execute(
+            "SELECT name, data FROM video_checkpoints WHERE video_id = ?", (video_id,)
+        )
+        return {row["name"]: row["data"] for row in await cursor.fetchall()}
+
+
+async def put_checkpoint(video_id: int, name: str, data: str):
+    async with _write_db() as db:
+        await db.execute(
+            """INSERT INTO video_checkpoints (video_id, name, data, created_at) VALUES (?, ?, ?, ?)
+               ON CONFLICT(video_id, name) DO UPDATE SET data = excluded.data, created_at = excluded.created_at""",
+            (video_id, name, data, datetime.now(timezone.utc).isoformat()),
+        )
+        await db.commit()
+
+
+async def delete_checkpoints(video_id: int):
+    async with _write_db() as db:
+        await db.execute("DELETE FROM video_checkpoints WHERE video_id = ?", (video_id,))
+        await db.commit()
+
+
+def _publish_video(video: dict):
+    """Broadcast a change as the list-view projection of the row."""
+    events.publish("video", {key: video.get(key) for key in _SUMMARY_FIELDS})
 
 
 def _row_to_dict(row) -> dict:
     d = dict(row)
     if d.get("transcript_segments"):
-        d["transcript_segments"] = json.loads(d["transcript_segments"])
+        d["transcript_segments"] = decode_segments(d["transcript_segments"])
+        # Stored only for rows whose text isn't just the joined segments.
+        if d.get("transcript_text") is None:
+            d["transcript_text"] = transcript_text(d["transcript_segments"])
     if d.get("summary_json"):
         d["summary_json"] = json.loads(d["summary_json"])
     return d
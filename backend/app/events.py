@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Events queued per subscriber before a slow client starts missing updates.
+MAX_PENDING_EVENTS = 100
+
+# Queued to a subscriber to tell its stream to finish.
+CLOSE = None
+
+_subscribers: set[asyncio.Queue] = set()
+_closed = False
+
+
+def publish(event: str, data: dict):
+    """Fan an event out to every connected subscriber without blocking."""
+    for queue in _subscribers:
+        try:
+            queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for slow subscriber")
+
+
+def close_streams():
+    """Tell every subscriber, and any that subscribe later, to stop: the server is shutting down."""
+    global _closed
+    _closed = True
+    for queue in _subscribers:
+        _put_close(queue)
+
+
+def open_streams():
+    global _closed
+    _closed = False
+
+
+def _put_close(queue: asyncio.Queue):
+    if queue.full():
+        queue.get_nowait()  # the stream is ending, so a dropped event doesn't matter
+    queue.put_nowait(CLOSE)
+
+
+@contextmanager
+def subscribe() -> Iterator[asyncio.Queue]:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+    if _closed:
+        _put_close(queue)
+    _subscribers.add(queue)
+    try:
+        yield queue
+    finally:
+        _subscribers.discard(queue)
@@ -1,5 +1,8 @@
+import asyncio
 import logging
 import os
+import signal
+import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -16,19 +19,65 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
 
-from app.database import init_db
+from app import events
+from app.cpu import shutdown_cpu_pool, start_cpu_pool
+from app.database import close_pool, init_db, open_pool
+from app.openai_client import close_openai_client
 from app.routes import router
+from app.transcriber import shutdown_local_backend, start_local_backend
 from app.worker import start_worker, stop_worker
 
 STATIC_DIR = Path(__file__).parent.parent / "static"
 
 
+def _close_streams_on_signal():
+    """End the SSE streams as soon as a shutdown signal arrives, then run the server's own handler.
+
+    uvicorn waits for open responses to finish before running the lifespan
+    shutdown, and an event stream never finishes by itself. Returns a
+    function that restores the previous handlers.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    previous = {}
+
+    def handle(signum, frame):
+        loop.call_soon_threadsafe(events.close_streams)
+        handler = previous[signum]
+        if callable(handler):
+            handler(signum, frame)
+        else:
+            signal.signal(signum, handler)
+            signal.raise_signal(signum)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous[sig] = signal.signal(sig, handle)
+
+    def restore():
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+    return restore
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await open_pool()
+    start_cpu_pool()
+    start_local_backend()
     worker_task = await start_worker()
+    events.open_streams()
+    restore_signals = _close_streams_on_signal()
     yield
+    events.close_streams()
+    restore_signals()
     await stop_worker(worker_task)
+    shutdown_local_backend()
+    shutdown_cpu_pool()
+    await close_openai_client()
+    await close_pool()
 
 
 app = FastAPI(title="YT Transcribe", lifespan=lifespan)
@@ -39,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(router, prefix="/api")
@@ -0,0 +1,44 @@
+import logging
+import os
+from typing import Optional
+
+from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """The process-wide OpenAI client, created on first use.
+
+    Sharing one client keeps its HTTP connections alive between calls, so
+    summaries and Whisper uploads skip the TCP and TLS handshake after the
+    first request. Calls are native async I/O, so hundreds can be in flight
+    without a thread each. The SDK's own retries are off: app.rate_limit
+    retries instead, so every attempt is paced and charged to the quota.
+    """
+    global _client
+    if _client is None:
+        # The Limits class of whichever httpx package this SDK version uses.
+        limits = type(DEFAULT_CONNECTION_LIMITS)(
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "60")),
+        )
+        timeout = Timeout(
+            float(os.getenv("OPENAI_TIMEOUT_SECONDS", "600")),
+            connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10")),
+        )
+        _client = AsyncOpenAI(
+            timeout=timeout, max_retries=0, http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
+        logger.info(f"Created OpenAI client (max {limits.max_connections} connections)")
+    return _client
+
+
+async def close_openai_client():
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.close()
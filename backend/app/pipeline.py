@@ -1,35 +1,81 @@
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
+from typing import Optional
 
+from app.checkpoints import Checkpoints, discard_checkpoints, load_checkpoints
+from app.cpu import run_cpu_bound
 from app.database import update_video
-from app.transcriber import get_transcript
+from app.transcriber import (
+    discard_audio,
+    discard_chunks,
+    download_audio,
+    fetch_captions,
+    get_transcript,
+    prepare_audio,
+    transcribe_audio,
+)
 from app.summarizer import generate_summary
+from app.transcript_codec import encode_segments
+from app.youtube import fetch_video_metadata
 
 logger = logging.getLogger(__name__)
 
 
 async def process_video(video: dict):
-    """Full processing pipeline: transcribe → summarize → mark complete."""
+    """Full processing pipeline: metadata → transcribe → summarize → mark complete.
+
+    A retry resumes after the last finished step: metadata and a stored
+    transcript are reused as they are, and the video's checkpoints hold the
+    downloaded audio, finished Whisper chunks and finished summary calls.
+    """
     video_id = video["id"]
     url = video["url"]
 
     logger.info(f"Processing video {video_id}: {url}")
 
-    transcript_segments, transcript_source = await get_transcript(video)
+    if video.get("title") is None and video.get("duration") is None:
+        if not await _resolve_metadata(video):
+            return
+
+    checkpoints = await load_checkpoints(video_id)
+    transcript_segments = _stored_transcript(video)
+    if transcript_segments is None:
+        transcript_segments, transcript_source = await get_transcript(video, checkpoints)
+        await _store_transcript(video_id, transcript_segments, transcript_source)
+    await _store_summary(video_id, transcript_segments, checkpoints)
+
+
+def _stored_transcript(video: dict) -> Optional[list[dict]]:
+    """Segments saved by an earlier attempt, or None if it never got that far."""
+    if video.get("transcript_segments") is None:
+        return None
+    logger.info(f"Video {video['id']}: resuming from the stored transcript")
+    return video["transcript_segments"]
 
-    transcript_text = " ".join(seg["text"] for seg in transcript_segments)
+
+async def _store_transcript(video_id: int, segments: list[dict], source: str):
+    """Save the transcript segments; the plain text is derived from them on read.
+
+    Encoding runs in the CPU pool: for multi-hour videos this is tens of
+    megabytes of string work and compression that would otherwise stall API
+    requests.
+    """
+    encoded = await run_cpu_bound(encode_segments, segments)
 
     await update_video(
         video_id,
-        transcript_source=transcript_source,
-        transcript_segments=json.dumps(transcript_segments),
-        transcript_text=transcript_text,
+        transcript_source=source,
+        transcript_segments=encoded,
     )
 
-    logger.info(f"Video {video_id}: transcript obtained via {transcript_source} ({len(transcript_segments)} segments)")
+    logger.info(f"Video {video_id}: transcript obtained via {source} ({len(segments)} segments, "
+                f"{len(encoded)} bytes stored)")
+
 
-    summary_data = await generate_summary(transcript_segments, transcript_text)
+async def _store_summary(video_id: int, segments: list[dict], checkpoints: Optional[Checkpoints] = None):
+    summary_data = await generate_summary(segments, checkpoints)
 
     now = datetime.now(timezone.utc).isoformat()
     await update_video(
@@ -40,3 +86,108 @@ async def process_video(video: dict):
     )
 
     logger.info(f"Video {video_id}: processing complete")
+    if checkpoints is not None:
+        await discard_checkpoints(video_id)
+
+
+# The same pipeline split into stages for the staged worker (WORKER_MODE=staged).
+# Each stage takes the job dict from new_job() and fills in what the next one
+# needs; a job whose "done" flag is set skips the remaining stages.
+
+def new_job(video: dict) -> dict:
+    return {
+        "video": video,
+        "segments": None,
+        "source": None,
+        "transcript_stored": False,
+        "audio_path": None,
+        "chunks": None,
+        "checkpoints": None,
+        "done": False,
+    }
+
+
+async def fetch_stage(job: dict):
+    """Network: resolve metadata, then fetch captions or download the audio."""
+    video = job["video"]
+    if video.get("title") is None and video.get("duration") is None:
+        if not await _resolve_metadata(video):
+            job["done"] = True
+            return
+
+    job["checkpoints"] = await load_checkpoints(video["id"])
+    stored = _stored_transcript(video)
+    if stored is not None:
+        job["segments"], job["transcript_stored"] = stored, True
+        return
+
+    segments = await fetch_captions(video["video_id"])
+    if segments:
+        job["segments"], job["source"] = segments, "youtube_captions"
+    else:
+        logger.info(f"No YouTube captions for {video['video_id']}, falling back to Whisper")
+        job["audio_path"] = await download_audio(video["url"], job["checkpoints"])
+
+
+async def transcode_stage(job: dict):
+    """CPU: split downloaded audio for upload if it is too large to send whole."""
+    if job["audio_path"]:
+        job["chunks"] = await prepare_audio(job["audio_path"])
+
+
+async def transcribe_stage(job: dict):
+    """API: transcribe downloaded audio, then save the transcript."""
+    if job["segments"] is None:
+        audio_path = job["audio_path"]
+        try:
+            job["segments"] = await transcribe_audio(audio_path, job["chunks"], job["checkpoints"])
+            job["source"] = "whisper"
+        finally:
+            # Keeps checkpointed audio if transcription failed, for the retry.
+            discard_job(job)
+        if audio_path:
+            discard_audio(audio_path)
+    if not job["transcript_stored"]:
+        await _store_transcript(job["video"]["id"], job["segments"], job["source"])
+        job["transcript_stored"] = True
+
+
+async def summarize_stage(job: dict):
+    """LLM: summarize the transcript and mark the video completed."""
+    await _store_summary(job["video"]["id"], job["segments"], job["checkpoints"])
+
+
+def discard_job(job: dict):
+    """Delete any audio files a job still holds, e.g. after a failed stage.
+
+    Checkpointed audio is left for the retry; discard_checkpoints() removes
+    it once the video completes or fails for good.
+    """
+    if job["chunks"]:
+        discard_chunks(job["chunks"])
+        job["chunks"] = None
+    if job["audio_path"]:
+        if job["checkpoints"] is None:
+            discard_audio(job["audio_path"])
+        job["audio_path"] = None
+
+
+async def _resolve_metadata(video: dict) -> bool:
+    """Fill in title/duration for videos submitted without a metadata lookup.
+
+    Returns False (after marking the video failed) if YouTube reports the
+    video as unavailable, mirroring what submission does when it fetches
+    metadata up front.
+    """
+    meta = await asyncio.to_thread(fetch_video_metadata, video["url"])
+    if meta.get("error"):
+        logger.warning(f"Video {video['id']} unavailable: {meta['error']}")
+        await update_video(
+            video["id"],
+            status="failed",
+            error_message=f"Video unavailable: {meta['error']}",
+        )
+        return False
+
+    await update_video(video["id"], title=meta.get("title"), duration=meta.get("duration"))
+    return True
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Env vars holding each model's quota: (requests per minute, tokens per minute).
+# Defaults are OpenAI's tier-1 limits for gpt-4o-mini and whisper-1; 0 disables a limit.
+_QUOTAS = {
+    "chat": (("OPENAI_CHAT_RPM", "500"), ("OPENAI_CHAT_TPM", "200000")),
+    "whisper": (("OPENAI_WHISPER_RPM", "500"), None),
+}
+
+# Fraction of the quota the limiter spends. Pacing at exactly the server's
+# rate leaves no margin, so any jitter in request arrival turns into 429s.
+QUOTA_HEADROOM = 0.95
+
+# Retries of connection errors, timeouts and 5xx responses, as the SDK
+# would have done before its own retries were turned off.
+TRANSIENT_RETRIES = 2
+
+_limiters: dict[str, "RateLimiter"] = {}
+
+
+class RateLimiter:
+    """Requests- and tokens-per-minute token buckets shared by every call to one model.
+
+    Callers reserve their request and tokens up front, letting the buckets go
+    negative, and then sleep until the debt is paid off. Reservations therefore
+    queue in arrival order without a lock, and a request bigger than the
+    bucket still goes out once enough budget has accumulated.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float = 0,
+                 burst_seconds: float = 60, clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._capacity = {
+            "requests": requests_per_minute * burst_seconds / 60,
+            "tokens": tokens_per_minute * burst_seconds / 60,
+        }
+        self._levels = dict(self._capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _rates(self, tokens: int):
+        return (
+            ("requests", self.requests_per_minute, 1),
+            ("tokens", self.tokens_per_minute, tokens),
+        )
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Debit one request and `tokens`, returning the seconds to wait before sending it."""
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        wait = 0.0
+        for name, per_minute, amount in self._rates(tokens):
+            if per_minute <= 0:
+                continue
+            level = min(self._capacity[name], self._levels[name] + elapsed * per_minute / 60) - amount
+            self._levels[name] = level
+            if level < 0:
+                wait = max(wait, -level * 60 / per_minute)
+        return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hold every caller back for `seconds`, e.g. after the API answered 429."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self, tokens: int = 0):
+        delay = self.reserve(tokens)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A 429 may have extended the pause while this caller slept.
+            delay = self._paused_until - self._clock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """The process-wide limiter for `name` ("chat" or "whisper"), created on first use."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        requests_env, tokens_env = _QUOTAS[name]
+        limiter = RateLimiter(
+            float(os.getenv(*requests_env)) * QUOTA_HEADROOM,
+            float(os.getenv(*tokens_env)) * QUOTA_HEADROOM if tokens_env else 0,
+            burst_seconds=float(os.getenv("OPENAI_RATE_LIMIT_BURST_SECONDS", "60")),
+        )
+        _limiters[name] = limiter
+        logger.info(f"OpenAI {name} rate limit: {limiter.requests_per_minute:g} RPM, "
+                    f"{limiter.tokens_per_minute:g} TPM")
+    return limiter
+
+
+def reset_rate_limiters():
+    """Forget all limiters so the next call re-reads the quota env vars."""
+    _limiters.clear()
+
+
+async def call_with_rate_limit(name: str, tokens: int, call: Callable[[], Awaitable[T]]) -> T:
+    """Run `call` within the `name` quota, waiting out 429 responses instead of failing.
+
+    The shared client doesn't retry by itself, so every retry here goes
+    through the limiter again. A 429 pauses every caller of the same model for
+    the server's Retry-After (or an exponential backoff), so concurrent chunks
+    back off together. The request is retried up to OPENAI_RATE_LIMIT_RETRIES
+    times, so rate limits don't use up the worker's MAX_RETRY_ATTEMPTS. An
+    exhausted billing quota (insufficient_quota) is not retried. Connection
+    errors, timeouts and 5xx responses are retried TRANSIENT_RETRIES times
+    after a short backoff of this request only.
+    """
+    limiter = get_rate_limiter(name)
+    max_retries = int(os.getenv("OPENAI_RATE_LIMIT_RETRIES", "8"))
+    attempt = 0
+    transient_attempt = 0
+    while True:
+        await limiter.acquire(tokens)
+        try:
+            return await call()
+        except RateLimitError as e:
+            if e.code == "insufficient_quota" or attempt >= max_retries:
+                raise
+            attempt += 1
+            delay = _retry_after(e) or min(2 ** attempt, 60) * random.uniform(0.8, 1.2)
+            logger.warning(f"OpenAI {name} rate limited (retry {attempt}/{max_retries}), "
+                           f"pausing {delay:.1f}s")
+            limiter.pause(delay)
+        except (APIConnectionError, InternalServerError) as e:
+            if transient_attempt >= TRANSIENT_RETRIES:
+                raise
+            transient_attempt += 1
+            delay = min(0.5 * 2 ** transient_attempt, 8) * random.uniform(0.75, 1.0)
+            logger.warning(f"OpenAI {name} request failed (retry {transient_attempt}/{TRANSIENT_RETRIES}), "
+                           f"retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    """Seconds to wait from a 429's retry-after-ms or Retry-After header, if usable."""
+    headers = error.response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
@@ -1,20 +1,37 @@
 import asyncio
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app import events
+
+from app.checkpoints import discard_checkpoints
 from app.database import (
     create_video,
+    create_videos,
     delete_video,
-    get_all_videos,
+    get_video_summaries,
     get_video_by_id,
     get_video_by_video_id,
+    get_videos_by_video_ids,
 )
-from app.youtube import extract_video_id, fetch_video_metadata, validate_youtube_url
+from app.worker import pipeline_stats
+from app.youtube import extract_video_id, fetch_video_metadata, metadata_cache, validate_youtube_url
 
 router = APIRouter()
 
+SSE_HEARTBEAT_SECONDS = 15
+BATCH_METADATA_CONCURRENCY = int(os.getenv("BATCH_METADATA_CONCURRENCY", "8"))
+# When set, submissions skip the yt-dlp lookup and the worker fills in metadata.
+DEFER_METADATA = os.getenv("DEFER_METADATA", "false").lower() in ("1", "true", "yes")
+
 
 class VideoSubmitRequest(BaseModel):
     url: str
@@ -24,7 +41,8 @@ class BatchSubmitRequest(BaseModel):
     urls: list[str]
 
 
-class VideoResponse(BaseModel):
+class VideoSummaryResponse(BaseModel):
+    """List-view projection of a video: no transcript or summary payloads."""
     id: int
     url: str
     video_id: str
@@ -32,15 +50,19 @@ class VideoResponse(BaseModel):
     duration: Optional[int] = None
     status: str
     transcript_source: Optional[str] = None
-    transcript_segments: Optional[list] = None
-    transcript_text: Optional[str] = None
-    summary_json: Optional[dict] = None
     error_message: Optional[str] = None
     attempt_count: int = 0
+    next_attempt_at: Optional[str] = None
     created_at: str
     completed_at: Optional[str] = None
 
 
+class VideoResponse(VideoSummaryResponse):
+    transcript_segments: Optional[list] = None
+    transcript_text: Optional[str] = None
+    summary_json: Optional[dict] = None
+
+
 @router.post("/videos", response_model=VideoResponse)
 async def submit_video(request: VideoSubmitRequest):
     if not validate_youtube_url(request.url):
@@ -52,6 +74,10 @@ async def submit_video(request: VideoSubmitRequest):
     if existing:
         return existing
 
+    if DEFER_METADATA:
+        # The worker resolves title and duration before transcribing.
+        return await create_video(url=request.url, video_id=yt_id)
+
     meta = await asyncio.to_thread(fetch_video_metadata, request.url)
     if meta.get("error"):
         video = await create_video(
@@ -83,44 +109,114 @@ class BatchSubmitResponse(BaseModel):
 
 @router.post("/videos/batch", response_model=BatchSubmitResponse)
 async def submit_videos_batch(request: BatchSubmitRequest):
+    urls = [url.strip() for url in request.urls if url.strip()]
+    yt_ids = [extract_video_id(url) for url in urls]
+
+    existing = await get_videos_by_video_ids([yt_id for yt_id in yt_ids if yt_id])
+
+    # First URL seen for each new video ID; duplicates share its outcome.
+    to_fetch: dict[str, str] = {}
+    for url, yt_id in zip(urls, yt_ids):
+        if yt_id and yt_id not in existing and yt_id not in to_fetch:
+            to_fetch[yt_id] = url
+
+    semaphore = asyncio.Semaphore(BATCH_METADATA_CONCURRENCY)
+
+    async def fetch(url: str):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(fetch_video_metadata, url)
+            except Exception as e:
+                return e
+
+    if DEFER_METADATA:
+        metas = [{} for _ in to_fetch]
+    else:
+        metas = await asyncio.gather(*(fetch(url) for url in to_fetch.values()))
+
+    rows = []
+    errors: dict[str, str] = {}
+    for (yt_id, url), meta in zip(to_fetch.items(), metas):
+        if isinstance(meta, Exception):
+            errors[yt_id] = str(meta)
+        elif meta.get("error"):
+            rows.append({
+                "url": url, "video_id": yt_id, "status": "failed",
+                "error_message": f"Video unavailable: {meta['error']}",
+            })
+        else:
+            rows.append({
+                "url": url, "video_id": yt_id,
+                "title": meta.get("title"), "duration": meta.get("duration"),
+            })
+
+    videos = dict(existing)
+    for video in await create_videos(rows):
+        videos[video["video_id"]] = video
+
     results = []
-    for url in request.urls:
-        url = url.strip()
-        if not url:
-            continue
-        if not validate_youtube_url(url):
+    for url, yt_id in zip(urls, yt_ids):
+        if yt_id is None:
             results.append(BatchResultItem(url=url, success=False, error="Invalid YouTube URL"))
-            continue
-
-        yt_id = extract_video_id(url)
-        existing = await get_video_by_video_id(yt_id)
-        if existing:
-            results.append(BatchResultItem(url=url, success=True, video=existing))
-            continue
-
-        try:
-            meta = await asyncio.to_thread(fetch_video_metadata, url)
-            if meta.get("error"):
-                video = await create_video(url=url, video_id=yt_id)
-                from app.database import update_video
-                video = await update_video(video["id"], status="failed",
-                                           error_message=f"Video unavailable: {meta['error']}")
-                results.append(BatchResultItem(url=url, success=True, video=video))
-            else:
-                video = await create_video(
-                    url=url, video_id=yt_id,
-                    title=meta.get("title"), duration=meta.get("duration"),
-                )
-                results.append(BatchResultItem(url=url, success=True, video=video))
-        except Exception as e:
-            results.append(BatchResultItem(url=url, success=False, error=str(e)))
+        elif yt_id in errors:
+            results.append(BatchResultItem(url=url, success=False, error=errors[yt_id]))
+        else:
+            results.append(BatchResultItem(url=url, success=True, video=videos[yt_id]))
 
     return BatchSubmitResponse(results=results)
 
 
-@router.get("/videos", response_model=list[VideoResponse])
-async def list_videos(status: Optional[str] = Query(None)):
-    return await get_all_videos(status=status)
+def _encode_cursor(video: dict) -> str:
+    raw = f"{video['created_at']}|{video['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, video_id = raw.rsplit("|", 1)
+        return created_at, int(video_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _normalize_timestamp(value: str, name: str) -> str:
+    """Convert an ISO 8601 timestamp to the UTC form stored in created_at."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+@router.get("/videos", response_model=list[VideoSummaryResponse])
+async def list_videos(
+    response: Response,
+    status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[str] = Query(None),
+    created_after: Optional[str] = Query(None),
+    created_before: Optional[str] = Query(None),
+):
+    """List videos newest first.
+
+    With `limit`, at most that many videos are returned and, if more remain,
+    the `X-Next-Cursor` response header holds the value to pass as `after`
+    for the next page.
+    """
+    videos = await get_video_summaries(
+        status=status,
+        limit=limit + 1 if limit is not None else None,
+        after=_decode_cursor(after) if after else None,
+        created_after=_normalize_timestamp(created_after, "created_after") if created_after else None,
+        created_before=_normalize_timestamp(created_before, "created_before") if created_before else None,
+    )
+    if limit is not None and len(videos) > limit:
+        videos = videos[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(videos[-1])
+    return videos
 
 
 @router.get("/videos/{video_id}", response_model=VideoResponse)
@@ -133,7 +229,55 @@ async def get_video(video_id: int):
 
 @router.delete("/videos/{video_id}")
 async def remove_video(video_id: int):
+    video = await get_video_by_id(video_id)
+    if video is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    # Removes audio kept for a pending retry; delete_video drops the rows too.
+    # A processing video's audio is still in use, so delete_video keeps its
+    # checkpoints and the worker discards them when the run ends.
+    if video["status"] != "processing":
+        await discard_checkpoints(video_id)
     deleted = await delete_video(video_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Video not found")
     return {"detail": "Video deleted"}
+
+
+@router.get("/stats")
+async def get_stats():
+    """Runtime counters for operational monitoring."""
+    return {"metadata_cache": metadata_cache.stats(), "pipeline": pipeline_stats()}
+
+
+async def _event_stream(heartbeat: float = SSE_HEARTBEAT_SECONDS):
+    """Yield video events in text/event-stream format, with keep-alive comments.
+
+    Returns once events.close_streams() is called, so open streams don't hold
+    up a server shutdown.
+    """
+    with events.subscribe() as queue:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is events.CLOSE:
+                return
+            event, data = item
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/events")
+async def stream_events():
+    """Server-Sent Events stream of video status changes.
+
+    `video` events carry the list-view projection of a video whenever its
+    status or list-view fields change; `video_deleted` events carry just the id.
+    """
+    return StreamingResponse(
+        _event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
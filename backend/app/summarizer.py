@@ -1,11 +1,31 @@
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import time
+from typing import Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from app.checkpoints import Checkpoints
+from app.cpu import run_cpu_bound
+from app.database import get_cached_llm_response, put_cached_llm_response
+from app.openai_client import get_openai_client
+from app.rate_limit import call_with_rate_limit
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_TEMPERATURE = 0.3
+# Completion tokens reserved against the tokens-per-minute quota per call.
+SUMMARY_RESPONSE_TOKENS = 1024
+# How long to use the estimate after the tokenizer failed to load before trying again.
+ENCODING_RETRY_SECONDS = 300
+
+_encoding = None
+_encoding_failed_at: Optional[float] = None
+
 SYSTEM_PROMPT = """You are a video summarization assistant. You receive a transcript of a YouTube video with timestamps.
 
 Your task is to produce a structured JSON summary with:
@@ -29,72 +49,247 @@ Aim for 5-10 key points that capture the most important ideas, decisions, or ins
 
 def _format_timestamped_transcript(segments: list[dict]) -> str:
     """Format transcript segments with timestamps for the LLM prompt."""
-    lines = []
-    for seg in segments:
-        start = seg["start"]
-        minutes = int(start // 60)
-        seconds = int(start % 60)
-        lines.append(f"[{minutes:02d}:{seconds:02d}] ({start}s) {seg['text']}")
-    return "\n".join(lines)
-
-
-async def generate_summary(transcript_segments: list[dict], transcript_text: str) -> dict:
-    """Generate a timestamp-anchored summary from transcript segments."""
-    client = OpenAI()
-
-    total_chars = len(transcript_text)
-    max_chars = 100_000  # roughly fits in context with prompt overhead
-
-    if total_chars <= max_chars:
-        return await _summarize_single(client, transcript_segments)
+    return "\n".join(_format_segment_line(seg) for seg in segments)
+
+
+def _format_segment_line(seg: dict) -> str:
+    start = seg["start"]
+    minutes = int(start // 60)
+    seconds = int(start % 60)
+    return f"[{minutes:02d}:{seconds:02d}] ({start}s) {seg['text']}"
+
+
+def _get_encoding():
+    """The tokenizer of the summary model, or None if tiktoken can't load it.
+
+    tiktoken downloads the encoding on first use (cached under
+    TIKTOKEN_CACHE_DIR), so this blocks and must run off the event loop. An
+    offline host falls back to an estimate, and a failed load is retried
+    after ENCODING_RETRY_SECONDS rather than remembered for good.
+    """
+    global _encoding, _encoding_failed_at
+    if _encoding is not None:
+        return _encoding
+    if _encoding_failed_at is not None and time.monotonic() - _encoding_failed_at < ENCODING_RETRY_SECONDS:
+        return None
+    name = os.getenv("SUMMARY_TOKENIZER", "o200k_base")
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding(name)
+        _encoding_failed_at = None
+    except Exception as e:
+        _encoding_failed_at = time.monotonic()
+        logger.warning(f"Tokenizer {name} unavailable, estimating token counts: {e}")
+    return _encoding
+
+
+def _count_tokens_batch(texts: list[str]) -> list[int]:
+    encoding = _get_encoding()
+    if encoding is None:
+        # At most ~3 UTF-8 bytes per token for English, and CJK text is
+        # rarely under one token per character, so this overestimates.
+        return [-(-len(text.encode("utf-8")) // 3) for text in texts]
+    return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+
+
+def _segment_token_costs(segments: list[dict]) -> list[int]:
+    """Tokens each segment adds to the prompt: its formatted line plus the newline.
+
+    Tokenizing a whole transcript is CPU-bound; callers on the event loop run
+    this through run_cpu_bound.
+    """
+    lines = [_format_segment_line(seg) for seg in segments]
+    return [cost + 1 for cost in _count_tokens_batch(lines)]
+
+
+def _max_input_tokens() -> int:
+    # gpt-4o-mini has a 128k-token context; the rest is left for the system
+    # prompt and the JSON response.
+    return int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "100000"))
+
+
+async def generate_summary(transcript_segments: list[dict], checkpoints: Optional[Checkpoints] = None) -> dict:
+    """Generate a timestamp-anchored summary from transcript segments.
+
+    With checkpoints, every chunk and combine result is saved, so a retry
+    only makes the calls that had not finished.
+    """
+    client = get_openai_client()
+
+    max_tokens = _max_input_tokens()
+    costs = await run_cpu_bound(_segment_token_costs, transcript_segments)
+
+    if sum(costs) <= max_tokens:
+        return await _summarize_single(client, transcript_segments, checkpoints)
     else:
-        return await _summarize_chunked(client, transcript_segments, max_chars)
+        return await _summarize_chunked(client, transcript_segments, max_tokens, costs, checkpoints)
 
 
-async def _summarize_single(client: OpenAI, segments: list[dict]) -> dict:
+async def _summarize_single(client: AsyncOpenAI, segments: list[dict],
+                            checkpoints: Optional[Checkpoints] = None) -> dict:
     """Summarize transcript in a single LLM call."""
     formatted = _format_timestamped_transcript(segments)
+    return await _complete_json(client, SYSTEM_PROMPT, f"Here is the timestamped transcript:\n\n{formatted}",
+                                checkpoints)
+
+
+async def _complete_json(client: AsyncOpenAI, system_prompt: str, user_content: str,
+                         checkpoints: Optional[Checkpoints] = None) -> dict:
+    """Run a JSON-mode chat completion, answering from the response cache when possible.
+
+    The cache is keyed on a hash of the whole request (model, prompts,
+    temperature), so a retried video, a resubmission or a mirror with the
+    same transcript reuses earlier chunk and combine results. The video's
+    checkpoints keep the same responses under the same hash, unaffected by
+    cache eviction or LLM_CACHE_MAX_BYTES=0.
+    """
+    request = {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ],
+        "temperature": SUMMARY_TEMPERATURE,
+        "response_format": {"type": "json_object"},
+    }
+    max_bytes = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    key = _cache_key(request) if max_bytes > 0 or checkpoints is not None else None
+
+    if checkpoints is not None:
+        saved = checkpoints.get(f"llm:{key}")
+        if saved is not None:
+            return json.loads(saved)
+
+    if max_bytes > 0:
+        cached = await _cache_get(key)
+        if cached is not None:
+            logger.info("LLM response cache hit")
+            return json.loads(cached)
+
+    response = await call_with_rate_limit(
+        "chat", _estimate_request_tokens(system_prompt, user_content),
+        lambda: client.chat.completions.create(**request),
+    )
+    content = response.choices[0].message.content
+    result = json.loads(content)
+    if checkpoints is not None:
+        await checkpoints.save(f"llm:{key}", content)
+    if max_bytes > 0:
+        await _cache_put(key, content, max_bytes)
+    return result
+
+
+def _estimate_request_tokens(system_prompt: str, user_content: str) -> int:
+    # OpenAI counts a request against TPM from its character count (about 4
+    # per token) plus the completion budget, before any tokenizing.
+    return -(-(len(system_prompt) + len(user_content)) // 4) + SUMMARY_RESPONSE_TOKENS
+
+
+def _cache_key(request: dict) -> str:
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def _cache_get(key: str) -> Optional[str]:
+    # A cache failure should cost an API call, never the summary.
+    try:
+        return await get_cached_llm_response(key)
+    except Exception as e:
+        logger.warning(f"LLM response cache lookup failed: {e}")
+        return None
+
+
+async def _cache_put(key: str, content: str, max_bytes: int):
+    try:
+        await put_cached_llm_response(key, content, max_bytes)
+    except Exception as e:
+        logger.warning(f"Could not store LLM response in cache: {e}")
+
+
+async def _summarize_chunked(client: AsyncOpenAI, segments: list[dict], max_tokens: int,
+                             costs: Optional[list[int]] = None,
+                             checkpoints: Optional[Checkpoints] = None) -> dict:
+    """Summarize long transcripts by chunking and combining.
+
+    Chunk summaries are requested concurrently (bounded by
+    SUMMARY_CONCURRENCY) and combined level by level, so a long transcript
+    takes about one round-trip per level instead of one per chunk.
+    """
+    chunks = _split_segments_into_chunks(segments, max_tokens, costs)
+    concurrency = max(1, int(os.getenv("SUMMARY_CONCURRENCY", "4")))
+    logger.info(f"Splitting transcript into {len(chunks)} chunks for summarization "
+                f"({concurrency} in parallel)")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(call, *args):
+        async with semaphore:
+            return await call(client, *args, checkpoints)
+
+    chunk_summaries = await asyncio.gather(*(bounded(_summarize_single, chunk) for chunk in chunks))
+    return await _reduce_summaries(list(chunk_summaries), max_tokens, bounded)
+
+
+async def _reduce_summaries(summaries: list[dict], max_tokens: int, bounded) -> dict:
+    """Combine summaries into one, in as many levels as the prompt size requires."""
+    level = 1
+    while True:
+        sizes = await run_cpu_bound(_summary_token_sizes, summaries)
+        groups = _group_summaries(summaries, max_tokens, sizes)
+        if len(groups) == 1:
+            return await bounded(_combine_summaries, groups[0])
+        logger.info(f"Combining {len(summaries)} summaries in {len(groups)} groups (level {level})")
+        summaries = list(await asyncio.gather(*(
+            bounded(_combine_summaries, group) if len(group) > 1 else _passthrough(group[0])
+            for group in groups
+        )))
+        level += 1
+
+
+async def _passthrough(summary: dict) -> dict:
+    return summary
+
+
+def _summary_token_sizes(summaries: list[dict]) -> list[int]:
+    return _count_tokens_batch([_format_chunk_summaries([summary]) for summary in summaries])
+
+
+def _group_summaries(summaries: list[dict], max_tokens: int,
+                     sizes: Optional[list[int]] = None) -> list[list[dict]]:
+    """Split summaries, in order, into groups whose combine prompt fits max_tokens.
+
+    Every group but a trailing one holds at least two summaries, so each
+    level shrinks the list and the reduce always terminates.
+    """
+    if sizes is None:
+        sizes = _summary_token_sizes(summaries)
+    groups = []
+    current = []
+    current_size = 0
+    for summary, size in zip(summaries, sizes):
+        if current_size + size > max_tokens and len(current) >= 2:
+            groups.append(current)
+            current = []
+            current_size = 0
+        current.append(summary)
+        current_size += size
+    if current:
+        groups.append(current)
+    return groups
 
-    def _call():
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Here is the timestamped transcript:\n\n{formatted}"},
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
-        content = response.choices[0].message.content
-        return json.loads(content)
-
-    return await asyncio.to_thread(_call)
-
-
-async def _summarize_chunked(client: OpenAI, segments: list[dict],
-                              max_chars: int) -> dict:
-    """Summarize long transcripts by chunking and combining."""
-    chunks = _split_segments_into_chunks(segments, max_chars)
-    logger.info(f"Splitting transcript into {len(chunks)} chunks for summarization")
-
-    chunk_summaries = []
-    for i, chunk in enumerate(chunks):
-        logger.info(f"Summarizing chunk {i + 1}/{len(chunks)}")
-        summary = await _summarize_single(client, chunk)
-        chunk_summaries.append(summary)
-
-    return await _combine_summaries(client, chunk_summaries)
 
+def _split_segments_into_chunks(segments: list[dict], max_tokens: int,
+                                costs: Optional[list[int]] = None) -> list[list[dict]]:
+    """Split segments into chunks whose formatted transcript fits max_tokens."""
+    if costs is None:
+        costs = _segment_token_costs(segments)
 
-def _split_segments_into_chunks(segments: list[dict], max_chars: int) -> list[list[dict]]:
-    """Split segments into chunks that fit within character limits."""
     chunks = []
     current_chunk = []
     current_size = 0
 
-    for seg in segments:
-        seg_size = len(seg["text"]) + 20  # account for timestamp formatting
-        if current_size + seg_size > max_chars and current_chunk:
+    for seg, seg_size in zip(segments, costs):
+        if current_size + seg_size > max_tokens and current_chunk:
             chunks.append(current_chunk)
             current_chunk = []
             current_size = 0
@@ -107,16 +302,20 @@ def _split_segments_into_chunks(segments: list[dict], max_chars: int) -> list[li
     return chunks
 
 
-async def _combine_summaries(client: OpenAI, chunk_summaries: list[dict]) -> dict:
-    """Combine multiple chunk summaries into a final summary."""
+def _format_chunk_summaries(chunk_summaries: list[dict]) -> str:
     chunks_text = []
     for i, summary in enumerate(chunk_summaries):
         chunks_text.append(f"--- Chunk {i + 1} ---")
         chunks_text.append(f"Overview: {summary.get('overview', '')}")
         for kp in summary.get("key_points", []):
             chunks_text.append(f"  [{kp['timestamp']}s] {kp['text']}")
+    return "\n".join(chunks_text)
 
-    combined_input = "\n".join(chunks_text)
+
+async def _combine_summaries(client: AsyncOpenAI, chunk_summaries: list[dict],
+                             checkpoints: Optional[Checkpoints] = None) -> dict:
+    """Combine multiple chunk summaries into a final summary."""
+    combined_input = _format_chunk_summaries(chunk_summaries)
 
     combine_prompt = """You are given summaries of different parts of the same video.
 Combine them into a single cohesive summary with the same JSON format:
@@ -125,17 +324,4 @@ Combine them into a single cohesive summary with the same JSON format:
 
 Return ONLY valid JSON, no markdown, no code fences."""
 
-    def _call():
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": combine_prompt},
-                {"role": "user", "content": combined_input},
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"},
-        )
-        content = response.choices[0].message.content
-        return json.loads(content)
-
-    return await asyncio.to_thread(_call)
+    return await _complete_json(client, combine_prompt, combined_input, checkpoints)
@@ -1,24 +1,41 @@
 import asyncio
+import csv
+import glob
+import json
 import logging
 import os
+import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import yt_dlp
-from openai import OpenAI
+from openai import AsyncOpenAI
 from youtube_transcript_api import YouTubeTranscriptApi
 
+from app.checkpoints import AUDIO, Checkpoints
+from app.cpu import create_process_pool, run_cpu_bound
+from app.openai_client import get_openai_client
+from app.rate_limit import call_with_rate_limit
+
 logger = logging.getLogger(__name__)
 
 _yt_transcript_api = YouTubeTranscriptApi()
 
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+# Largest file the Whisper API accepts in one request.
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+
 
-async def get_transcript(video: dict) -> tuple[list[dict], str]:
+async def get_transcript(video: dict, checkpoints: Optional[Checkpoints] = None) -> tuple[list[dict], str]:
     """
     Get transcript for a video. Tries YouTube captions first,
     falls back to Whisper if unavailable.
     Returns (segments, source) where segments = [{start, text}, ...].
+    With checkpoints, a failed Whisper attempt keeps its audio and finished
+    chunks for the retry.
     """
     video_id = video["video_id"]
 
@@ -27,7 +44,7 @@ async def get_transcript(video: dict) -> tuple[list[dict], str]:
         return segments, "youtube_captions"
 
     logger.info(f"No YouTube captions for {video_id}, falling back to Whisper")
-    segments = await _transcribe_with_whisper(video["url"])
+    segments = await _transcribe_with_whisper(video["url"], checkpoints)
     return segments, "whisper"
 
 
@@ -70,121 +87,467 @@ def _fetch_captions_sync(video_id: str) -> list[dict]:
     return segments
 
 
-async def _transcribe_with_whisper(url: str) -> list[dict]:
+# Step-by-step API for the staged worker, which runs each step in its own
+# stage so one video's download overlaps another's transcription.
+
+async def fetch_captions(video_id: str) -> Optional[list[dict]]:
+    """YouTube captions as [{start, text}, ...], or None if there are none."""
+    return await _fetch_youtube_captions(video_id)
+
+
+async def download_audio(url: str, checkpoints: Optional[Checkpoints] = None) -> str:
+    """Download the audio, or reuse the file an earlier attempt saved in checkpoints."""
+    if checkpoints is not None:
+        saved = checkpoints.get(AUDIO)
+        if saved and os.path.exists(saved):
+            logger.info(f"Reusing downloaded audio: {saved}")
+            return saved
+    audio_path = await asyncio.to_thread(_download_audio, url)
+    if checkpoints is not None:
+        await checkpoints.save(AUDIO, audio_path)
+    return audio_path
+
+
+async def prepare_audio(audio_path: str) -> Optional[list[dict]]:
+    """Split the audio for upload if the selected backend can't take it whole.
+
+    Returns the chunks for transcribe_audio(), or None when the file can be
+    transcribed as is.
+    """
+    if os.getenv("TRANSCRIPTION_BACKEND", "openai") != "openai":
+        return None
+    if os.path.getsize(audio_path) <= WHISPER_MAX_BYTES:
+        return None
+    return await run_cpu_bound(_split_audio, audio_path)
+
+
+async def transcribe_audio(audio_path: str, chunks: Optional[list[dict]] = None,
+                           checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Transcribe downloaded audio, using the chunks from prepare_audio() if any."""
+    if chunks:
+        return await _transcribe_chunks(get_openai_client(), chunks, checkpoints)
+    return await _whisper_transcribe(audio_path, checkpoints)
+
+
+def discard_audio(audio_path: str):
+    if os.path.exists(audio_path):
+        os.remove(audio_path)
+        logger.info(f"Cleaned up audio file: {audio_path}")
+
+
+async def _transcribe_with_whisper(url: str, checkpoints: Optional[Checkpoints] = None) -> list[dict]:
     """Download audio and transcribe with OpenAI Whisper API."""
-    audio_path = None
+    audio_path = await download_audio(url, checkpoints)
+    transcribed = False
     try:
-        audio_path = await asyncio.to_thread(_download_audio, url)
-        segments = await _whisper_transcribe(audio_path)
+        segments = await _whisper_transcribe(audio_path, checkpoints)
+        transcribed = True
         return segments
     finally:
-        if audio_path and os.path.exists(audio_path):
-            os.remove(audio_path)
-            logger.info(f"Cleaned up audio file: {audio_path}")
-
-
-def _download_audio(url: str) -> str:
-    """Download audio from YouTube video using yt-dlp."""
-    tmp_dir = tempfile.mkdtemp(prefix="yt_audio_")
-    output_path = os.path.join(tmp_dir, "audio.%(ext)s")
-
-    ydl_opts = {
+        # A checkpointed download is kept for the retry to resume from.
+        if transcribed or checkpoints is None:
+            discard_audio(audio_path)
+
+
+# yt-dlp options per AUDIO_PROFILE. Smaller files mean more videos fit in a
+# single Whisper request (25 MB limit) instead of taking the chunked path.
+_AUDIO_PROFILES = {
+    # Smallest audio stream YouTube offers (typically ~48 kbps Opus/AAC),
+    # kept in its original container: no re-encode at all.
+    "compact": {
+        "format": "worstaudio/bestaudio/best",
+    },
+    # Smallest stream, re-encoded to mono 16 kHz 24 kbps Opus (what Whisper
+    # resamples to anyway): roughly 0.18 MB per minute.
+    "speech": {
+        "format": "worstaudio/bestaudio/best",
+        "postprocessors": [{
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": "opus",
+            "preferredquality": "24",
+        }],
+        "postprocessor_args": {"extractaudio": ["-ac", "1", "-ar", "16000"]},
+    },
+    # Original behaviour: best stream re-encoded to 128 kbps MP3.
+    "mp3": {
         "format": "bestaudio/best",
-        "outtmpl": output_path,
         "postprocessors": [{
             "key": "FFmpegExtractAudio",
             "preferredcodec": "mp3",
             "preferredquality": "128",
         }],
+    },
+}
+
+# Extensions the Whisper API accepts, in order of preference when several exist.
+# .mp4 is what the compact profile keeps when a video only offers muxed streams
+# and its selector falls through to "best".
+_WHISPER_EXTENSIONS = (".mp3", ".m4a", ".ogg", ".webm", ".wav", ".mp4")
+
+
+def _download_options() -> dict:
+    profile = os.getenv("AUDIO_PROFILE", "compact")
+    if profile not in _AUDIO_PROFILES:
+        raise ValueError(f"Unknown AUDIO_PROFILE {profile!r}; expected one of {sorted(_AUDIO_PROFILES)}")
+    return {
+        **_AUDIO_PROFILES[profile],
         "quiet": True,
         "no_warnings": True,
     }
 
+
+def _download_audio(url: str) -> str:
+    """Download audio from YouTube video using yt-dlp."""
+    ydl_opts = _download_options()
+    tmp_dir = tempfile.mkdtemp(prefix="yt_audio_")
+    ydl_opts["outtmpl"] = os.path.join(tmp_dir, "audio.%(ext)s")
+
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         ydl.download([url])
 
-    mp3_path = os.path.join(tmp_dir, "audio.mp3")
-    if not os.path.exists(mp3_path):
-        for f in os.listdir(tmp_dir):
-            if f.endswith((".mp3", ".m4a", ".wav", ".ogg", ".webm")):
-                mp3_path = os.path.join(tmp_dir, f)
-                break
+    files = os.listdir(tmp_dir)
+    for f in files:
+        # Opus in an Ogg container; Whisper only recognises the .ogg extension.
+        if f.endswith(".opus"):
+            os.rename(os.path.join(tmp_dir, f), os.path.join(tmp_dir, f[:-len(".opus")] + ".ogg"))
+    files = os.listdir(tmp_dir)
 
-    if not os.path.exists(mp3_path):
-        raise FileNotFoundError(f"Audio file not found in {tmp_dir}")
+    for ext in _WHISPER_EXTENSIONS:
+        for f in files:
+            if f.endswith(ext):
+                return os.path.join(tmp_dir, f)
 
-    return mp3_path
+    raise FileNotFoundError(f"Audio file not found in {tmp_dir}")
 
 
-async def _whisper_transcribe(audio_path: str) -> list[dict]:
-    """Transcribe audio using OpenAI Whisper API with timestamps."""
-    client = OpenAI()
-    file_size = os.path.getsize(audio_path)
-    max_size = 25 * 1024 * 1024  # 25MB
+async def _whisper_transcribe(audio_path: str, checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Transcribe audio with the engine selected by TRANSCRIPTION_BACKEND."""
+    backend = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+    if backend not in _TRANSCRIPTION_BACKENDS:
+        raise ValueError(
+            f"Unknown TRANSCRIPTION_BACKEND {backend!r}; expected one of {sorted(_TRANSCRIPTION_BACKENDS)}"
+        )
+    return await _TRANSCRIPTION_BACKENDS[backend](audio_path, checkpoints)
+
 
-    if file_size <= max_size:
+async def _openai_transcribe(audio_path: str, checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Transcribe audio using OpenAI Whisper API with timestamps."""
+    client = get_openai_client()
+    if os.path.getsize(audio_path) <= WHISPER_MAX_BYTES:
         return await _whisper_single_file(client, audio_path)
     else:
-        return await _whisper_chunked(client, audio_path)
+        return await _whisper_chunked(client, audio_path, checkpoints)
 
 
-async def _whisper_single_file(client: OpenAI, audio_path: str) -> list[dict]:
+async def _whisper_single_file(client: AsyncOpenAI, audio_path: str) -> list[dict]:
     """Transcribe a single audio file with Whisper."""
-    def _transcribe():
-        with open(audio_path, "rb") as audio_file:
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
-            )
-        segments = []
-        for seg in response.segments:
-            segments.append({
-                "start": round(seg["start"], 1),
-                "text": seg["text"].strip(),
+    return await _transcribe_chunk(client, audio_path, 0.0)
+
+
+async def _whisper_chunked(client: AsyncOpenAI, audio_path: str,
+                           checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Split audio into chunks and transcribe them concurrently with Whisper."""
+    chunks = await run_cpu_bound(_split_audio, audio_path)
+    return await _transcribe_chunks(client, chunks, checkpoints)
+
+
+async def _transcribe_chunks(client: AsyncOpenAI, chunks: list[dict],
+                             checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Transcribe pre-split chunks concurrently, then delete the chunk files.
+
+    Each chunk carries the absolute start time of its audio, so segments are
+    placed correctly no matter which request finishes first. Chunks may
+    overlap; each keeps only the segments that start inside its own
+    [keep_from, keep_until) range, which drops the duplicates. With
+    checkpoints, each finished chunk is saved and a retry skips it (the
+    split of the same audio file is deterministic).
+    """
+    concurrency = max(1, int(os.getenv("WHISPER_CHUNK_CONCURRENCY", "4")))
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def transcribe(chunk: dict) -> list[dict]:
+            name = f"whisper:{chunk['keep_from']:g}-{chunk['keep_until']:g}"
+            saved = checkpoints.get(name) if checkpoints is not None else None
+            if saved is not None:
+                return json.loads(saved)
+            async with semaphore:
+                segments = await _transcribe_chunk(client, chunk["path"], chunk["offset"])
+            kept = [seg for seg in segments if chunk["keep_from"] <= seg["start"] < chunk["keep_until"]]
+            if checkpoints is not None:
+                await checkpoints.save(name, json.dumps(kept))
+            return kept
+
+        resumed = checkpoints.count("whisper:") if checkpoints is not None else 0
+        logger.info(f"Transcribing {len(chunks)} chunks with up to {concurrency} in parallel"
+                    + (f" ({resumed} already done)" if resumed else ""))
+        results = await asyncio.gather(*(transcribe(chunk) for chunk in chunks))
+    finally:
+        discard_chunks(chunks)
+
+    return [seg for chunk_segments in results for seg in chunk_segments]
+
+
+def discard_chunks(chunks: list[dict]):
+    for chunk in chunks:
+        if os.path.exists(chunk["path"]):
+            os.remove(chunk["path"])
+
+
+# Length of each window in the loudness envelope used to place chunk cuts.
+ENVELOPE_WINDOW_SECONDS = 0.1
+
+
+def _split_audio(audio_path: str) -> list[dict]:
+    """Cut the audio into chunks whose boundaries fall in the quietest nearby spot.
+
+    Returns dicts with `path`, `offset` (absolute start of the chunk's audio)
+    and the `keep_from`/`keep_until` range whose segments the chunk owns.
+    Falls back to fixed-length cuts if the loudness envelope can't be read.
+    """
+    target = float(os.getenv("WHISPER_CHUNK_SECONDS", "300"))
+    search = float(os.getenv("WHISPER_CHUNK_SEARCH_SECONDS", "30"))
+    overlap = float(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "1"))
+
+    try:
+        envelope = _audio_envelope(audio_path)
+    except Exception as e:
+        logger.warning(f"Could not analyse loudness of {audio_path}, using fixed cuts: {e}")
+        envelope = []
+    if not envelope:
+        return _split_audio_fixed(audio_path, int(target))
+
+    total = envelope[-1][0] + ENVELOPE_WINDOW_SECONDS
+    plan = _plan_chunks(envelope, total, target, search, overlap)
+    ext = os.path.splitext(audio_path)[1] or ".mp3"
+    chunks = []
+    try:
+        for i, planned in enumerate(plan):
+            chunk_path = audio_path + f".chunk{i:03d}{ext}"
+            subprocess.run([
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+                "-ss", f"{planned['start']:.3f}", "-t", f"{planned['end'] - planned['start']:.3f}",
+                "-i", audio_path, "-map", "0:a", "-c", "copy", chunk_path,
+            ], check=True, capture_output=True)
+            chunks.append({
+                "path": chunk_path,
+                "offset": planned["start"],
+                "keep_from": planned["keep_from"],
+                "keep_until": planned["keep_until"],
             })
-        return segments
+    except Exception:
+        _remove_chunk_files(audio_path)
+        raise
+    return chunks
+
 
-    return await asyncio.to_thread(_transcribe)
+def _audio_envelope(audio_path: str) -> list[tuple[float, float]]:
+    """Stream a downsampled loudness envelope: (window start seconds, RMS dBFS) pairs.
+
+    ffmpeg decodes to 8 kHz mono and reports the RMS level of each
+    ENVELOPE_WINDOW_SECONDS window; we read its output line by line, so the
+    decoded audio never sits in memory.
+    """
+    samples_per_window = int(8000 * ENVELOPE_WINDOW_SECONDS)
+    audio_filter = (
+        "aresample=8000,aformat=channel_layouts=mono,"
+        f"asetnsamples=n={samples_per_window}:p=0,"
+        "astats=metadata=1:reset=1,"
+        "ametadata=mode=print:key=lavfi.astats.Overall.RMS_level:file=-"
+    )
+    cmd = [
+        FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+        "-i", audio_path, "-af", audio_filter, "-f", "null", "-",
+    ]
+    envelope = []
+    window_start = None
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+        for line in proc.stdout:
+            if line.startswith("frame:"):
+                window_start = float(line.rsplit("pts_time:", 1)[1])
+            elif line.startswith("lavfi.astats.Overall.RMS_level=") and window_start is not None:
+                envelope.append((window_start, float(line.split("=", 1)[1])))
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+    return envelope
+
+
+def _plan_chunks(envelope: list[tuple[float, float]], total_seconds: float,
+                 target_seconds: float, search_seconds: float,
+                 overlap_seconds: float) -> list[dict]:
+    """Choose cut points about `target_seconds` apart, each snapped to the quietest
+    envelope window within `search_seconds` of its ideal position.
+
+    Every chunk's audio is padded by `overlap_seconds` on both sides, while its
+    keep range runs exactly from one cut to the next. No chunk is shorter than
+    half the target, even when `search_seconds` reaches back past the last cut.
+    """
+    cuts = [0.0]
+    while total_seconds - cuts[-1] > target_seconds + search_seconds:
+        ideal = cuts[-1] + target_seconds
+        earliest = max(ideal - search_seconds, cuts[-1] + target_seconds / 2)
+        candidates = [
+            (level, abs(start - ideal), start)
+            for start, level in envelope
+            if earliest <= start <= ideal + search_seconds
+        ]
+        if candidates:
+            cuts.append(min(candidates)[2] + ENVELOPE_WINDOW_SECONDS / 2)
+        else:
+            cuts.append(ideal)
+    cuts.append(total_seconds)
+
+    plan = []
+    for i in range(len(cuts) - 1):
+        is_last = i == len(cuts) - 2
+        plan.append({
+            "start": max(0.0, cuts[i] - overlap_seconds),
+            "end": min(total_seconds, cuts[i + 1] + overlap_seconds),
+            "keep_from": cuts[i],
+            "keep_until": float("inf") if is_last else cuts[i + 1],
+        })
+    return plan
 
 
-async def _whisper_chunked(client: OpenAI, audio_path: str) -> list[dict]:
-    """Split audio into chunks and transcribe each with Whisper."""
-    from pydub import AudioSegment
+def _split_audio_fixed(audio_path: str, chunk_seconds: int = 10 * 60) -> list[dict]:
+    """Cut the audio into ~chunk_seconds pieces with no overlap.
 
-    def _split_and_transcribe():
-        audio = AudioSegment.from_file(audio_path)
-        chunk_duration_ms = 10 * 60 * 1000  # 10 minutes per chunk
+    Uses ffmpeg's segment muxer with stream copy, so the compressed file is
+    split at packet boundaries without ever being decoded to PCM. Memory use
+    stays flat no matter how long the video is.
+    """
+    directory = os.path.dirname(audio_path)
+    ext = os.path.splitext(audio_path)[1] or ".mp3"
+    pattern = audio_path + ".chunk%03d" + ext
+    list_path = audio_path + ".chunks.csv"
+
+    cmd = [
+        FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+        "-i", audio_path,
+        "-map", "0:a", "-c", "copy",
+        "-f", "segment", "-segment_time", str(chunk_seconds), "-reset_timestamps", "1",
+        "-segment_list", list_path, "-segment_list_type", "csv",
+        pattern,
+    ]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
         chunks = []
-        for i in range(0, len(audio), chunk_duration_ms):
-            chunks.append(audio[i:i + chunk_duration_ms])
-
-        all_segments = []
-        offset_seconds = 0.0
-
-        for i, chunk in enumerate(chunks):
-            chunk_path = audio_path + f".chunk{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            try:
-                with open(chunk_path, "rb") as f:
-                    response = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=f,
-                        response_format="verbose_json",
-                        timestamp_granularities=["segment"],
-                    )
-                for seg in response.segments:
-                    all_segments.append({
-                        "start": round(seg["start"] + offset_seconds, 1),
-                        "text": seg["text"].strip(),
-                    })
-            finally:
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
-
-            offset_seconds += chunk.duration_seconds
-
-        return all_segments
-
-    return await asyncio.to_thread(_split_and_transcribe)
+        with open(list_path, newline="") as f:
+            for name, start, end in csv.reader(f):
+                chunks.append({
+                    "path": os.path.join(directory, name),
+                    "offset": float(start),
+                    "keep_from": float(start),
+                    "keep_until": float(end),
+                })
+        if chunks:
+            chunks[0]["keep_from"] = 0.0
+            chunks[-1]["keep_until"] = float("inf")
+        return chunks
+    except Exception:
+        _remove_chunk_files(audio_path)
+        raise
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
+
+
+def _remove_chunk_files(audio_path: str):
+    for leftover in glob.glob(glob.escape(audio_path + ".chunk") + "*"):
+        os.remove(leftover)
+
+
+async def _transcribe_chunk(client: AsyncOpenAI, chunk_path: str, offset_seconds: float) -> list[dict]:
+    # Passing a Path lets the SDK read the file off the event loop.
+    response = await call_with_rate_limit("whisper", 0, lambda: client.audio.transcriptions.create(
+        model="whisper-1",
+        file=Path(chunk_path),
+        response_format="verbose_json",
+        timestamp_granularities=["segment"],
+    ))
+    segments = []
+    for seg in response.segments:
+        segments.append({
+            "start": round(seg.start + offset_seconds, 1),
+            "text": seg.text.strip(),
+        })
+    return segments
+
+
+# Local faster-whisper engine. The model runs in worker processes so decoding
+# and inference never compete with the event loop for the GIL; each worker
+# loads the model once and keeps it for the life of the process.
+_local_pool: Optional[ProcessPoolExecutor] = None
+_local_model = None
+
+
+def start_local_backend():
+    """Start the local transcription processes if TRANSCRIPTION_BACKEND=local. Called from the app lifespan."""
+    if os.getenv("TRANSCRIPTION_BACKEND", "openai") == "local":
+        _get_local_pool()
+
+
+def _get_local_pool() -> ProcessPoolExecutor:
+    """The local transcription pool; started on demand in scripts and tests that skip the lifespan."""
+    global _local_pool
+    if _local_pool is None:
+        workers = max(1, int(os.getenv("LOCAL_WHISPER_WORKERS", "1")))
+        _local_pool = create_process_pool(workers)
+        logger.info(f"Started local transcription pool with {workers} process(es)")
+    return _local_pool
+
+
+def shutdown_local_backend():
+    """Stop the local transcription processes, if any were started."""
+    global _local_pool
+    if _local_pool is not None:
+        _local_pool.shutdown(wait=False, cancel_futures=True)
+        _local_pool = None
+
+
+async def _local_transcribe(audio_path: str, checkpoints: Optional[Checkpoints] = None) -> list[dict]:
+    """Transcribe audio on this machine with faster-whisper.
+
+    No size limit applies, so the file is transcribed in one pass (with
+    nothing to checkpoint); the engine handles long audio with its own
+    sliding window.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_local_pool(), _local_transcribe_file, audio_path)
+
+
+def _load_local_model():
+    global _local_model
+    if _local_model is None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "TRANSCRIPTION_BACKEND=local requires faster-whisper (pip install faster-whisper)"
+            ) from e
+        _local_model = WhisperModel(
+            os.getenv("LOCAL_WHISPER_MODEL", "base"),
+            device="cpu",
+            compute_type=os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("LOCAL_WHISPER_THREADS", "0")),
+        )
+    return _local_model
+
+
+def _local_transcribe_file(audio_path: str) -> list[dict]:
+    """Runs inside a pool process."""
+    model = _load_local_model()
+    segments, _info = model.transcribe(audio_path, vad_filter=True)
+    return [
+        {"start": round(seg.start, 1), "text": seg.text.strip()}
+        for seg in segments
+    ]
+
+
+# Transcription engines selectable with TRANSCRIPTION_BACKEND. Each takes the
+# path of a downloaded audio file and the video's checkpoints (or None) and
+# returns [{start, text}, ...].
+_TRANSCRIPTION_BACKENDS = {
+    "openai": _openai_transcribe,
+    "local": _local_transcribe,
+}
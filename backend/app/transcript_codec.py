@@ -0,0 +1,104 @@
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Union
+
+try:
+    import zstandard
+except ImportError:  # in requirements.txt; without it transcripts are stored uncompressed
+    zstandard = None
+
+# Stored transcript layout: a header (magic, format version, codec, segment
+# count) followed by the payload, compressed as a whole by the codec. The
+# payload is the starts as little-endian float32, then the end offset of each
+# segment's text (in characters) as uint32, then all texts concatenated as
+# UTF-8. Decoding is one decompress, one UTF-8 decode and a string slice per
+# segment, instead of parsing a JSON object per segment.
+_MAGIC = b"YTTS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBI")
+_CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+_CODEC_NAMES = {value: name for name, value in _CODECS.items()}
+
+# The transcriber rounds starts to 0.1 s, which float32 holds closely enough
+# to restore exactly for any start under ~12 days. Decoding multiplies by this
+# instead of calling round(start, 1), which costs as much as the rest of the
+# decode put together.
+_START_STEPS_PER_SECOND = 10
+
+
+def encode_segments(segments: list[dict]) -> bytes:
+    """Pack [{"start", "text"}, ...] into the compact stored form."""
+    starts = array("f", (seg["start"] for seg in segments))
+    ends = array("I")
+    end = 0
+    for seg in segments:
+        end += len(seg["text"])
+        ends.append(end)
+    if sys.byteorder == "big":
+        starts.byteswap()
+        ends.byteswap()
+    payload = starts.tobytes() + ends.tobytes() + "".join(seg["text"] for seg in segments).encode("utf-8")
+    codec = _codec()
+    return _HEADER.pack(_MAGIC, _VERSION, _CODECS[codec], len(segments)) + _compress(codec, payload)
+
+
+def decode_segments(data: Union[bytes, str]) -> list[dict]:
+    """Unpack a stored transcript; JSON text from before the binary format is still accepted."""
+    if isinstance(data, str):
+        return json.loads(data)
+    magic, version, codec, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Unknown transcript format: {bytes(data[:5])!r}")
+    payload = _decompress(_CODEC_NAMES[codec], memoryview(data)[_HEADER.size:])
+    starts = array("f")
+    starts.frombytes(payload[:4 * count])
+    ends = array("I")
+    ends.frombytes(payload[4 * count:8 * count])
+    if sys.byteorder == "big":
+        starts.byteswap()
+        ends.byteswap()
+    text = payload[8 * count:].decode("utf-8")
+    begins = [0, *ends[:-1]] if count else []
+    steps = _START_STEPS_PER_SECOND
+    return [
+        {"start": int(start * steps + 0.5) / steps, "text": text[begin:end]}
+        for start, begin, end in zip(starts, begins, ends)
+    ]
+
+
+def transcript_text(segments: list[dict]) -> str:
+    """The plain-text transcript. It is derived when needed rather than stored."""
+    return " ".join(seg["text"] for seg in segments)
+
+
+def _codec() -> str:
+    codec = os.getenv("TRANSCRIPT_COMPRESSION", "zstd")
+    if codec not in _CODECS:
+        raise ValueError(f"Unknown TRANSCRIPT_COMPRESSION: {codec}")
+    if codec == "zstd" and zstandard is None:
+        # zlib would shrink rows further, but decodes slower than the JSON
+        # this format replaced; uncompressed still halves the size.
+        return "none"
+    return codec
+
+
+def _compress(codec: str, payload: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    if codec == "zlib":
+        return zlib.compress(payload, 6)
+    return payload
+
+
+def _decompress(codec: str, payload: memoryview) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This transcript is zstd-compressed and needs zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    return bytes(payload)
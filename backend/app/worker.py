@@ -1,71 +1,263 @@
 import asyncio
 import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 _worker_running = False
+_job_available: Optional[asyncio.Event] = None
+
+# Stages of the staged worker in order: (name, pipeline function, env var for
+# how many jobs it runs at once, default). Each kind of work gets its own
+# concurrency so one video can download while another is transcribed.
+_STAGES = (
+    ("download", "fetch_stage", "STAGE_DOWNLOAD_CONCURRENCY", 2),
+    ("transcode", "transcode_stage", "STAGE_TRANSCODE_CONCURRENCY", 1),
+    ("transcribe", "transcribe_stage", "STAGE_TRANSCRIBE_CONCURRENCY", 2),
+    ("summarize", "summarize_stage", "STAGE_SUMMARIZE_CONCURRENCY", 2),
+)
+
+# Per-stage queues and in-flight counts while the staged worker runs.
+_stage_queues: dict[str, asyncio.Queue] = {}
+_stage_active: dict[str, int] = {}
+
+# Videos claimed by this worker and not yet finished (completed, requeued or
+# failed); stop_worker puts them back in the queue.
+_unfinished: set[int] = set()
+
+
+def notify_worker():
+    """Wake idle workers immediately because a job was queued."""
+    if _job_available is not None:
+        _job_available.set()
+
+
+async def _wait_for_job(timeout: float):
+    """Sleep until notify_worker() is called or the fallback poll interval elapses."""
+    if _job_available is None:
+        await asyncio.sleep(timeout)
+        return
+    try:
+        await asyncio.wait_for(_job_available.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+def pipeline_stats() -> dict:
+    """Queue depth and in-flight jobs per stage; empty unless WORKER_MODE=staged."""
+    return {
+        name: {
+            "queued": queue.qsize(),
+            "capacity": queue.maxsize,
+            "active": _stage_active[name],
+        }
+        for name, queue in _stage_queues.items()
+    }
 
 
 async def start_worker() -> asyncio.Task:
-    global _worker_running
+    global _worker_running, _job_available
+    mode = os.getenv("WORKER_MODE", "serial")
+    if mode not in ("serial", "staged"):
+        raise ValueError(f"Unknown WORKER_MODE {mode!r}; expected 'serial' or 'staged'")
     _worker_running = True
-    task = asyncio.create_task(_worker_loop())
-    logger.info("Background worker started")
+    _job_available = asyncio.Event()
+    if mode == "staged":
+        task = asyncio.create_task(_run_stages())
+        logger.info("Background worker started in staged mode")
+    else:
+        concurrency = max(1, int(os.getenv("WORKER_CONCURRENCY", "2")))
+        task = asyncio.create_task(_run_workers(concurrency))
+        logger.info(f"Background worker started with {concurrency} concurrent worker(s)")
     return task
 
 
 async def stop_worker(task: asyncio.Task):
-    global _worker_running
+    global _worker_running, _job_available
     _worker_running = False
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
         pass
+    _job_available = None
+    _stage_queues.clear()
+    _stage_active.clear()
+    await _requeue_unfinished()
     logger.info("Background worker stopped")
 
 
-async def _worker_loop():
-    """Placeholder worker loop — will be implemented in task group 6."""
-    from app.pipeline import process_video
-    from app.database import get_next_queued_video, update_video
-    import os
+async def _requeue_unfinished():
+    """Return videos interrupted by shutdown to the queue so the next start picks them up."""
+    from app.database import requeue_videos
+
+    video_ids = sorted(_unfinished)
+    _unfinished.clear()
+    if not video_ids:
+        return
+    try:
+        requeued = await requeue_videos(video_ids)
+        logger.info(f"Requeued {requeued} unfinished video(s)")
+    except Exception as e:
+        logger.error(f"Could not requeue unfinished videos {video_ids}: {e}")
+
+
+async def _run_workers(concurrency: int):
+    """Run `concurrency` worker loops side by side until cancelled."""
+    await asyncio.gather(*(_worker_loop(i) for i in range(concurrency)))
+
+
+def _next_attempt_at(attempt: int, base_delay: float, max_delay: float) -> str:
+    """Exponential backoff with jitter: base * 2^(attempt-1), +/-20%, capped."""
+    delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
+    delay *= random.uniform(0.8, 1.2)
+    return (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+
+
+async def _handle_failure(video: dict, error: Exception):
+    """Requeue a failed video with backoff, or mark it failed once out of retries.
+
+    A requeued video keeps its checkpoints, so the retry resumes where this
+    attempt failed.
+    """
+    from app.checkpoints import discard_checkpoints
+    from app.database import update_video
 
-    poll_interval = int(os.getenv("WORKER_POLL_INTERVAL", "5"))
     max_retries = int(os.getenv("MAX_RETRY_ATTEMPTS", "3"))
     retry_delay = int(os.getenv("RETRY_DELAY_SECONDS", "30"))
+    max_retry_delay = int(os.getenv("RETRY_MAX_DELAY_SECONDS", "900"))
+
+    attempt = video["attempt_count"] + 1
+    if attempt < max_retries:
+        logger.warning(f"Video {video['id']} failed (attempt {attempt}), will retry: {error}")
+        requeued = await update_video(
+            video["id"],
+            status="queued",
+            attempt_count=attempt,
+            error_message=str(error),
+            next_attempt_at=_next_attempt_at(attempt, retry_delay, max_retry_delay),
+        )
+        if requeued is None:
+            # Deleted while processing: no retry will use the audio it kept.
+            await discard_checkpoints(video["id"])
+    else:
+        logger.error(f"Video {video['id']} permanently failed after {attempt} attempts: {error}")
+        await update_video(
+            video["id"],
+            status="failed",
+            attempt_count=attempt,
+            error_message=str(error),
+        )
+        await discard_checkpoints(video["id"])
+
+
+async def _worker_loop(worker_id: int = 0):
+    """Claim queued videos one at a time and run them through the pipeline."""
+    from app.pipeline import process_video
+    from app.database import claim_next_queued_video
+
+    poll_interval = int(os.getenv("WORKER_POLL_INTERVAL", "30"))
 
     while _worker_running:
         try:
-            video = await get_next_queued_video()
+            # Clear before claiming so a notification that arrives between the
+            # claim and the wait is not lost.
+            if _job_available is not None:
+                _job_available.clear()
+            video = await claim_next_queued_video()
             if video is None:
-                await asyncio.sleep(poll_interval)
+                await _wait_for_job(poll_interval)
                 continue
 
-            await update_video(video["id"], status="processing")
+            logger.info(f"Worker {worker_id} claimed video {video['id']}")
+            _unfinished.add(video["id"])
             try:
                 await process_video(video)
             except Exception as e:
-                attempt = video["attempt_count"] + 1
-                if attempt < max_retries:
-                    logger.warning(f"Video {video['id']} failed (attempt {attempt}), will retry: {e}")
-                    await update_video(
-                        video["id"],
-                        status="queued",
-                        attempt_count=attempt,
-                        error_message=str(e),
-                    )
-                    await asyncio.sleep(retry_delay)
-                else:
-                    logger.error(f"Video {video['id']} permanently failed after {attempt} attempts: {e}")
-                    await update_video(
-                        video["id"],
-                        status="failed",
-                        attempt_count=attempt,
-                        error_message=str(e),
-                    )
+                await _handle_failure(video, e)
+            _unfinished.discard(video["id"])
         except asyncio.CancelledError:
             break
         except Exception as e:
             logger.exception(f"Worker loop error: {e}")
             await asyncio.sleep(poll_interval)
+
+
+async def _run_stages():
+    """Run the pipeline as stages joined by bounded queues until cancelled.
+
+    A feeder claims videos into the first queue; each stage runs its own
+    number of jobs at once and hands them on. When a queue is full the stage
+    before it waits, so no more videos are claimed than the stages can hold.
+    """
+    import app.pipeline as pipeline
+
+    queue_size = max(1, int(os.getenv("STAGE_QUEUE_SIZE", "2")))
+    for name, _, _, _ in _STAGES:
+        _stage_queues[name] = asyncio.Queue(maxsize=queue_size)
+        _stage_active[name] = 0
+
+    loops = [_feed_stages(_stage_queues[_STAGES[0][0]])]
+    for i, (name, func_name, env_var, default) in enumerate(_STAGES):
+        outbox = _stage_queues[_STAGES[i + 1][0]] if i + 1 < len(_STAGES) else None
+        concurrency = max(1, int(os.getenv(env_var, str(default))))
+        stage = getattr(pipeline, func_name)
+        loops.extend(_stage_loop(name, stage, _stage_queues[name], outbox) for _ in range(concurrency))
+    try:
+        await asyncio.gather(*loops)
+    finally:
+        # Jobs still waiting between stages may hold downloaded audio; their
+        # videos are requeued by stop_worker.
+        for queue in _stage_queues.values():
+            while not queue.empty():
+                pipeline.discard_job(queue.get_nowait())
+
+
+async def _feed_stages(first_queue: asyncio.Queue):
+    from app.database import claim_next_queued_video
+    from app.pipeline import new_job
+
+    poll_interval = int(os.getenv("WORKER_POLL_INTERVAL", "30"))
+
+    while _worker_running:
+        try:
+            if _job_available is not None:
+                _job_available.clear()
+            video = await claim_next_queued_video()
+            if video is None:
+                await _wait_for_job(poll_interval)
+                continue
+            logger.info(f"Feeding video {video['id']} into the pipeline")
+            _unfinished.add(video["id"])
+            await first_queue.put(new_job(video))
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.exception(f"Pipeline feeder error: {e}")
+            await asyncio.sleep(poll_interval)
+
+
+async def _stage_loop(name: str, stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+    from app.pipeline import discard_job
+
+    while True:
+        job = await inbox.get()
+        _stage_active[name] += 1
+        try:
+            await stage(job)
+        except Exception as e:
+            discard_job(job)
+            job["done"] = True
+            try:
+                await _handle_failure(job["video"], e)
+            except Exception as handler_error:
+                logger.exception(f"Could not record failure of video {job['video']['id']}: {handler_error}")
+        finally:
+            _stage_active[name] -= 1
+        if outbox is None or job["done"]:
+            _unfinished.discard(job["video"]["id"])
+        else:
+            await outbox.put(job)
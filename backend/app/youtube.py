@@ -1,4 +1,9 @@
+import copy
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 from urllib.parse import parse_qs, urlparse
 
@@ -25,19 +30,94 @@ def extract_video_id(url: str) -> Optional[str]:
     return None
 
 
+class MetadataCache:
+    """Thread-safe LRU cache of video metadata with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+metadata_cache = MetadataCache(
+    max_entries=int(os.getenv("METADATA_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("METADATA_CACHE_TTL_SECONDS", "3600")),
+)
+
+_METADATA_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+}
+
+# YoutubeDL instances are not safe to share across threads, so each worker
+# thread (asyncio.to_thread pool) builds one on first use and keeps it.
+_thread_local = threading.local()
+
+
+def _get_metadata_extractor() -> yt_dlp.YoutubeDL:
+    ydl = getattr(_thread_local, "metadata_ydl", None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(_METADATA_OPTS)
+        _thread_local.metadata_ydl = ydl
+    return ydl
+
+
 def fetch_video_metadata(url: str) -> dict:
-    """Fetch video title and duration using yt-dlp (no download)."""
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "skip_download": True,
-    }
+    """Fetch video title and duration using yt-dlp (no download).
+
+    Results are cached by YouTube video ID, so the same video submitted via a
+    different URL form, or re-submitted after deletion, skips the network.
+    """
+    yt_id = extract_video_id(url)
+    if yt_id is not None:
+        cached = metadata_cache.get(yt_id)
+        if cached is not None:
+            return cached
+
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return {
-                "title": info.get("title"),
-                "duration": info.get("duration"),
-            }
+        info = _get_metadata_extractor().extract_info(url, download=False)
+        meta = {
+            "title": info.get("title"),
+            "duration": info.get("duration"),
+        }
     except Exception as e:
         return {"title": None, "duration": None, "error": str(e)}
+
+    if yt_id is not None:
+        metadata_cache.put(yt_id, meta)
+    return meta
@@ -0,0 +1,118 @@
+"""Measure API latency while a long video's CPU-heavy steps run.
+
+Requests GET /api/videos back to back while, in the same process, the
+pipeline repeatedly runs the CPU-bound steps of a long video: splitting its
+audio into Whisper chunks (if ffmpeg is available) and encoding its
+transcript for storage. Three placements of that work are compared:
+
+    before   audio split in a thread, transcript encoded on the event loop
+             (how the pipeline ran before the CPU pool existed)
+    thread   both steps in asyncio.to_thread, sharing the GIL with the loop
+    process  both steps in the CPU pool started in the app lifespan
+
+Usage (from backend/):
+    python -m benchmarks.api_latency [--segments 200000] [--audio-minutes 10] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+import app.cpu as cpu
+import app.database as db_module
+from app.main import app
+from app.transcriber import FFMPEG_BINARY, _remove_chunk_files, _split_audio
+from app.transcript_codec import encode_segments
+
+
+def _split_and_discard(audio_path: str) -> None:
+    _split_audio(audio_path)
+    _remove_chunk_files(audio_path)
+
+
+async def _background(mode: str, segments, audio_path, stop: asyncio.Event) -> int:
+    """Process the same long video over and over; returns how many times it finished."""
+    rounds = 0
+    while not stop.is_set():
+        if audio_path:
+            if mode == "before":
+                await asyncio.to_thread(_split_and_discard, audio_path)
+            else:
+                await cpu.run_cpu_bound(_split_and_discard, audio_path)
+        if mode == "before":
+            encode_segments(segments)
+            await asyncio.sleep(0)
+        else:
+            await cpu.run_cpu_bound(encode_segments, segments)
+        rounds += 1
+    return rounds
+
+
+async def _measure(mode: str, segments, audio_path, seconds: float) -> tuple[list[float], int]:
+    if mode == "process":
+        cpu.start_cpu_pool(workers=1)
+    stop = asyncio.Event()
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            background = asyncio.create_task(_background(mode, segments, audio_path, stop))
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/videos", params={"limit": 20})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+            stop.set()
+            rounds = await background
+    finally:
+        cpu.shutdown_cpu_pool()
+    return latencies, rounds
+
+
+def _make_audio(path: str, minutes: int):
+    subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+         "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+         "-c:a", "libopus", "-b:a", "24k", path],
+        check=True,
+    )
+
+
+async def main(segment_count: int, audio_minutes: int, seconds: float):
+    segments = [{"start": i * 0.5, "text": f"segment number {i} of a very long stream"} for i in range(segment_count)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        for i in range(20):
+            await db_module.create_video(url=f"https://youtu.be/bench{i:06d}", video_id=f"bench{i:06d}")
+
+        audio_path = None
+        if audio_minutes and shutil.which(FFMPEG_BINARY):
+            audio_path = os.path.join(tmp, "audio.ogg")
+            _make_audio(audio_path, audio_minutes)
+        print(f"transcript: {segment_count} segments; audio: "
+              f"{f'{audio_minutes} min' if audio_path else 'skipped (no ffmpeg)'}")
+
+        print(f"{'mode':>8} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'rounds':>7}")
+        for mode in ("before", "thread", "process"):
+            latencies, rounds = await _measure(mode, segments, audio_path, seconds)
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{mode:>8} {len(latencies):>9} {statistics.median(latencies) * 1000:8.2f} "
+                  f"{p99 * 1000:8.2f} {latencies[-1] * 1000:8.2f} {rounds:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200_000)
+    parser.add_argument("--audio-minutes", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.segments, args.audio_minutes, args.seconds))
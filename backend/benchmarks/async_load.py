@@ -0,0 +1,116 @@
+"""Threads and memory with hundreds of LLM calls in flight, to_thread vs. async.
+
+Starts the mock OpenAI server in its own process, so its threads are not
+counted. Then it fires N concurrent summary completions, first the way the
+pipeline used to, with a blocking OpenAI client call inside asyncio.to_thread.
+After that it goes through summarizer._complete_json on the shared
+AsyncOpenAI client. Each mode runs in a fresh child process. A sampler
+records peak threading.active_count() and peak RSS growth over the
+process's idle baseline.
+
+Usage (from backend/):
+    python -m benchmarks.async_load [--calls 100 300] [--delay 0.2]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+PROMPT = "[00:00] (0.0s) " + "word " * 500
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def _sample(peak: dict, stop: asyncio.Event):
+    while not stop.is_set():
+        peak["threads"] = max(peak["threads"], threading.active_count())
+        peak["rss"] = max(peak["rss"], _rss_mb())
+        await asyncio.sleep(0.01)
+
+
+async def _thread_calls(calls: int):
+    from openai import OpenAI
+    from app.summarizer import SUMMARY_MODEL, SYSTEM_PROMPT
+
+    client = OpenAI()
+
+    def create():
+        response = client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": PROMPT}],
+            response_format={"type": "json_object"},
+        )
+        return response.choices[0].message.content
+
+    try:
+        await asyncio.gather(*(asyncio.to_thread(create) for _ in range(calls)))
+    finally:
+        client.close()
+
+
+async def _async_calls(calls: int):
+    from app.openai_client import close_openai_client, get_openai_client
+    from app.summarizer import SYSTEM_PROMPT, _complete_json
+
+    client = get_openai_client()
+    try:
+        await asyncio.gather(*(_complete_json(client, SYSTEM_PROMPT, PROMPT) for _ in range(calls)))
+    finally:
+        await close_openai_client()
+
+
+async def _measure(mode: str, calls: int):
+    # Import everything up front so module loading isn't counted as load.
+    import app.summarizer  # noqa: F401
+    import openai  # noqa: F401
+
+    baseline = {"threads": threading.active_count(), "rss": _rss_mb()}
+    peak = dict(baseline)
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample(peak, stop))
+    started = time.perf_counter()
+    await (_thread_calls if mode == "thread" else _async_calls)(calls)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    print(f"{mode:>7} {calls:>6} {elapsed:8.2f} {calls / elapsed:8.1f} "
+          f"{baseline['threads']:>6} -> {peak['threads']:<6} {peak['rss'] - baseline['rss']:10.1f}")
+
+
+def main(calls_levels: list[int], delay: float):
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.mock_openai", "--delay", str(delay)],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        base_url = server.stdout.readline().strip()
+        env = dict(os.environ, OPENAI_BASE_URL=base_url, LLM_CACHE_MAX_BYTES="0",
+                   OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "sk-benchmark"))
+        print(f"mock server {base_url} in pid {server.pid}, {delay * 1000:.0f} ms per request, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'mode':>7} {'calls':>6} {'seconds':>8} {'calls/s':>8} {'threads':>16} {'+RSS MB':>10}")
+        for calls in calls_levels:
+            # Let the async client open one connection per in-flight call.
+            env["OPENAI_MAX_CONNECTIONS"] = env["OPENAI_MAX_KEEPALIVE_CONNECTIONS"] = str(calls)
+            for mode in ("thread", "async"):
+                subprocess.run([sys.executable, "-m", "benchmarks.async_load", "--child", mode,
+                                "--calls", str(calls)], env=env, check=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--delay", type=float, default=0.2, help="server-side seconds per request")
+    parser.add_argument("--child", choices=("thread", "async"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(_measure(args.child, args.calls[0]))
+    else:
+        main(args.calls, args.delay)
@@ -0,0 +1,80 @@
+"""Measure peak memory of splitting long audio files into Whisper chunks.
+
+Generates synthetic 128 kbps stereo MP3s of increasing length with ffmpeg,
+then splits each in a fresh process and reports the peak RSS of that process
+and of its ffmpeg child. With stream-copy segmentation, peak RSS should not
+grow with the length of the audio. If pydub is installed, the old
+decode-everything approach is measured too for comparison (pydub also
+needs ffprobe).
+
+Usage (from backend/, requires ffmpeg on PATH or FFMPEG_BINARY):
+    python -m benchmarks.chunk_memory [--minutes 30 90 180]
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+
+from app.transcriber import FFMPEG_BINARY, _split_audio
+
+
+def _make_audio(path: str, minutes: int):
+    subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+         "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+         "-ac", "2", "-ar", "44100", "-b:a", "128k", path],
+        check=True,
+    )
+
+
+def _split_with_pydub(path: str):
+    from pydub import AudioSegment
+
+    audio = AudioSegment.from_file(path)
+    chunk_ms = 10 * 60 * 1000
+    for i, start in enumerate(range(0, len(audio), chunk_ms)):
+        audio[start:start + chunk_ms].export(f"{path}.pydub{i}.mp3", format="mp3")
+
+
+def _peak_rss_mb(method: str, path: str) -> float:
+    if method == "ffmpeg segment":
+        _split_audio(path)
+    else:
+        _split_with_pydub(path)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024  # ru_maxrss is in KiB on Linux
+
+
+def main(minutes_list: list[int]):
+    methods = ["ffmpeg segment"]
+    try:
+        import pydub  # noqa: F401
+        if shutil.which("ffprobe"):
+            methods.append("pydub decode")
+    except ImportError:
+        pass
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'minutes':>8} {'file MB':>8} " + " ".join(f"{m + ' MB':>18}" for m in methods))
+    for minutes in minutes_list:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "audio.mp3")
+            _make_audio(path, minutes)
+            row = [f"{minutes:>8}", f"{os.path.getsize(path) / 2**20:8.1f}"]
+            for method in methods:
+                with ctx.Pool(1) as pool:
+                    row.append(f"{pool.apply(_peak_rss_mb, (method, path)):18.1f}")
+                for chunk in glob.glob(path + ".*"):
+                    os.remove(chunk)
+            print(" ".join(row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 90, 180])
+    main(parser.parse_args().minutes)
@@ -0,0 +1,82 @@
+"""Measure keyset page latency of the video list as the table grows.
+
+Seeds databases of increasing size, then times pages of `--limit` rows
+fetched through get_video_summaries: the first page, and pages reached by
+following cursors deep into the table.
+
+Usage (from backend/):
+    python -m benchmarks.list_pagination [--sizes 1000 10000 100000] [--limit 50]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import app.database as db_module
+
+STATUSES = ("queued", "processing", "completed", "failed")
+
+
+def _seed(path: str, count: int):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = (
+        (f"https://youtu.be/s{i:010d}", f"s{i:010d}", f"Video {i}", 600,
+         STATUSES[i % len(STATUSES)], (start + timedelta(seconds=i)).isoformat())
+        for i in range(count)
+    )
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            """INSERT INTO videos (url, video_id, title, duration, status, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _time_pages(limit: int, pages: int, status=None) -> list[float]:
+    samples = []
+    after = None
+    for _ in range(pages):
+        started = time.perf_counter()
+        page = await db_module.get_video_summaries(status=status, limit=limit, after=after)
+        samples.append(time.perf_counter() - started)
+        if len(page) < limit:
+            after = None
+        else:
+            after = (page[-1]["created_at"], page[-1]["id"])
+    return samples
+
+
+async def main(sizes: list[int], limit: int, pages: int):
+    print(f"{'rows':>8} {'filter':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+            await db_module.init_db()
+            _seed(db_module.DATABASE_PATH, size)
+            await db_module.open_pool()
+            try:
+                for status in (None, "completed"):
+                    samples = await _time_pages(limit, pages, status)
+                    print(f"{size:>8} {status or 'all':>10} "
+                          f"{statistics.median(samples) * 1000:8.2f} "
+                          f"{_percentile(samples, 0.99) * 1000:8.2f}")
+            finally:
+                await db_module.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.limit, args.pages))
@@ -0,0 +1,76 @@
+"""Measure GET /api/videos requests/sec with and without the connection pool.
+
+Usage (from backend/):
+    python -m benchmarks.list_throughput [--videos 10] [--clients 20] [--seconds 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+import app.database as db_module
+from app.main import app
+
+
+async def _seed(count: int):
+    segments = [{"start": i * 5.0, "text": f"Segment {i} of the transcript."} for i in range(200)]
+    summary = {"overview": "Benchmark video.", "key_points": [{"timestamp": 0, "text": "Intro."}]}
+    for i in range(count):
+        video = await db_module.create_video(
+            url=f"https://youtu.be/bench{i:06d}", video_id=f"bench{i:06d}",
+            title=f"Video {i}", duration=600,
+        )
+        await db_module.update_video(
+            video["id"], status="completed",
+            transcript_segments=json.dumps(segments),
+            transcript_text=" ".join(s["text"] for s in segments),
+            summary_json=json.dumps(summary),
+        )
+
+
+async def _run(path: str, clients: int, seconds: float) -> float:
+    transport = ASGITransport(app=app)
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: AsyncClient):
+        nonlocal done
+        while time.perf_counter() < deadline:
+            resp = await client.get(path)
+            resp.raise_for_status()
+            done += 1
+
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        return done / (time.perf_counter() - started)
+
+
+async def main(videos: int, clients: int, seconds: float, path: str = "/api/videos"):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        await _seed(videos)
+
+        rps = await _run(path, clients, seconds)
+        print(f"per-query connections: {rps:8.1f} req/s")
+
+        await db_module.open_pool()
+        try:
+            rps = await _run(path, clients, seconds)
+            print(f"pooled connections:    {rps:8.1f} req/s")
+        finally:
+            await db_module.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.videos, args.clients, args.seconds))
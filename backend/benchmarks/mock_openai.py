@@ -0,0 +1,184 @@
+"""Minimal OpenAI-compatible HTTP server for benchmarks.
+
+Serves POST /v1/chat/completions (a fixed JSON summary) and
+POST /v1/audio/transcriptions (verbose_json with one segment), with
+HTTP/1.1 keep-alive and an optional per-request delay. With rpm set it
+enforces a requests-per-minute token bucket (capacity burst_seconds of
+quota) and answers 429 with retry-after-ms once it is empty. With tls=True it
+generates a self-signed certificate with the openssl CLI and points
+SSL_CERT_FILE at it so httpx-based clients trust it.
+
+Usage from a benchmark:
+    with serve(delay=0.05, tls=True) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        ...
+        print(server.connections, server.requests)
+
+Or in its own process, printing the base URL on the first line:
+    python -m benchmarks.mock_openai [--delay 0.05]
+"""
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+SUMMARY = {"overview": "A benchmark video.", "key_points": [{"timestamp": 0, "text": "Start."}]}
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, delay: float, rpm: float = 0, burst_seconds: float = 60):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.rpm = rpm
+        self.connections = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._capacity = rpm * burst_seconds / 60
+        self._budget = self._capacity
+        self._updated = time.monotonic()
+        self.base_url = ""
+
+    def take_request_budget(self) -> float:
+        """0 if the request is within quota, else seconds until it would be."""
+        with self._lock:
+            if not self.rpm:
+                return 0.0
+            now = time.monotonic()
+            self._budget = min(self._capacity, self._budget + (now - self._updated) * self.rpm / 60)
+            self._updated = now
+            if self._budget >= 1:
+                self._budget -= 1
+                return 0.0
+            self.rate_limited += 1
+            return (1 - self._budget) * 60 / self.rpm
+
+    def get_request(self):
+        request = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return request
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.server._lock:
+            self.server.requests += 1
+        retry_after = self.server.take_request_budget()
+        if retry_after:
+            payload = json.dumps({"error": {
+                "message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded",
+            }}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("retry-after-ms", str(int(retry_after * 1000) + 1))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if self.path.endswith("/chat/completions"):
+            body = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": json.dumps(SUMMARY)},
+                }],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100},
+            }
+        elif self.path.endswith("/audio/transcriptions"):
+            body = {
+                "text": "Hello.",
+                "language": "english",
+                "duration": 5.0,
+                "segments": [{
+                    "id": 0, "seek": 0, "start": 0.0, "end": 5.0, "text": " Hello.", "tokens": [1],
+                    "temperature": 0.0, "avg_logprob": -0.1, "compression_ratio": 1.0, "no_speech_prob": 0.0,
+                }],
+            }
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _self_signed_context(directory: str) -> tuple[ssl.SSLContext, str]:
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context, cert
+
+
+@contextmanager
+def serve(delay: float = 0.0, tls: bool = False, rpm: float = 0,
+          burst_seconds: float = 60) -> Iterator[MockOpenAIServer]:
+    server = MockOpenAIServer(delay, rpm, burst_seconds)
+    scheme = "http"
+    previous_cert_file = os.environ.get("SSL_CERT_FILE")
+    with tempfile.TemporaryDirectory() as tmp:
+        if tls and shutil.which("openssl"):
+            context, cert = _self_signed_context(tmp)
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+            os.environ["SSL_CERT_FILE"] = cert
+            scheme = "https"
+        server.base_url = f"{scheme}://127.0.0.1:{server.server_address[1]}/v1"
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield server
+        finally:
+            server.shutdown()
+            server.server_close()
+            if previous_cert_file is None:
+                os.environ.pop("SSL_CERT_FILE", None)
+            else:
+                os.environ["SSL_CERT_FILE"] = previous_cert_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.0, help="server-side seconds per request")
+    args = parser.parse_args()
+    with serve(delay=args.delay) as server:
+        print(server.base_url, flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,81 @@
+"""Compare a new OpenAI client per call with the shared, pooled client.
+
+Sends summary-sized chat completions to a local mock OpenAI server
+(HTTPS with a self-signed certificate when openssl is available), first
+building a fresh AsyncOpenAI() for every call as the pipeline used to, then
+through app.openai_client's shared client. Reports per-call latency and how
+many TCP/TLS connections the server accepted.
+
+Usage (from backend/):
+    python -m benchmarks.openai_client_reuse [--calls 200] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+import app.openai_client as openai_client
+from benchmarks.mock_openai import serve
+
+PROMPT = "[00:00] (0.0s) " + "word " * 2000
+
+
+async def _call(client: AsyncOpenAI) -> float:
+    started = time.perf_counter()
+    await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": PROMPT}],
+        response_format={"type": "json_object"},
+    )
+    return time.perf_counter() - started
+
+
+async def _fresh_client_call() -> float:
+    client = AsyncOpenAI()
+    try:
+        return await _call(client)
+    finally:
+        await client.close()
+
+
+async def _shared_client_call() -> float:
+    return await _call(openai_client.get_openai_client())
+
+
+async def _run(call, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            return await call()
+
+    return sorted(await asyncio.gather(*(bounded() for _ in range(calls))))
+
+
+async def main(calls: int, concurrency: int, delay: float):
+    with serve(delay=delay, tls=True) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+        print(f"mock server {server.base_url}, {calls} calls, {concurrency} in flight, {delay * 1000:.0f} ms server time")
+        print(f"{'client':>8} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'calls/s':>8} {'connections':>12}")
+        for name, call in (("fresh", _fresh_client_call), ("shared", _shared_client_call)):
+            server.connections = 0
+            started = time.perf_counter()
+            latencies = await _run(call, calls, concurrency)
+            elapsed = time.perf_counter() - started
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{name:>8} {statistics.mean(latencies) * 1000:8.2f} {statistics.median(latencies) * 1000:8.2f} "
+                  f"{p99 * 1000:8.2f} {calls / elapsed:8.1f} {server.connections:>12}")
+        await openai_client.close_openai_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.0, help="server-side seconds per request")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.delay))
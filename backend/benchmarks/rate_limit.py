@@ -0,0 +1,82 @@
+"""Throughput and failures against an RPM quota, with and without the client limiter.
+
+Fires a burst of summary completions at a local mock OpenAI server that
+enforces a requests-per-minute quota and answers 429 with retry-after-ms.
+The modes are:
+
+- "sdk": plain client calls, relying on the SDK's own retries (max_retries=2,
+  its default), as before.
+- "backoff": app.rate_limit's shared 429 pause only (OPENAI_CHAT_RPM=0).
+- "limiter": app.rate_limit's token bucket plus the 429 pause.
+
+Each mode reports how many calls succeeded, how many 429s the server sent,
+and the achieved rate against the quota.
+
+Usage (from backend/):
+    python -m benchmarks.rate_limit [--calls 300] [--rpm 1200]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import app.openai_client as openai_client
+import app.rate_limit as rate_limit
+from app.summarizer import SYSTEM_PROMPT, _complete_json
+from benchmarks.mock_openai import serve
+
+PROMPT = "[00:00] (0.0s) " + "word " * 200
+
+
+async def _sdk_call():
+    client = openai_client.get_openai_client().with_options(max_retries=2)
+    await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": PROMPT}],
+        response_format={"type": "json_object"},
+    )
+
+
+async def _app_call():
+    await _complete_json(openai_client.get_openai_client(), SYSTEM_PROMPT, PROMPT)
+
+
+async def _run(call, calls: int) -> tuple[int, float]:
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call() for _ in range(calls)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    return sum(not isinstance(r, Exception) for r in results), elapsed
+
+
+async def main(calls: int, rpm: float, delay: float):
+    burst_seconds = 1.0
+    os.environ.update({
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-benchmark"),
+        "LLM_CACHE_MAX_BYTES": "0",
+        "OPENAI_MAX_CONNECTIONS": str(calls),
+        "OPENAI_CHAT_TPM": "0",
+        "OPENAI_RATE_LIMIT_BURST_SECONDS": str(burst_seconds),
+    })
+    print(f"{calls} calls at once, quota {rpm:g} RPM ({rpm / 60:g}/s, {rpm / 60 * burst_seconds:g} burst), "
+          f"{delay * 1000:.0f} ms per request")
+    print(f"{'mode':>8} {'ok':>5} {'failed':>7} {'429s':>6} {'seconds':>8} {'calls/s':>8} {'of quota':>9}")
+    for mode, call, client_rpm in (("sdk", _sdk_call, 0), ("backoff", _app_call, 0), ("limiter", _app_call, rpm)):
+        # A fresh server per mode, so each starts with a full quota.
+        with serve(delay=delay, rpm=rpm, burst_seconds=burst_seconds) as server:
+            os.environ["OPENAI_BASE_URL"] = server.base_url
+            os.environ["OPENAI_CHAT_RPM"] = str(client_rpm)
+            rate_limit.reset_rate_limiters()
+            ok, elapsed = await _run(call, calls)
+            await openai_client.close_openai_client()
+            rate = ok / elapsed
+            print(f"{mode:>8} {ok:>5} {calls - ok:>7} {server.rate_limited:>6} {elapsed:8.2f} "
+                  f"{rate:8.1f} {rate / (rpm / 60):8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--rpm", type=float, default=1200)
+    parser.add_argument("--delay", type=float, default=0.05, help="server-side seconds per request")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.rpm, args.delay))
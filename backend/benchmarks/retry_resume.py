@@ -0,0 +1,156 @@
+"""Time a retry after a late failure, restarting from scratch vs. resuming from checkpoints.
+
+Simulates a long video without captions through the real serial pipeline
+(process_video). The download, the ffmpeg split, each Whisper chunk and each
+summary call are replaced by sleeps of their typical duration times --scale.
+The first attempt fails at the chosen step. The retry then either starts
+over, as the worker did before checkpoints, or resumes from the stored
+transcript and the checkpoints. The LLM response cache stays on in both
+modes.
+
+Usage (from backend/):
+    python -m benchmarks.retry_resume [--scale 0.01] [--chunks 24]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import app.database as db_module
+from app.pipeline import process_video
+from app.transcriber import WHISPER_MAX_BYTES
+
+# Seconds per step at full scale, for a two-hour video.
+DOWNLOAD_SECONDS = 60.0
+SPLIT_SECONDS = 10.0
+WHISPER_CHUNK_SECONDS = 30.0
+LLM_CALL_SECONDS = 15.0
+
+
+class _FakeOpenAI:
+    """Sleeps like the API; fails the first call of the chosen kind.
+
+    Responses depend only on the run's tag and the chunk number, so a
+    re-transcription returns the same text, and runs don't share LLM cache
+    entries.
+    """
+
+    def __init__(self, tag: str, scale: float, fail: str):
+        self.tag = tag
+        self.scale = scale
+        self.fail = fail
+        self.calls = {"whisper": 0, "llm": 0}
+        self.audio = MagicMock()
+        self.audio.transcriptions.create = self._transcribe
+        self.chat = MagicMock()
+        self.chat.completions.create = self._complete
+
+    async def _transcribe(self, file, **kwargs):
+        self.calls["whisper"] += 1
+        await asyncio.sleep(WHISPER_CHUNK_SECONDS * self.scale)
+        chunk = file.name.rsplit(".chunk", 1)[-1]
+        if self.fail == "transcribe" and chunk == "023.ogg":
+            self.fail = None
+            raise RuntimeError("Whisper 500 on the last chunk")
+        return SimpleNamespace(segments=[
+            SimpleNamespace(start=i * 10.0, text=f"{self.tag} chunk {chunk} line {i} " + "w " * 40)
+            for i in range(30)
+        ])
+
+    async def _complete(self, model, messages, **kwargs):
+        self.calls["llm"] += 1
+        await asyncio.sleep(LLM_CALL_SECONDS * self.scale)
+        if self.fail == "summarize" and "Combine" in messages[0]["content"]:
+            self.fail = None
+            raise RuntimeError("LLM timeout on the final combine")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+            content=f'{{"overview": "{self.tag}: a long video.", "key_points": []}}'))])
+
+
+def _stubs(tmp: str, scale: float, chunks: int):
+    def download(url):
+        time.sleep(DOWNLOAD_SECONDS * scale)
+        path = tempfile.mkstemp(suffix=".ogg", dir=tmp)[1]
+        os.truncate(path, WHISPER_MAX_BYTES + 1)  # large enough to take the chunked path
+        return path
+
+    def split(audio_path):
+        time.sleep(SPLIT_SECONDS * scale)
+        result = []
+        for i in range(chunks):
+            path = f"{audio_path}.chunk{i:03d}.ogg"
+            open(path, "wb").close()
+            result.append({"path": path, "offset": i * 300.0, "keep_from": i * 300.0,
+                           "keep_until": (i + 1) * 300.0 if i < chunks - 1 else float("inf")})
+        return result
+
+    return download, split
+
+
+async def _run(mode: str, fail: str, scale: float, chunks: int, tmp: str) -> tuple[float, float, dict]:
+    yt_id = f"{mode[:4]}{fail[:3]}0000"
+    await db_module.create_video(url=f"https://youtu.be/{yt_id}", video_id=yt_id, title="t", duration=7200)
+    video = await db_module.get_video_by_video_id(yt_id)
+    download, split = _stubs(tmp, scale, chunks)
+    client = _FakeOpenAI(yt_id, scale, fail)
+
+    patches = [
+        patch("app.transcriber._fetch_youtube_captions", return_value=None),
+        patch("app.transcriber._download_audio", side_effect=download),
+        patch("app.transcriber._split_audio", side_effect=split),
+        patch("app.transcriber.get_openai_client", return_value=client),
+        patch("app.summarizer.get_openai_client", return_value=client),
+    ]
+    if mode == "restart":
+        patches.append(patch("app.pipeline.load_checkpoints", return_value=None))
+    for p in patches:
+        p.start()
+    try:
+        started = time.perf_counter()
+        try:
+            await process_video(video)
+            raise AssertionError("the first attempt should fail")
+        except RuntimeError:
+            pass
+        first = time.perf_counter() - started
+
+        calls_before = dict(client.calls)
+        # The worker retries with the row as it is now; restarting ignores what was stored.
+        retry_video = video if mode == "restart" else await db_module.get_video_by_id(video["id"])
+        started = time.perf_counter()
+        await process_video(retry_video)
+        retry = time.perf_counter() - started
+        calls = {kind: client.calls[kind] - calls_before[kind] for kind in calls_before}
+        return first, retry, calls
+    finally:
+        for p in patches:
+            p.stop()
+
+
+async def main(scale: float, chunks: int):
+    os.environ.setdefault("SUMMARY_MAX_INPUT_TOKENS", "20000")
+    os.environ.setdefault("WHISPER_CHUNK_CONCURRENCY", "4")
+    os.environ.setdefault("SUMMARY_CONCURRENCY", "4")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        print(f"{chunks} Whisper chunks; step times x{scale}: download {DOWNLOAD_SECONDS:g}s, "
+              f"split {SPLIT_SECONDS:g}s, Whisper chunk {WHISPER_CHUNK_SECONDS:g}s, LLM call {LLM_CALL_SECONDS:g}s")
+        print(f"{'fails in':>10} {'retry':>8} {'1st s':>7} {'retry s':>8} {'full-scale retry':>17} "
+              f"{'whisper calls':>14} {'llm calls':>10}")
+        for fail in ("summarize", "transcribe"):
+            for mode in ("restart", "resume"):
+                first, retry, calls = await _run(mode, fail, scale, chunks, tmp)
+                print(f"{fail:>10} {mode:>8} {first:7.2f} {retry:8.2f} {retry / scale:16.0f}s "
+                      f"{calls['whisper']:>14} {calls['llm']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--chunks", type=int, default=24)
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.chunks))
@@ -0,0 +1,108 @@
+"""Compare batch throughput of the serial and staged workers.
+
+Every pipeline stage is replaced by a sleep of its typical share of a
+video's processing time. Half the batch has YouTube captions, so for those
+videos the transcode and transcribe stages do nothing. The serial worker
+runs whole videos, WORKER_CONCURRENCY at a time. The staged worker gives
+each stage its own slots, so downloads overlap transcription and
+summarization.
+
+Usage (from backend/):
+    python -m benchmarks.staged_throughput [--videos 12] [--scale 0.1]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import app.database as db_module
+import app.worker as worker_module
+from app.pipeline import new_job
+
+# Relative cost of each stage for a video without captions.
+STAGE_COSTS = {
+    "fetch_stage": 3.0,
+    "transcode_stage": 1.0,
+    "transcribe_stage": 4.0,
+    "summarize_stage": 2.0,
+}
+
+
+def _stub_stages(scale: float) -> dict:
+    def make(name):
+        async def stage(job):
+            captioned = job["video"]["id"] % 2 == 1
+            if name == "fetch_stage" and captioned:
+                await asyncio.sleep(0.5 * scale)  # captions are a quick fetch
+            elif name in ("transcode_stage", "transcribe_stage") and captioned:
+                return
+            else:
+                await asyncio.sleep(STAGE_COSTS[name] * scale)
+            if name == "summarize_stage":
+                await db_module.update_video(job["video"]["id"], status="completed")
+        return stage
+    return {name: make(name) for name in STAGE_COSTS}
+
+
+async def _run(mode: str, concurrency: int, videos: int, scale: float) -> float:
+    for i in range(videos):
+        yt_id = f"{mode[:3]}{concurrency}{i:07d}"
+        await db_module.create_video(url=f"https://youtu.be/{yt_id}", video_id=yt_id, title="t", duration=60)
+
+    stages = _stub_stages(scale)
+
+    async def serial_process(video):
+        job = new_job(video)
+        for stage in stages.values():
+            await stage(job)
+
+    env = {
+        "WORKER_MODE": mode,
+        "WORKER_POLL_INTERVAL": "1",
+        "WORKER_CONCURRENCY": str(concurrency),
+        "STAGE_DOWNLOAD_CONCURRENCY": str(concurrency),
+        "STAGE_TRANSCODE_CONCURRENCY": str(concurrency),
+        "STAGE_TRANSCRIBE_CONCURRENCY": str(concurrency),
+        "STAGE_SUMMARIZE_CONCURRENCY": str(concurrency),
+    }
+    patches = [patch(f"app.pipeline.{name}", side_effect=func) for name, func in stages.items()]
+    patches.append(patch("app.pipeline.process_video", side_effect=serial_process))
+    for p in patches:
+        p.start()
+    try:
+        with patch.dict(os.environ, env):
+            started = time.perf_counter()
+            task = await worker_module.start_worker()
+            try:
+                while any(v["status"] != "completed" for v in await db_module.get_all_videos()):
+                    await asyncio.sleep(0.01)
+            finally:
+                await worker_module.stop_worker(task)
+            return time.perf_counter() - started
+    finally:
+        for p in patches:
+            p.stop()
+        for v in await db_module.get_all_videos():
+            await db_module.delete_video(v["id"])
+
+
+async def main(videos: int, scale: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        print(f"{videos} videos, half with captions; stage costs x{scale}s: {STAGE_COSTS}")
+        print(f"{'mode':>7} {'slots':>6} {'seconds':>8} {'videos/min':>11}")
+        for concurrency in (1, 2):
+            for mode in ("serial", "staged"):
+                elapsed = await _run(mode, concurrency, videos, scale)
+                print(f"{mode:>7} {concurrency:>6} {elapsed:8.2f} {videos / elapsed * 60:11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=12)
+    parser.add_argument("--scale", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(main(args.videos, args.scale))
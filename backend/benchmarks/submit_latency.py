@@ -0,0 +1,68 @@
+"""Measure submit-to-processing latency of the background worker.
+
+Compares the event-driven wakeup against pure polling (the worker loop run
+without start_worker(), so no wakeup event exists).
+
+Usage (from backend/):
+    python -m benchmarks.submit_latency [--submissions 20] [--poll-interval 1]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+
+import app.database as db_module
+import app.worker as worker_module
+
+
+async def _measure(mode: str, submissions: int, poll_interval: int) -> list[float]:
+    claimed_at: dict[str, float] = {}
+
+    async def fake_process(video):
+        claimed_at[video["video_id"]] = time.perf_counter()
+        await db_module.update_video(video["id"], status="completed")
+
+    with patch("app.pipeline.process_video", side_effect=fake_process), \
+         patch.dict(os.environ, {"WORKER_POLL_INTERVAL": str(poll_interval), "WORKER_CONCURRENCY": "1"}):
+        if mode == "event":
+            task = await worker_module.start_worker()
+        else:
+            worker_module._worker_running = True
+            task = asyncio.create_task(worker_module._worker_loop())
+
+        latencies = []
+        try:
+            await asyncio.sleep(0.1)
+            for i in range(submissions):
+                yt_id = f"{mode[:4]}{i:07d}"
+                submitted = time.perf_counter()
+                await db_module.create_video(url=f"https://youtu.be/{yt_id}", video_id=yt_id)
+                while yt_id not in claimed_at:
+                    await asyncio.sleep(0.001)
+                latencies.append(claimed_at[yt_id] - submitted)
+                # Stagger submissions so they land at random points in the poll cycle.
+                await asyncio.sleep(poll_interval * (i % 3) / 3)
+        finally:
+            await worker_module.stop_worker(task)
+    return latencies
+
+
+async def main(submissions: int, poll_interval: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        for mode in ("poll", "event"):
+            latencies = await _measure(mode, submissions, poll_interval)
+            print(f"{mode:>5}: mean {statistics.mean(latencies) * 1000:8.1f} ms   "
+                  f"max {max(latencies) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=20)
+    parser.add_argument("--poll-interval", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.submissions, args.poll_interval))
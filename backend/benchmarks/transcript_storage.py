@@ -0,0 +1,116 @@
+"""Compare stored size and decode time of transcripts: JSON text vs. the binary format.
+
+Builds synthetic transcripts (a segment every 3 s of ~12 words each) for
+videos of increasing length. For each storage format it reports the bytes
+stored per row, the encode time, the decode time, and the median
+get_video_by_id latency against a temporary database. The "json" format is
+how rows were stored before: segments as JSON text plus the joined
+transcript_text. Binary formats store the segments only, and the text is
+derived on read.
+
+Usage (from backend/):
+    python -m benchmarks.transcript_storage [--hours 1 4 10] [--reads 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import app.database as db_module
+import app.transcript_codec as codec
+from app.transcript_codec import decode_segments, encode_segments, transcript_text
+
+WORDS = ("the", "model", "video", "we", "talk", "about", "really", "interesting", "data", "because",
+         "performance", "and", "then", "it", "works", "like", "this", "so", "you", "can", "see",
+         "transcript", "summary", "chunk", "minute", "question", "answer", "example", "right", "okay")
+
+
+def _segments(hours: float) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {"start": round(i * 3.0 + rng.random(), 1),
+         "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16)))}
+        for i in range(int(hours * 3600 / 3))
+    ]
+
+
+def _formats() -> list[str]:
+    formats = ["json", "none", "zlib"]
+    if codec.zstandard is not None:
+        formats.append("zstd")
+    return formats
+
+
+def _encode(fmt: str, segments: list[dict]) -> dict:
+    if fmt == "json":
+        return {"transcript_segments": json.dumps(segments), "transcript_text": transcript_text(segments)}
+    os.environ["TRANSCRIPT_COMPRESSION"] = fmt
+    return {"transcript_segments": encode_segments(segments), "transcript_text": None}
+
+
+def _stored_bytes(row: dict) -> int:
+    size = 0
+    for value in row.values():
+        if isinstance(value, str):
+            size += len(value.encode("utf-8"))
+        elif value is not None:
+            size += len(value)
+    return size
+
+
+def _time(func, *args, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - started)
+    return min(samples)
+
+
+async def _read_latency(video_id: int, reads: int) -> float:
+    samples = []
+    for _ in range(reads):
+        started = time.perf_counter()
+        await db_module.get_video_by_id(video_id)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def main(hours: list[float], reads: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_module.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        await db_module.init_db()
+        await db_module.open_pool(readers=1)
+        print(f"{'hours':>5} {'segments':>8} {'format':>6} {'stored KB':>10} {'vs json':>8} "
+              f"{'encode ms':>10} {'decode ms':>10} {'read ms':>8}")
+        try:
+            for h in hours:
+                segments = _segments(h)
+                json_size = None
+                for fmt in _formats():
+                    row = _encode(fmt, segments)
+                    size = _stored_bytes(row)
+                    json_size = json_size or size
+                    encode = _time(_encode, fmt, segments)
+                    decode = _time(decode_segments, row["transcript_segments"])
+                    video = await db_module.create_video(
+                        url=f"https://youtu.be/{fmt}{h:g}", video_id=f"{fmt}-{h:g}h", title="t", duration=int(h * 3600),
+                    )
+                    await db_module.update_video(video["id"], **row)
+                    read = await _read_latency(video["id"], reads)
+                    print(f"{h:5g} {len(segments):8} {fmt:>6} {size / 1024:10.0f} {size / json_size:7.0%} "
+                          f"{encode * 1000:10.1f} {decode * 1000:10.1f} {read * 1000:8.1f}")
+        finally:
+            await db_module.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.hours, args.reads))
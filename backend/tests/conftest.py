@@ -18,10 +18,12 @@ async def test_db(monkeypatch, tmp_path):
     monkeypatch.setattr(db_module, "DATABASE_PATH", db_path)
 
     await db_module.init_db()
+    await db_module.open_pool(readers=2)
 
     yield
 
-    # Cleanup happens automatically via tmp_path
+    await db_module.close_pool()
+    # File cleanup happens automatically via tmp_path
 
 
 def make_mock_transcript_segments():
@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock, patch
+
+from app.checkpoints import AUDIO, Checkpoints, discard_checkpoints, load_checkpoints
+from app.database import create_video, get_checkpoints, put_checkpoint
+
+
+class TestCheckpoints:
+    async def test_save_persists_and_is_visible_immediately(self, test_db):
+        video = await create_video(url="https://youtu.be/ckpt1234567", video_id="ckpt1234567")
+        checkpoints = await load_checkpoints(video["id"])
+        await checkpoints.save("llm:abc", '{"overview": "x"}')
+
+        assert checkpoints.get("llm:abc") == '{"overview": "x"}'
+        assert (await load_checkpoints(video["id"])).get("llm:abc") == '{"overview": "x"}'
+
+    def test_count_by_prefix(self):
+        checkpoints = Checkpoints(1, {"whisper:0-300": "[]", "whisper:300-600": "[]", "llm:k": "{}"})
+        assert checkpoints.count("whisper:") == 2
+        assert checkpoints.get("missing") is None
+
+    async def test_save_failure_is_not_raised(self):
+        checkpoints = Checkpoints(1)
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock, side_effect=Exception("locked")):
+            await checkpoints.save("llm:k", "{}")
+        assert checkpoints.get("llm:k") is None
+
+
+class TestDiscardCheckpoints:
+    async def test_removes_rows_and_kept_audio(self, test_db, tmp_path):
+        video = await create_video(url="https://youtu.be/ckpt1234567", video_id="ckpt1234567")
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        await put_checkpoint(video["id"], AUDIO, str(audio))
+
+        await discard_checkpoints(video["id"])
+
+        assert not audio.exists()
+        assert await get_checkpoints(video["id"]) == {}
+
+    async def test_errors_are_logged_not_raised(self):
+        with patch("app.checkpoints.get_checkpoints", new_callable=AsyncMock, side_effect=Exception("locked")):
+            await discard_checkpoints(1)
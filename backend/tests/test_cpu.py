@@ -0,0 +1,44 @@
+import os
+import threading
+
+import pytest
+
+import app.cpu as cpu
+
+
+def _whereami() -> tuple[int, int]:
+    return os.getpid(), threading.get_ident()
+
+
+@pytest.fixture(autouse=True)
+def stop_pool():
+    yield
+    cpu.shutdown_cpu_pool()
+
+
+class TestRunCpuBound:
+    async def test_falls_back_to_a_thread_without_a_pool(self):
+        pid, thread = await cpu.run_cpu_bound(_whereami)
+        assert pid == os.getpid()
+        assert thread != threading.get_ident()
+
+    async def test_runs_in_another_process_when_pool_started(self):
+        cpu.start_cpu_pool(workers=1)
+        pid, _ = await cpu.run_cpu_bound(_whereami)
+        assert pid != os.getpid()
+
+    async def test_passes_arguments_and_propagates_errors(self):
+        cpu.start_cpu_pool(workers=1)
+        assert await cpu.run_cpu_bound(divmod, 7, 2) == (3, 1)
+        with pytest.raises(ZeroDivisionError):
+            await cpu.run_cpu_bound(divmod, 1, 0)
+
+    def test_workers_do_not_fork_from_the_app_process(self):
+        cpu.start_cpu_pool(workers=1)
+        assert cpu._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+    def test_shutdown_is_idempotent(self):
+        cpu.start_cpu_pool(workers=1)
+        cpu.shutdown_cpu_pool()
+        cpu.shutdown_cpu_pool()
+        assert cpu._pool is None
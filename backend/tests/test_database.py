@@ -1,18 +1,31 @@
+import asyncio
 import json
+from datetime import datetime, timedelta, timezone
 
 import aiosqlite
 import pytest
 
 from app.database import (
+    claim_next_queued_video,
     create_video,
+    create_videos,
+    delete_checkpoints,
     delete_video,
     get_all_videos,
+    get_cached_llm_response,
+    get_checkpoints,
     get_next_queued_video,
     get_video_by_id,
+    get_video_summaries,
+    get_videos_by_video_ids,
     get_video_by_video_id,
+    put_cached_llm_response,
+    put_checkpoint,
+    requeue_videos,
     update_video,
     _row_to_dict,
 )
+from app.transcript_codec import encode_segments
 
 
 class TestCreateAndGetVideo:
@@ -63,6 +76,38 @@ class TestGetVideoByVideoId:
         assert result is None
 
 
+class TestBulkOperations:
+    async def test_create_videos_preserves_order_and_fields(self, test_db):
+        videos = await create_videos([
+            {"url": "https://youtu.be/bulk0000001", "video_id": "bulk0000001", "title": "A", "duration": 10},
+            {"url": "https://youtu.be/bulk0000002", "video_id": "bulk0000002",
+             "status": "failed", "error_message": "Video unavailable: gone"},
+        ])
+        assert [v["video_id"] for v in videos] == ["bulk0000001", "bulk0000002"]
+        assert videos[0]["status"] == "queued"
+        assert videos[0]["title"] == "A"
+        assert videos[1]["status"] == "failed"
+        assert videos[1]["error_message"] == "Video unavailable: gone"
+
+    async def test_create_videos_returns_existing_on_conflict(self, test_db):
+        existing = await create_video(url="https://youtu.be/bulk0000003", video_id="bulk0000003", title="Old")
+        videos = await create_videos([
+            {"url": "https://youtu.be/bulk0000003", "video_id": "bulk0000003", "title": "New"},
+        ])
+        assert videos[0]["id"] == existing["id"]
+        assert videos[0]["title"] == "Old"
+
+    async def test_create_videos_empty(self, test_db):
+        assert await create_videos([]) == []
+
+    async def test_get_videos_by_video_ids(self, test_db):
+        await create_video(url="https://youtu.be/look0000001", video_id="look0000001")
+        await create_video(url="https://youtu.be/look0000002", video_id="look0000002")
+        found = await get_videos_by_video_ids(["look0000001", "look0000002", "missing0000", "look0000001"])
+        assert set(found) == {"look0000001", "look0000002"}
+        assert await get_videos_by_video_ids([]) == {}
+
+
 class TestGetAllVideos:
     async def test_returns_all_ordered_by_date_desc(self, test_db):
         await create_video(url="https://youtu.be/vid1_1234ab", video_id="vid1_1234ab", title="First")
@@ -83,6 +128,87 @@ class TestGetAllVideos:
         assert len(completed) == 1
 
 
+class TestGetVideoSummaries:
+    async def test_excludes_blob_columns(self, test_db):
+        video = await create_video(url="https://youtu.be/summ1234567", video_id="summ1234567", title="Lite")
+        await update_video(video["id"], transcript_segments="[]", summary_json="{}", transcript_text="x")
+        summaries = await get_video_summaries()
+        assert len(summaries) == 1
+        assert summaries[0]["title"] == "Lite"
+        assert "transcript_segments" not in summaries[0]
+        assert "summary_json" not in summaries[0]
+        assert "transcript_text" not in summaries[0]
+
+    async def test_filter_and_order_match_get_all_videos(self, test_db):
+        v1 = await create_video(url="https://youtu.be/sum1_1234ab", video_id="sum1_1234ab")
+        await create_video(url="https://youtu.be/sum2_1234ab", video_id="sum2_1234ab")
+        await update_video(v1["id"], status="completed")
+
+        assert [v["id"] for v in await get_video_summaries()] == [v["id"] for v in await get_all_videos()]
+        completed = await get_video_summaries(status="completed")
+        assert [v["id"] for v in completed] == [v1["id"]]
+
+
+class TestVideoSummaryPagination:
+    async def _create_many(self, count):
+        for i in range(count):
+            await create_video(url=f"https://youtu.be/page{i:07d}", video_id=f"page{i:07d}")
+
+    async def test_keyset_pages_cover_all_rows_once(self, test_db):
+        await self._create_many(7)
+        seen = []
+        after = None
+        while True:
+            page = await get_video_summaries(limit=3, after=after)
+            if not page:
+                break
+            seen.extend(v["id"] for v in page)
+            after = (page[-1]["created_at"], page[-1]["id"])
+        assert seen == [v["id"] for v in await get_video_summaries()]
+        assert len(set(seen)) == 7
+
+    async def test_ties_on_created_at_are_broken_by_id(self, test_db):
+        await self._create_many(4)
+        import app.database as db_module
+        async with db_module._write_db() as db:
+            await db.execute("UPDATE videos SET created_at = '2026-01-01T00:00:00+00:00'")
+            await db.commit()
+
+        first = await get_video_summaries(limit=2)
+        second = await get_video_summaries(limit=2, after=(first[-1]["created_at"], first[-1]["id"]))
+        assert [v["id"] for v in first + second] == [4, 3, 2, 1]
+
+    async def test_date_range_filter(self, test_db):
+        await self._create_many(3)
+        import app.database as db_module
+        async with db_module._write_db() as db:
+            for video_id, day in ((1, "01"), (2, "02"), (3, "03")):
+                await db.execute(
+                    "UPDATE videos SET created_at = ? WHERE id = ?",
+                    (f"2026-01-{day}T00:00:00+00:00", video_id),
+                )
+            await db.commit()
+
+        result = await get_video_summaries(
+            created_after="2026-01-02T00:00:00+00:00",
+            created_before="2026-01-03T00:00:00+00:00",
+        )
+        assert [v["id"] for v in result] == [2]
+
+    async def test_status_and_cursor_queries_use_indexes(self, test_db):
+        import app.database as db_module
+        async with db_module._read_db() as db:
+            cursor = await db.execute(
+                f"EXPLAIN QUERY PLAN SELECT {db_module._SUMMARY_COLUMNS} FROM videos "
+                "WHERE status = ? AND (created_at, id) < (?, ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT 10",
+                ("queued", "2026", 1),
+            )
+            plan = " ".join(row[3] for row in await cursor.fetchall())
+        assert "idx_videos_status_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+
 class TestUpdateVideo:
     async def test_update_fields(self, test_db):
         video = await create_video(url="https://youtu.be/upd123456ab", video_id="upd123456ab")
@@ -118,6 +244,207 @@ class TestGetNextQueuedVideo:
         assert result is None
 
 
+class TestClaimNextQueuedVideo:
+    async def test_claims_oldest_and_marks_processing(self, test_db):
+        await create_video(url="https://youtu.be/c1_12345678", video_id="c1_12345678", title="Oldest")
+        await create_video(url="https://youtu.be/c2_12345678", video_id="c2_12345678", title="Newer")
+
+        claimed = await claim_next_queued_video()
+        assert claimed["title"] == "Oldest"
+        assert claimed["status"] == "processing"
+        assert (await get_video_by_id(claimed["id"]))["status"] == "processing"
+
+    async def test_returns_none_when_empty(self, test_db):
+        assert await claim_next_queued_video() is None
+
+    async def test_skips_rows_scheduled_for_later(self, test_db):
+        later = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+        earlier = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+        v1 = await create_video(url="https://youtu.be/later123456", video_id="later123456")
+        v2 = await create_video(url="https://youtu.be/due12345678", video_id="due12345678")
+        await update_video(v1["id"], next_attempt_at=later)
+        await update_video(v2["id"], next_attempt_at=earlier)
+
+        claimed = await claim_next_queued_video()
+        assert claimed["id"] == v2["id"]
+        assert await claim_next_queued_video() is None
+        assert (await get_next_queued_video()) is None
+
+    async def test_concurrent_claims_never_overlap(self, test_db):
+        for i in range(5):
+            await create_video(url=f"https://youtu.be/cc{i:09d}", video_id=f"cc{i:09d}")
+
+        results = await asyncio.gather(*(claim_next_queued_video() for _ in range(10)))
+        claimed_ids = [r["id"] for r in results if r is not None]
+        assert len(claimed_ids) == 5
+        assert len(set(claimed_ids)) == 5
+
+
+class TestMigrations:
+    async def test_init_db_adds_missing_columns(self, monkeypatch, tmp_path):
+        import app.database as db_module
+
+        db_path = str(tmp_path / "old.db")
+        async with aiosqlite.connect(db_path) as db:
+            await db.execute("""
+                CREATE TABLE videos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    title TEXT,
+                    duration INTEGER,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    transcript_source TEXT,
+                    transcript_segments TEXT,
+                    transcript_text TEXT,
+                    summary_json TEXT,
+                    error_message TEXT,
+                    attempt_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    completed_at TEXT
+                )
+            """)
+            await db.commit()
+
+        monkeypatch.setattr(db_module, "DATABASE_PATH", db_path)
+        await db_module.init_db()
+
+        video = await create_video(url="https://youtu.be/migr1234567", video_id="migr1234567")
+        assert "next_attempt_at" in video
+        assert (await claim_next_queued_video())["id"] == video["id"]
+
+    async def test_init_db_requeues_interrupted_videos(self, monkeypatch, tmp_path):
+        import app.database as db_module
+
+        monkeypatch.setattr(db_module, "DATABASE_PATH", str(tmp_path / "crash.db"))
+        await db_module.init_db()
+        first = await create_video(url="https://youtu.be/crsh0000001", video_id="crsh0000001")
+        second = await create_video(url="https://youtu.be/crsh0000002", video_id="crsh0000002")
+        await claim_next_queued_video()
+        await claim_next_queued_video()
+        await update_video(second["id"], status="completed")
+
+        # Restart after a crash that left the first video mid-processing.
+        await db_module.init_db()
+
+        assert (await get_video_by_id(first["id"]))["status"] == "queued"
+        assert (await get_video_by_id(second["id"]))["status"] == "completed"
+
+    async def test_init_db_reencodes_json_transcripts(self, monkeypatch, tmp_path):
+        import app.database as db_module
+
+        monkeypatch.setattr(db_module, "DATABASE_PATH", str(tmp_path / "json.db"))
+        await db_module.init_db()
+        segments = [{"start": 0.0, "text": "Hello"}, {"start": 3.2, "text": "héllo again"}]
+        derived = await create_video(url="https://youtu.be/json0000001", video_id="json0000001")
+        await update_video(derived["id"], transcript_segments=json.dumps(segments),
+                           transcript_text="Hello héllo again")
+        edited = await create_video(url="https://youtu.be/json0000002", video_id="json0000002")
+        await update_video(edited["id"], transcript_segments=json.dumps(segments), transcript_text="edited")
+
+        await db_module.init_db()
+
+        async with aiosqlite.connect(db_module.DATABASE_PATH) as db:
+            cursor = await db.execute("SELECT typeof(transcript_segments), transcript_text FROM videos ORDER BY id")
+            # Text that is just the joined segments is dropped; anything else is kept.
+            assert await cursor.fetchall() == [("blob", None), ("blob", "edited")]
+        assert (await get_video_by_id(derived["id"]))["transcript_segments"] == segments
+
+
+class TestConnectionPool:
+    async def test_writer_recovers_after_failed_statement(self, test_db):
+        await create_video(url="https://youtu.be/pool1234567", video_id="pool1234567")
+        with pytest.raises(aiosqlite.IntegrityError):
+            await create_video(url="https://youtu.be/pool1234567", video_id="pool1234567")
+        video = await create_video(url="https://youtu.be/pool7654321", video_id="pool7654321")
+        assert video["status"] == "queued"
+
+    async def test_readers_are_read_only(self, test_db):
+        import app.database as db_module
+
+        async with db_module._pool.reader() as db:
+            with pytest.raises(aiosqlite.OperationalError):
+                await db.execute("DELETE FROM videos")
+
+    async def test_concurrent_reads_share_pool(self, test_db):
+        await create_video(url="https://youtu.be/read1234567", video_id="read1234567")
+        results = await asyncio.gather(*(get_all_videos() for _ in range(20)))
+        assert all(len(r) == 1 for r in results)
+
+    async def test_falls_back_to_short_lived_connections_without_pool(self, test_db):
+        import app.database as db_module
+
+        await db_module.close_pool()
+        video = await create_video(url="https://youtu.be/nopool12345", video_id="nopool12345")
+        assert (await get_video_by_id(video["id"]))["video_id"] == "nopool12345"
+
+
+class TestLlmCache:
+    async def test_round_trip(self, test_db):
+        assert await get_cached_llm_response("k1") is None
+        await put_cached_llm_response("k1", '{"overview": "x"}', max_bytes=1000)
+        assert await get_cached_llm_response("k1") == '{"overview": "x"}'
+
+    async def test_evicts_least_recently_used_beyond_max_bytes(self, test_db):
+        for key in ("a", "b", "c"):
+            await put_cached_llm_response(key, "x" * 40, max_bytes=100)
+        # Only two 40-byte entries fit; "a" was used least recently.
+        assert await get_cached_llm_response("a") is None
+        assert await get_cached_llm_response("b") is not None
+
+        # Reading "b" makes "c" the least recently used.
+        await put_cached_llm_response("d", "x" * 40, max_bytes=100)
+        assert await get_cached_llm_response("c") is None
+        assert await get_cached_llm_response("b") is not None
+        assert await get_cached_llm_response("d") is not None
+
+    async def test_oversized_entry_is_not_kept(self, test_db):
+        await put_cached_llm_response("huge", "x" * 500, max_bytes=100)
+        assert await get_cached_llm_response("huge") is None
+
+
+class TestCheckpoints:
+    async def test_round_trip_and_overwrite(self, test_db):
+        video = await create_video(url="https://youtu.be/ckpt1234567", video_id="ckpt1234567")
+        assert await get_checkpoints(video["id"]) == {}
+        await put_checkpoint(video["id"], "audio", "/tmp/a.ogg")
+        await put_checkpoint(video["id"], "whisper:0-300", "[]")
+        await put_checkpoint(video["id"], "audio", "/tmp/b.ogg")
+        assert await get_checkpoints(video["id"]) == {"audio": "/tmp/b.ogg", "whisper:0-300": "[]"}
+
+    async def test_scoped_to_video_and_deleted_with_it(self, test_db):
+        first = await create_video(url="https://youtu.be/ckpt0000001", video_id="ckpt0000001")
+        second = await create_video(url="https://youtu.be/ckpt0000002", video_id="ckpt0000002")
+        await put_checkpoint(first["id"], "audio", "/tmp/1.ogg")
+        await put_checkpoint(second["id"], "audio", "/tmp/2.ogg")
+
+        await delete_video(first["id"])
+        assert await get_checkpoints(first["id"]) == {}
+        await delete_checkpoints(second["id"])
+        assert await get_checkpoints(second["id"]) == {}
+
+    async def test_kept_for_the_worker_when_a_processing_video_is_deleted(self, test_db):
+        video = await create_video(url="https://youtu.be/ckpt0000003", video_id="ckpt0000003")
+        await update_video(video["id"], status="processing")
+        await put_checkpoint(video["id"], "audio", "/tmp/3.ogg")
+
+        assert await delete_video(video["id"]) is True
+        assert await get_video_by_id(video["id"]) is None
+        assert await get_checkpoints(video["id"]) == {"audio": "/tmp/3.ogg"}
+
+
+class TestRequeueVideos:
+    async def test_requeues_only_processing_rows(self, test_db):
+        processing = await create_video(url="https://youtu.be/reqp1234567", video_id="reqp1234567")
+        done = await create_video(url="https://youtu.be/reqd1234567", video_id="reqd1234567")
+        await claim_next_queued_video()
+        await update_video(done["id"], status="completed")
+
+        assert await requeue_videos([processing["id"], done["id"]]) == 1
+        assert (await get_video_by_id(processing["id"]))["status"] == "queued"
+        assert (await get_video_by_id(done["id"]))["status"] == "completed"
+
+
 class TestRowToDict:
     async def test_deserializes_json_fields(self, test_db):
         segments = [{"start": 0, "text": "Hello"}]
@@ -134,6 +461,12 @@ class TestRowToDict:
         assert isinstance(fetched["summary_json"], dict)
         assert fetched["summary_json"]["overview"] == "Test"
 
+    async def test_decodes_binary_transcript(self, test_db):
+        segments = [{"start": 1.5, "text": "Hello"}]
+        video = await create_video(url="https://youtu.be/blob1234567", video_id="blob1234567")
+        await update_video(video["id"], transcript_segments=encode_segments(segments))
+        assert (await get_video_by_id(video["id"]))["transcript_segments"] == segments
+
     async def test_none_json_fields_stay_none(self, test_db):
         video = await create_video(url="https://youtu.be/none1234567", video_id="none1234567")
         assert video["transcript_segments"] is None
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import signal
+
+import pytest
+
+from app import events
+from app.database import claim_next_queued_video, create_video, delete_video, update_video
+from app.routes import _event_stream
+
+
+def _parse(chunk: str) -> tuple[str, dict]:
+    lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+class TestPublishSubscribe:
+    async def test_subscribers_receive_published_events(self):
+        with events.subscribe() as first, events.subscribe() as second:
+            events.publish("video", {"id": 1})
+            assert first.get_nowait() == ("video", {"id": 1})
+            assert second.get_nowait() == ("video", {"id": 1})
+
+    async def test_unsubscribed_queue_receives_nothing(self):
+        with events.subscribe() as queue:
+            pass
+        events.publish("video", {"id": 1})
+        assert queue.empty()
+
+    async def test_full_queue_drops_instead_of_blocking(self, monkeypatch):
+        monkeypatch.setattr(events, "MAX_PENDING_EVENTS", 1)
+        with events.subscribe() as queue:
+            events.publish("video", {"id": 1})
+            events.publish("video", {"id": 2})
+            assert queue.qsize() == 1
+
+
+class TestDatabaseEvents:
+    async def test_status_transitions_are_published(self, test_db):
+        with events.subscribe() as queue:
+            video = await create_video(url="https://youtu.be/evt12345678", video_id="evt12345678")
+            await claim_next_queued_video()
+            await update_video(video["id"], transcript_text="no status change")
+            await update_video(video["id"], status="completed")
+            await delete_video(video["id"])
+
+            received = [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert [(e, d.get("status")) for e, d in received] == [
+            ("video", "queued"),
+            ("video", "processing"),
+            ("video", "completed"),
+            ("video_deleted", None),
+        ]
+        assert "transcript_text" not in received[2][1]
+
+
+class TestEventStream:
+    async def test_streams_events_in_sse_format(self):
+        stream = _event_stream(heartbeat=5)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        events.publish("video", {"id": 7, "status": "completed"})
+        event, data = _parse(await asyncio.wait_for(next_chunk, 1))
+        assert event == "video"
+        assert data == {"id": 7, "status": "completed"}
+        await stream.aclose()
+
+    async def test_sends_keep_alive_when_idle(self):
+        stream = _event_stream(heartbeat=0.01)
+        await stream.__anext__()
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        await stream.aclose()
+
+    async def test_closing_stream_unsubscribes(self):
+        before = len(events._subscribers)
+        stream = _event_stream(heartbeat=5)
+        await stream.__anext__()
+        assert len(events._subscribers) == before + 1
+        await stream.aclose()
+        assert len(events._subscribers) == before
+
+
+class TestShutdown:
+    @pytest.fixture(autouse=True)
+    def reopen_streams(self):
+        yield
+        events.open_streams()
+
+    async def test_close_streams_ends_open_streams(self):
+        stream = _event_stream(heartbeat=5)
+        await stream.__anext__()
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        events.close_streams()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(next_chunk, 1)
+
+    async def test_streams_opened_after_close_end_immediately(self):
+        events.close_streams()
+        stream = _event_stream(heartbeat=5)
+        await stream.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await asyncio.wait_for(stream.__anext__(), 1)
+
+    async def test_shutdown_signal_closes_streams_before_server_handler(self):
+        from app.main import _close_streams_on_signal
+
+        received = []
+
+        def server_handler(signum, frame):
+            received.append(signum)
+
+        original = signal.signal(signal.SIGTERM, server_handler)
+        try:
+            restore = _close_streams_on_signal()
+            stream = _event_stream(heartbeat=5)
+            await stream.__anext__()
+            signal.raise_signal(signal.SIGTERM)
+            with pytest.raises(StopAsyncIteration):
+                await asyncio.wait_for(stream.__anext__(), 1)
+            assert received == [signal.SIGTERM]
+            restore()
+            assert signal.getsignal(signal.SIGTERM) is server_handler
+        finally:
+            signal.signal(signal.SIGTERM, original)
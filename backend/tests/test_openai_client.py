@@ -0,0 +1,47 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest_asyncio
+
+import app.openai_client as openai_client
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_client():
+    await openai_client.close_openai_client()
+    yield
+    await openai_client.close_openai_client()
+
+
+class TestSharedClient:
+    async def test_returns_one_client_per_process(self):
+        assert openai_client.get_openai_client() is openai_client.get_openai_client()
+
+    async def test_close_releases_client(self):
+        first = openai_client.get_openai_client()
+        with patch.object(first, "close", new_callable=AsyncMock) as mock_close:
+            await openai_client.close_openai_client()
+        mock_close.assert_awaited_once()
+        assert openai_client.get_openai_client() is not first
+
+    async def test_sdk_retries_are_off(self):
+        # app.rate_limit retries so that every attempt is paced and counted.
+        assert openai_client.get_openai_client().max_retries == 0
+
+    async def test_close_without_client_is_noop(self):
+        await openai_client.close_openai_client()
+
+    async def test_pool_limits_and_timeouts_come_from_env(self):
+        env = {
+            "OPENAI_MAX_CONNECTIONS": "7",
+            "OPENAI_MAX_KEEPALIVE_CONNECTIONS": "3",
+            "OPENAI_TIMEOUT_SECONDS": "30",
+            "OPENAI_CONNECT_TIMEOUT_SECONDS": "2",
+        }
+        with patch.dict("os.environ", env), \
+             patch("app.openai_client.DefaultAsyncHttpxClient", wraps=openai_client.DefaultAsyncHttpxClient) as mock_http:
+            client = openai_client.get_openai_client()
+
+        limits = mock_http.call_args.kwargs["limits"]
+        assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+        assert client.timeout.read == 30
+        assert client.timeout.connect == 2
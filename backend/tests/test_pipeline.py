@@ -1,15 +1,28 @@
 import json
+import os
 from unittest.mock import patch, AsyncMock
 
 import pytest
 
-from app.pipeline import process_video
+from app.checkpoints import Checkpoints
+from app.transcript_codec import decode_segments
+from app.pipeline import (
+    discard_job,
+    fetch_stage,
+    new_job,
+    process_video,
+    summarize_stage,
+    transcode_stage,
+    transcribe_stage,
+)
 
 
 SAMPLE_VIDEO = {
     "id": 1,
     "url": "https://www.youtube.com/watch?v=test12345ab",
     "video_id": "test12345ab",
+    "title": "Test Video",
+    "duration": 120,
     "status": "processing",
     "attempt_count": 0,
 }
@@ -25,6 +38,16 @@ SAMPLE_SUMMARY = {
 }
 
 
+@pytest.fixture(autouse=True)
+def memory_checkpoints():
+    """Checkpoints start empty and are saved nowhere."""
+    with patch("app.pipeline.load_checkpoints", new_callable=AsyncMock,
+               side_effect=lambda video_id: Checkpoints(video_id)) as mock_load, \
+         patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock), \
+         patch("app.pipeline.discard_checkpoints", new_callable=AsyncMock):
+        yield mock_load
+
+
 class TestProcessVideo:
     @patch("app.pipeline.update_video", new_callable=AsyncMock)
     @patch("app.pipeline.generate_summary", new_callable=AsyncMock)
@@ -52,8 +75,9 @@ class TestProcessVideo:
         args, kwargs = first_update_kwargs
         assert args[0] == 1  # video_id
         assert kwargs["transcript_source"] == "whisper"
-        assert json.loads(kwargs["transcript_segments"]) == SAMPLE_SEGMENTS
-        assert "Hello World" == kwargs["transcript_text"]
+        assert decode_segments(kwargs["transcript_segments"]) == SAMPLE_SEGMENTS
+        # The plain text is derived on read, not stored.
+        assert "transcript_text" not in kwargs
 
     @patch("app.pipeline.update_video", new_callable=AsyncMock)
     @patch("app.pipeline.generate_summary", new_callable=AsyncMock)
@@ -70,3 +94,210 @@ class TestProcessVideo:
         assert kwargs["status"] == "completed"
         assert json.loads(kwargs["summary_json"]) == SAMPLE_SUMMARY
         assert "completed_at" in kwargs
+
+
+class TestResume:
+    STORED_VIDEO = {**SAMPLE_VIDEO, "attempt_count": 1, "transcript_source": "whisper",
+                    "transcript_segments": SAMPLE_SEGMENTS, "transcript_text": None}
+
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock, return_value=SAMPLE_SUMMARY)
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock)
+    async def test_stored_transcript_skips_transcription(self, mock_transcript, mock_summary, mock_update):
+        await process_video(self.STORED_VIDEO)
+
+        mock_transcript.assert_not_called()
+        segments, checkpoints = mock_summary.await_args.args
+        assert segments == SAMPLE_SEGMENTS
+        assert checkpoints.video_id == SAMPLE_VIDEO["id"]
+        assert mock_update.call_count == 1
+        assert mock_update.call_args.kwargs["status"] == "completed"
+
+    @patch("app.pipeline.discard_checkpoints", new_callable=AsyncMock)
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock, return_value=SAMPLE_SUMMARY)
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock, return_value=(SAMPLE_SEGMENTS, "whisper"))
+    async def test_checkpoints_passed_down_and_discarded_on_completion(self, mock_transcript, mock_summary,
+                                                                       mock_update, mock_discard):
+        await process_video(SAMPLE_VIDEO)
+
+        checkpoints = mock_transcript.await_args.args[1]
+        assert mock_summary.await_args.args[1] is checkpoints
+        mock_discard.assert_awaited_once_with(SAMPLE_VIDEO["id"])
+
+    @patch("app.pipeline.discard_checkpoints", new_callable=AsyncMock)
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock, side_effect=Exception("LLM down"))
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock, return_value=(SAMPLE_SEGMENTS, "whisper"))
+    async def test_failure_keeps_checkpoints(self, mock_transcript, mock_summary, mock_update, mock_discard):
+        with pytest.raises(Exception, match="LLM down"):
+            await process_video(SAMPLE_VIDEO)
+        mock_discard.assert_not_called()
+
+    @patch("app.pipeline.download_audio", new_callable=AsyncMock)
+    @patch("app.pipeline.fetch_captions", new_callable=AsyncMock)
+    async def test_fetch_stage_resumes_from_stored_transcript(self, mock_captions, mock_download):
+        job = new_job(self.STORED_VIDEO)
+        await fetch_stage(job)
+
+        mock_captions.assert_not_called()
+        mock_download.assert_not_called()
+        assert job["segments"] == SAMPLE_SEGMENTS
+        assert job["transcript_stored"] is True
+
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.transcribe_audio", new_callable=AsyncMock)
+    async def test_transcribe_stage_does_not_store_transcript_again(self, mock_transcribe, mock_update):
+        job = {**new_job(self.STORED_VIDEO), "segments": SAMPLE_SEGMENTS, "transcript_stored": True}
+        await transcribe_stage(job)
+
+        mock_transcribe.assert_not_called()
+        mock_update.assert_not_called()
+
+    def test_discard_job_keeps_checkpointed_audio(self, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        chunk = tmp_path / "audio.ogg.chunk000.ogg"
+        audio.write_bytes(b"audio")
+        chunk.write_bytes(b"chunk")
+        job = {**new_job(SAMPLE_VIDEO), "audio_path": str(audio), "chunks": [{"path": str(chunk)}],
+               "checkpoints": Checkpoints(SAMPLE_VIDEO["id"], {"audio": str(audio)})}
+
+        discard_job(job)
+
+        assert os.listdir(tmp_path) == ["audio.ogg"]
+        assert job["audio_path"] is None and job["chunks"] is None
+
+
+class TestDeferredMetadata:
+    DEFERRED_VIDEO = {**SAMPLE_VIDEO, "title": None, "duration": None}
+
+    @patch("app.pipeline.fetch_video_metadata", return_value={"title": "Resolved", "duration": 300})
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock)
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock)
+    async def test_resolves_missing_metadata_first(self, mock_transcript, mock_summary, mock_update, mock_meta):
+        mock_transcript.return_value = (SAMPLE_SEGMENTS, "youtube_captions")
+        mock_summary.return_value = SAMPLE_SUMMARY
+
+        await process_video(self.DEFERRED_VIDEO)
+
+        mock_meta.assert_called_once_with(SAMPLE_VIDEO["url"])
+        args, kwargs = mock_update.call_args_list[0]
+        assert kwargs == {"title": "Resolved", "duration": 300}
+        assert mock_update.call_args_list[-1].kwargs["status"] == "completed"
+
+    @patch("app.pipeline.fetch_video_metadata", return_value={"title": None, "duration": None, "error": "Private video"})
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock)
+    async def test_unavailable_video_fails_without_transcribing(self, mock_transcript, mock_update, mock_meta):
+        await process_video(self.DEFERRED_VIDEO)
+
+        mock_transcript.assert_not_called()
+        kwargs = mock_update.call_args.kwargs
+        assert kwargs["status"] == "failed"
+        assert "Video unavailable: Private video" == kwargs["error_message"]
+
+    @patch("app.pipeline.fetch_video_metadata")
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock)
+    @patch("app.pipeline.get_transcript", new_callable=AsyncMock)
+    async def test_skips_lookup_when_metadata_present(self, mock_transcript, mock_summary, mock_update, mock_meta):
+        mock_transcript.return_value = (SAMPLE_SEGMENTS, "youtube_captions")
+        mock_summary.return_value = SAMPLE_SUMMARY
+
+        await process_video(SAMPLE_VIDEO)
+
+        mock_meta.assert_not_called()
+
+
+class TestStages:
+    @patch("app.pipeline.download_audio", new_callable=AsyncMock)
+    @patch("app.pipeline.fetch_captions", new_callable=AsyncMock, return_value=SAMPLE_SEGMENTS)
+    async def test_fetch_uses_captions_when_available(self, mock_captions, mock_download):
+        job = new_job(SAMPLE_VIDEO)
+        await fetch_stage(job)
+
+        assert job["segments"] == SAMPLE_SEGMENTS
+        assert job["source"] == "youtube_captions"
+        mock_download.assert_not_called()
+
+    @patch("app.pipeline.download_audio", new_callable=AsyncMock, return_value="/tmp/audio.ogg")
+    @patch("app.pipeline.fetch_captions", new_callable=AsyncMock, return_value=None)
+    async def test_fetch_downloads_audio_without_captions(self, mock_captions, mock_download):
+        job = new_job(SAMPLE_VIDEO)
+        await fetch_stage(job)
+
+        assert job["segments"] is None
+        assert job["audio_path"] == "/tmp/audio.ogg"
+
+    @patch("app.pipeline.fetch_video_metadata", return_value={"title": None, "duration": None, "error": "Private video"})
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.fetch_captions", new_callable=AsyncMock)
+    async def test_fetch_marks_unavailable_video_done(self, mock_captions, mock_update, mock_meta):
+        job = new_job({**SAMPLE_VIDEO, "title": None, "duration": None})
+        await fetch_stage(job)
+
+        assert job["done"] is True
+        mock_captions.assert_not_called()
+        assert mock_update.call_args.kwargs["status"] == "failed"
+
+    @patch("app.pipeline.prepare_audio", new_callable=AsyncMock)
+    async def test_transcode_only_touches_downloaded_audio(self, mock_prepare):
+        captioned = new_job(SAMPLE_VIDEO)
+        await transcode_stage(captioned)
+        mock_prepare.assert_not_called()
+
+        mock_prepare.return_value = [{"path": "/tmp/audio.ogg.chunk000.ogg"}]
+        downloaded = {**new_job(SAMPLE_VIDEO), "audio_path": "/tmp/audio.ogg"}
+        await transcode_stage(downloaded)
+        assert downloaded["chunks"] == [{"path": "/tmp/audio.ogg.chunk000.ogg"}]
+
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.transcribe_audio", new_callable=AsyncMock, return_value=SAMPLE_SEGMENTS)
+    async def test_transcribe_stores_transcript_and_removes_audio(self, mock_transcribe, mock_update, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        job = {**new_job(SAMPLE_VIDEO), "audio_path": str(audio)}
+
+        await transcribe_stage(job)
+
+        mock_transcribe.assert_awaited_once_with(str(audio), None, None)
+        assert not audio.exists()
+        kwargs = mock_update.call_args.kwargs
+        assert kwargs["transcript_source"] == "whisper"
+        assert decode_segments(kwargs["transcript_segments"]) == SAMPLE_SEGMENTS
+        assert job["transcript_stored"] is True
+
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.transcribe_audio", new_callable=AsyncMock, return_value=SAMPLE_SEGMENTS)
+    async def test_transcribe_removes_checkpointed_audio_once_done(self, mock_transcribe, mock_update, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        job = {**new_job(SAMPLE_VIDEO), "audio_path": str(audio), "checkpoints": Checkpoints(1)}
+
+        await transcribe_stage(job)
+
+        assert not audio.exists()
+        assert job["audio_path"] is None
+
+    @patch("app.pipeline.update_video", new_callable=AsyncMock)
+    @patch("app.pipeline.generate_summary", new_callable=AsyncMock, return_value=SAMPLE_SUMMARY)
+    async def test_summarize_marks_completed(self, mock_summary, mock_update):
+        job = {**new_job(SAMPLE_VIDEO), "segments": SAMPLE_SEGMENTS, "transcript_stored": True}
+
+        await summarize_stage(job)
+
+        mock_summary.assert_awaited_once_with(SAMPLE_SEGMENTS, None)
+        assert mock_update.call_args.kwargs["status"] == "completed"
+
+    def test_discard_job_removes_audio_and_chunks(self, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        chunk = tmp_path / "audio.ogg.chunk000.ogg"
+        audio.write_bytes(b"audio")
+        chunk.write_bytes(b"chunk")
+        job = {**new_job(SAMPLE_VIDEO), "audio_path": str(audio), "chunks": [{"path": str(chunk)}]}
+
+        discard_job(job)
+
+        assert os.listdir(tmp_path) == []
+        assert job["audio_path"] is None and job["chunks"] is None
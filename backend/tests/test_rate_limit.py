@@ -0,0 +1,138 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import httpx
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+import app.rate_limit as rate_limit
+from app.rate_limit import RateLimiter, call_with_rate_limit
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _rate_limit_error(headers=None, code="rate_limit_exceeded"):
+    response = MagicMock(status_code=429, headers=headers or {})
+    return RateLimitError("Rate limit reached", response=response, body={"code": code})
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    rate_limit.reset_rate_limiters()
+    yield
+    rate_limit.reset_rate_limiters()
+
+
+class TestRateLimiter:
+    def test_requests_wait_once_the_minute_budget_is_spent(self):
+        clock = _Clock()
+        limiter = RateLimiter(requests_per_minute=60, clock=clock)
+        assert [limiter.reserve() for _ in range(60)] == [0.0] * 60
+        # Each further request queues one second (60 RPM) behind the last.
+        assert limiter.reserve() == pytest.approx(1.0)
+        assert limiter.reserve() == pytest.approx(2.0)
+
+    def test_budget_refills_over_time(self):
+        clock = _Clock()
+        limiter = RateLimiter(requests_per_minute=60, burst_seconds=1, clock=clock)
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == pytest.approx(1.0)
+        clock.now += 5
+        # The refill is capped at the one-second burst.
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == pytest.approx(1.0)
+
+    def test_tokens_are_limited_separately(self):
+        clock = _Clock()
+        limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=6000, clock=clock)
+        assert limiter.reserve(tokens=5000) == 0.0
+        # 4000 tokens short at 100 tokens/s.
+        assert limiter.reserve(tokens=5000) == pytest.approx(40.0)
+
+    def test_request_larger_than_the_bucket_waits_for_its_tokens(self):
+        clock = _Clock()
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600, burst_seconds=1, clock=clock)
+        assert limiter.reserve(tokens=100) == pytest.approx(9.0)
+
+    def test_zero_disables_the_limit(self):
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0, clock=_Clock())
+        assert all(limiter.reserve(tokens=10**6) == 0.0 for _ in range(1000))
+
+    def test_pause_holds_back_every_caller(self):
+        clock = _Clock()
+        limiter = RateLimiter(requests_per_minute=600, clock=clock)
+        limiter.pause(3.0)
+        assert limiter.reserve() == pytest.approx(3.0)
+        clock.now += 3.0
+        assert limiter.reserve() == 0.0
+
+    async def test_acquire_sleeps_for_the_reserved_delay(self):
+        limiter = RateLimiter(requests_per_minute=60, clock=_Clock())
+        with patch.object(limiter, "reserve", return_value=0.5), \
+             patch("app.rate_limit.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await limiter.acquire()
+        mock_sleep.assert_awaited_once_with(0.5)
+
+    def test_get_rate_limiter_reads_quota_env(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_CHAT_RPM", "120")
+        monkeypatch.setenv("OPENAI_CHAT_TPM", "9000")
+        chat = rate_limit.get_rate_limiter("chat")
+        # Paced just under the quota.
+        assert chat.requests_per_minute == pytest.approx(120 * rate_limit.QUOTA_HEADROOM)
+        assert chat.tokens_per_minute == pytest.approx(9000 * rate_limit.QUOTA_HEADROOM)
+        assert rate_limit.get_rate_limiter("chat") is chat
+        assert rate_limit.get_rate_limiter("whisper").tokens_per_minute == 0
+
+
+class TestCallWithRateLimit:
+    async def test_retries_after_429_using_retry_after(self):
+        call = AsyncMock(side_effect=[_rate_limit_error({"retry-after-ms": "20"}), "ok"])
+        with patch.object(RateLimiter, "pause") as mock_pause:
+            assert await call_with_rate_limit("chat", 10, call) == "ok"
+        assert call.await_count == 2
+        mock_pause.assert_called_once_with(pytest.approx(0.02))
+
+    async def test_retry_after_seconds_header(self):
+        call = AsyncMock(side_effect=[_rate_limit_error({"retry-after": "0.01"}), "ok"])
+        with patch.object(RateLimiter, "pause") as mock_pause:
+            await call_with_rate_limit("whisper", 0, call)
+        mock_pause.assert_called_once_with(pytest.approx(0.01))
+
+    async def test_gives_up_after_configured_retries(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_RATE_LIMIT_RETRIES", "2")
+        call = AsyncMock(side_effect=_rate_limit_error({"retry-after-ms": "1"}))
+        with pytest.raises(RateLimitError):
+            await call_with_rate_limit("chat", 0, call)
+        assert call.await_count == 3
+
+    async def test_insufficient_quota_is_not_retried(self):
+        call = AsyncMock(side_effect=_rate_limit_error(code="insufficient_quota"))
+        with pytest.raises(RateLimitError):
+            await call_with_rate_limit("chat", 0, call)
+        assert call.await_count == 1
+
+    async def test_transient_errors_are_retried_a_few_times(self):
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        server_error = InternalServerError("Bad gateway", response=httpx.Response(502, request=request), body=None)
+        call = AsyncMock(side_effect=[APIConnectionError(request=request), server_error, "ok"])
+        with patch("app.rate_limit.asyncio.sleep", new_callable=AsyncMock), \
+             patch.object(RateLimiter, "acquire", new_callable=AsyncMock) as mock_acquire:
+            assert await call_with_rate_limit("chat", 10, call) == "ok"
+        # Every attempt is charged to the limiter.
+        assert mock_acquire.await_count == 3
+
+        call = AsyncMock(side_effect=APIConnectionError(request=request))
+        with patch("app.rate_limit.asyncio.sleep", new_callable=AsyncMock), pytest.raises(APIConnectionError):
+            await call_with_rate_limit("chat", 10, call)
+        assert call.await_count == rate_limit.TRANSIENT_RETRIES + 1
+
+    async def test_other_errors_propagate(self):
+        call = AsyncMock(side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError):
+            await call_with_rate_limit("chat", 0, call)
+        assert call.await_count == 1
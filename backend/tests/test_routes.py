@@ -43,6 +43,21 @@ class TestSubmitVideo:
         assert resp.status_code == 200
         assert resp.json()["video_id"] == "dQw4w9WgXcQ"
 
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "Test", "duration": 60})
+    async def test_submit_completed_video_returns_its_transcript(self, mock_meta, client):
+        from app.database import update_video
+        from app.transcript_codec import encode_segments
+
+        first = await client.post("/api/videos", json={"url": "https://youtu.be/done1234567"})
+        segments = [{"start": 0.0, "text": "Hello"}, {"start": 2.5, "text": "world"}]
+        await update_video(first.json()["id"], status="completed", transcript_segments=encode_segments(segments))
+
+        single = (await client.post("/api/videos", json={"url": "https://youtu.be/done1234567"})).json()
+        batch = (await client.post("/api/videos/batch", json={"urls": ["https://youtu.be/done1234567"]})).json()
+
+        assert single["transcript_text"] == "Hello world"
+        assert batch["results"][0]["video"]["transcript_text"] == "Hello world"
+
     @patch("app.routes.fetch_video_metadata", return_value={"error": "Video is private"})
     async def test_submit_meta_error_creates_failed_video(self, mock_meta, client):
         resp = await client.post("/api/videos", json={"url": "https://www.youtube.com/watch?v=private1234"})
@@ -52,6 +67,28 @@ class TestSubmitVideo:
         assert "Video unavailable" in data["error_message"]
 
 
+class TestDeferredMetadataSubmit:
+    @patch("app.routes.fetch_video_metadata")
+    async def test_submit_skips_metadata_lookup(self, mock_meta, client):
+        with patch("app.routes.DEFER_METADATA", True):
+            resp = await client.post("/api/videos", json={"url": "https://youtu.be/defer123456"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["status"] == "queued"
+        assert data["title"] is None
+        mock_meta.assert_not_called()
+
+    @patch("app.routes.fetch_video_metadata")
+    async def test_batch_skips_metadata_lookup(self, mock_meta, client):
+        with patch("app.routes.DEFER_METADATA", True):
+            resp = await client.post("/api/videos/batch", json={
+                "urls": ["https://youtu.be/defer000001", "https://youtu.be/defer000002"],
+            })
+        results = resp.json()["results"]
+        assert all(r["success"] and r["video"]["status"] == "queued" for r in results)
+        mock_meta.assert_not_called()
+
+
 class TestBatchSubmit:
     @patch("app.routes.fetch_video_metadata", return_value={"title": "Test", "duration": 60})
     async def test_batch_mixed_urls(self, mock_meta, client):
@@ -119,6 +156,37 @@ class TestBatchSubmit:
         assert results[0]["error"] == "Network error"
 
 
+    async def test_batch_fetches_metadata_concurrently_in_order(self, client):
+        import time
+
+        def slow_meta(url):
+            time.sleep(0.2)
+            return {"title": url[-11:], "duration": 60}
+
+        urls = [f"https://youtu.be/par{i:08d}" for i in range(10)]
+        with patch("app.routes.fetch_video_metadata", side_effect=slow_meta), \
+             patch("app.routes.BATCH_METADATA_CONCURRENCY", 10):
+            started = time.perf_counter()
+            resp = await client.post("/api/videos/batch", json={"urls": urls})
+            elapsed = time.perf_counter() - started
+
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert [r["url"] for r in results] == urls
+        assert [r["video"]["title"] for r in results] == [u[-11:] for u in urls]
+        assert elapsed < 10 * 0.2 / 2
+
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "Dup", "duration": 60})
+    async def test_batch_duplicate_ids_fetched_once(self, mock_meta, client):
+        resp = await client.post("/api/videos/batch", json={
+            "urls": ["https://youtu.be/twice123456", "https://www.youtube.com/watch?v=twice123456"],
+        })
+        results = resp.json()["results"]
+        assert len(results) == 2
+        assert results[0]["video"]["id"] == results[1]["video"]["id"]
+        assert mock_meta.call_count == 1
+
+
 class TestListVideos:
     @patch("app.routes.fetch_video_metadata", return_value={"title": "V1", "duration": 60})
     async def test_list_all(self, mock_meta, client):
@@ -127,6 +195,24 @@ class TestListVideos:
         assert resp.status_code == 200
         assert len(resp.json()) >= 1
 
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "V1", "duration": 60})
+    async def test_list_excludes_transcript_and_summary(self, mock_meta, client):
+        from app.database import update_video
+
+        create_resp = await client.post("/api/videos", json={"url": "https://youtu.be/lite1234567"})
+        await update_video(
+            create_resp.json()["id"],
+            transcript_segments='[{"start": 0, "text": "Hi"}]',
+            transcript_text="Hi",
+            summary_json='{"overview": "x", "key_points": []}',
+        )
+        resp = await client.get("/api/videos")
+        item = resp.json()[0]
+        assert item["title"] == "V1"
+        assert "transcript_segments" not in item
+        assert "transcript_text" not in item
+        assert "summary_json" not in item
+
     @patch("app.routes.fetch_video_metadata", return_value={"title": "V1", "duration": 60})
     async def test_filter_by_status(self, mock_meta, client):
         await client.post("/api/videos", json={"url": "https://youtu.be/filt1234567"})
@@ -135,6 +221,40 @@ class TestListVideos:
         assert len(resp.json()) == 0
 
 
+class TestListPagination:
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "P", "duration": 60})
+    async def test_cursor_walks_all_pages(self, mock_meta, client):
+        for i in range(5):
+            await client.post("/api/videos", json={"url": f"https://youtu.be/pg{i:09d}"})
+
+        ids = []
+        params = {"limit": 2}
+        while True:
+            resp = await client.get("/api/videos", params=params)
+            assert resp.status_code == 200
+            ids.extend(v["id"] for v in resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            params = {"limit": 2, "after": cursor}
+        assert ids == [5, 4, 3, 2, 1]
+
+    async def test_invalid_cursor_returns_400(self, client):
+        resp = await client.get("/api/videos", params={"limit": 2, "after": "not-a-cursor"})
+        assert resp.status_code == 400
+
+    async def test_invalid_date_returns_400(self, client):
+        resp = await client.get("/api/videos", params={"created_after": "yesterday"})
+        assert resp.status_code == 400
+
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "P", "duration": 60})
+    async def test_created_after_excludes_older_videos(self, mock_meta, client):
+        await client.post("/api/videos", json={"url": "https://youtu.be/date1234567"})
+        resp = await client.get("/api/videos", params={"created_after": "2999-01-01T00:00:00"})
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+
 class TestGetVideo:
     @patch("app.routes.fetch_video_metadata", return_value={"title": "Test", "duration": 60})
     async def test_get_existing(self, mock_meta, client):
@@ -144,6 +264,18 @@ class TestGetVideo:
         assert resp.status_code == 200
         assert resp.json()["video_id"] == "get_1234567"
 
+    @patch("app.routes.fetch_video_metadata", return_value={"title": "Test", "duration": 60})
+    async def test_transcript_text_is_derived_from_segments(self, mock_meta, client):
+        from app.database import update_video
+        from app.transcript_codec import encode_segments
+
+        create_resp = await client.post("/api/videos", json={"url": "https://youtu.be/text1234567"})
+        segments = [{"start": 0.0, "text": "Hello"}, {"start": 2.5, "text": "world"}]
+        await update_video(create_resp.json()["id"], transcript_segments=encode_segments(segments))
+        body = (await client.get(f"/api/videos/{create_resp.json()['id']}")).json()
+        assert body["transcript_segments"] == segments
+        assert body["transcript_text"] == "Hello world"
+
     async def test_get_nonexistent_returns_404(self, client):
         resp = await client.get("/api/videos/9999")
         assert resp.status_code == 404
@@ -158,13 +290,59 @@ class TestDeleteVideo:
         assert resp.status_code == 200
 
     async def test_delete_nonexistent_returns_404(self, client):
-        resp = await client.delete("/api/videos/9999")
+        with patch("app.routes.discard_checkpoints", new_callable=AsyncMock) as mock_discard:
+            resp = await client.delete("/api/videos/9999")
         assert resp.status_code == 404
+        mock_discard.assert_not_called()
+
+    async def test_delete_removes_audio_kept_for_a_retry(self, client, tmp_path):
+        from app.checkpoints import AUDIO
+        from app.database import create_video, put_checkpoint
+
+        video = await create_video(url="https://youtu.be/del_12345678", video_id="del_12345678")
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        await put_checkpoint(video["id"], AUDIO, str(audio))
+
+        resp = await client.delete(f"/api/videos/{video['id']}")
+
+        assert resp.status_code == 200
+        assert not audio.exists()
+
+    async def test_delete_leaves_audio_of_a_processing_video_to_the_worker(self, client, tmp_path):
+        from app.checkpoints import AUDIO
+        from app.database import create_video, get_checkpoints, get_video_by_id, put_checkpoint, update_video
+
+        video = await create_video(url="https://youtu.be/del_12345678", video_id="del_12345678")
+        await update_video(video["id"], status="processing")
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        await put_checkpoint(video["id"], AUDIO, str(audio))
+
+        resp = await client.delete(f"/api/videos/{video['id']}")
+
+        assert resp.status_code == 200
+        assert audio.exists()
+        assert await get_video_by_id(video["id"]) is None
+        assert await get_checkpoints(video["id"]) == {AUDIO: str(audio)}
+
+
+class TestStats:
+    async def test_reports_metadata_cache_counters(self, client):
+        resp = await client.get("/api/stats")
+        assert resp.status_code == 200
+        assert set(resp.json()["metadata_cache"]) == {"hits", "misses", "size"}
+
+    async def test_reports_stage_queue_depths(self, client):
+        stats = {"download": {"queued": 2, "capacity": 2, "active": 1}}
+        with patch("app.routes.pipeline_stats", return_value=stats):
+            resp = await client.get("/api/stats")
+        assert resp.json()["pipeline"] == stats
 
 
 class TestMainExceptionHandler:
     async def test_unhandled_exception_returns_500(self, client):
-        with patch("app.routes.get_all_videos", side_effect=RuntimeError("Unexpected failure")):
+        with patch("app.routes.get_video_summaries", side_effect=RuntimeError("Unexpected failure")):
             resp = await client.get("/api/videos")
         assert resp.status_code == 500
         assert "detail" in resp.json()
@@ -1,10 +1,23 @@
+import asyncio
 import json
-from unittest.mock import patch, MagicMock
+import re
+import time
+from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest
+from openai import RateLimitError
 
+import app.summarizer as summarizer
+from app.checkpoints import Checkpoints
 from app.summarizer import (
+    SYSTEM_PROMPT,
+    _cache_key,
+    _count_tokens_batch,
     _format_timestamped_transcript,
+    _get_encoding,
+    _segment_token_costs,
+    _group_summaries,
+    _summarize_chunked,
     _split_segments_into_chunks,
     generate_summary,
 )
@@ -26,6 +39,25 @@ MOCK_SUMMARY_RESPONSE = json.dumps({
 })
 
 
+class _WordEncoding:
+    """Stand-in tokenizer: one token per whitespace-separated word."""
+
+    def encode_ordinary_batch(self, texts):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def word_tokenizer():
+    with patch("app.summarizer._get_encoding", return_value=_WordEncoding()):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    """Most tests count API calls; TestResponseCache turns the cache back on."""
+    monkeypatch.setenv("LLM_CACHE_MAX_BYTES", "0")
+
+
 class TestFormatTimestampedTranscript:
     def test_formats_segments_correctly(self):
         result = _format_timestamped_transcript(SAMPLE_SEGMENTS)
@@ -42,20 +74,20 @@ class TestFormatTimestampedTranscript:
 
 class TestSplitSegmentsIntoChunks:
     def test_single_chunk_when_small(self):
-        chunks = _split_segments_into_chunks(SAMPLE_SEGMENTS, max_chars=10000)
+        chunks = _split_segments_into_chunks(SAMPLE_SEGMENTS, max_tokens=10000)
         assert len(chunks) == 1
         assert len(chunks[0]) == 3
 
     def test_multiple_chunks_when_large(self):
         segments = [{"start": i * 5.0, "text": f"Segment number {i} with some text."} for i in range(100)]
-        chunks = _split_segments_into_chunks(segments, max_chars=500)
+        chunks = _split_segments_into_chunks(segments, max_tokens=500)
         assert len(chunks) > 1
         total = sum(len(c) for c in chunks)
         assert total == 100
 
     def test_no_empty_chunks(self):
         segments = [{"start": 0.0, "text": "A"}]
-        chunks = _split_segments_into_chunks(segments, max_chars=100)
+        chunks = _split_segments_into_chunks(segments, max_tokens=100)
         assert len(chunks) == 1
         assert len(chunks[0]) == 1
 
@@ -66,36 +98,280 @@ def _make_mock_openai_client(response_content):
     mock_response = MagicMock()
     mock_response.choices = [MagicMock()]
     mock_response.choices[0].message.content = response_content
-    mock_client.chat.completions.create.return_value = mock_response
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
     return mock_client
 
 
 class TestGenerateSummary:
-    @patch("app.summarizer.OpenAI")
-    async def test_single_pass_summary(self, mock_openai_class):
+    @patch("app.summarizer.get_openai_client")
+    async def test_single_pass_summary(self, mock_get_client):
         mock_client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
-        mock_openai_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
-        transcript_text = " ".join(seg["text"] for seg in SAMPLE_SEGMENTS)
-        result = await generate_summary(SAMPLE_SEGMENTS, transcript_text)
+        result = await generate_summary(SAMPLE_SEGMENTS)
 
         assert "overview" in result
         assert "key_points" in result
         assert len(result["key_points"]) == 3
         mock_client.chat.completions.create.assert_called_once()
 
-    @patch("app.summarizer.OpenAI")
-    async def test_chunked_summary(self, mock_openai_class):
+    @patch("app.summarizer.get_openai_client")
+    async def test_chunked_summary(self, mock_get_client):
         mock_client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
-        mock_openai_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
-        # Need >100,000 chars in transcript_text to trigger chunked path
-        long_segments = [{"start": i * 5.0, "text": "x" * 1000} for i in range(150)]
-        long_text = " ".join(seg["text"] for seg in long_segments)
-        assert len(long_text) > 100_000
+        # 150 lines of 4 words (+1 for the newline) overflow a 500-token budget.
+        long_segments = [{"start": i * 5.0, "text": "one more word"} for i in range(150)]
 
-        result = await generate_summary(long_segments, long_text)
+        with patch.dict("os.environ", {"SUMMARY_MAX_INPUT_TOKENS": "500"}):
+            result = await generate_summary(long_segments)
 
         assert "overview" in result
         assert "key_points" in result
         assert mock_client.chat.completions.create.call_count > 1
+
+    @patch("app.summarizer.get_openai_client")
+    async def test_rate_limited_call_is_retried(self, mock_get_client):
+        mock_client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
+        succeed = mock_client.chat.completions.create.return_value
+        limited = RateLimitError("Rate limit reached", body=None,
+                                 response=MagicMock(status_code=429, headers={"retry-after-ms": "1"}))
+        mock_client.chat.completions.create.side_effect = [limited, succeed]
+        mock_get_client.return_value = mock_client
+
+        result = await generate_summary(SAMPLE_SEGMENTS)
+
+        assert result["overview"] == "This video covers testing."
+        assert mock_client.chat.completions.create.call_count == 2
+
+
+class _RecordingClient:
+    """Fake OpenAI client: each chunk summary's overview is its first transcript line,
+    each combine's overview joins the overviews it was given. Tracks peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.combine_calls = 0
+        self.chat = MagicMock()
+        self.chat.completions.create = AsyncMock(side_effect=self._create)
+
+    async def _create(self, model, messages, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        system, user = messages[0]["content"], messages[1]["content"]
+        if system == SYSTEM_PROMPT:
+            overview = re.search(r"part\d+", user).group()
+        else:
+            self.combine_calls += 1
+            overview = " | ".join(
+                line[len("Overview: "):] for line in user.splitlines() if line.startswith("Overview: ")
+            )
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps({"overview": overview, "key_points": []})
+        return response
+
+
+class TestSummarizeChunked:
+    @staticmethod
+    def _segments(words):
+        """Eight segments costing 4 + `words` tokens each once formatted."""
+        return [{"start": float(i), "text": f"part{i:02d} " + "w " * words} for i in range(8)]
+
+    async def test_map_runs_concurrently_and_keeps_chunk_order(self):
+        client = _RecordingClient(delay=0.05)
+        with patch.dict("os.environ", {"SUMMARY_CONCURRENCY": "4"}):
+            started = time.perf_counter()
+            # One segment per chunk, while all eight summaries (6 tokens each)
+            # fit one combine prompt.
+            result = await _summarize_chunked(client, self._segments(40), max_tokens=50)
+            elapsed = time.perf_counter() - started
+
+        assert client.peak == 4
+        assert client.combine_calls == 1
+        assert re.findall(r"part\d+", result["overview"]) == [f"part{i:02d}" for i in range(8)]
+        # Two rounds of four chunk calls plus one combine, instead of nine in a row.
+        assert elapsed < 6 * 0.05
+
+    async def test_reduces_hierarchically_when_combine_prompt_overflows(self):
+        client = _RecordingClient()
+        # One segment per chunk, but only three summaries fit per combine prompt.
+        result = await _summarize_chunked(client, self._segments(10), max_tokens=20)
+
+        assert client.combine_calls > 2
+        assert re.findall(r"part\d+", result["overview"]) == [f"part{i:02d}" for i in range(8)]
+
+
+class TestGroupSummaries:
+    def test_groups_in_order_within_budget(self):
+        # 15 tokens each: 5 for the header and label, 10 for the overview.
+        summaries = [{"overview": "word " * 10, "key_points": []} for _ in range(5)]
+        groups = _group_summaries(summaries, max_tokens=30)
+        assert [len(g) for g in groups] == [2, 2, 1]
+        assert [s for g in groups for s in g] == summaries
+
+    def test_always_pairs_oversized_summaries(self):
+        summaries = [{"overview": "word " * 50, "key_points": []} for _ in range(4)]
+        groups = _group_summaries(summaries, max_tokens=10)
+        assert [len(g) for g in groups] == [2, 2]
+
+
+class TestTokenCounting:
+    def test_segment_cost_is_formatted_line_plus_newline(self):
+        # "[01:05] (65.3s) Now let's discuss the main topic." is 8 words.
+        assert _segment_token_costs(SAMPLE_SEGMENTS[1:2]) == [9]
+
+    def test_chunks_fill_the_token_budget(self):
+        segments = [{"start": float(i), "text": "a b c d e f"} for i in range(10)]
+        # 2 + 6 words + newline = 9 tokens per segment: 3 fit in 27.
+        chunks = _split_segments_into_chunks(segments, max_tokens=27)
+        assert [len(c) for c in chunks] == [3, 3, 3, 1]
+
+    def test_estimate_without_tokenizer_is_conservative_for_non_english(self):
+        with patch("app.summarizer._get_encoding", return_value=None):
+            english, japanese = _count_tokens_batch(["hello world, how are you", "こんにちは世界"])
+        assert english >= len("hello world, how are you") // 4
+        assert japanese >= len("こんにちは世界")
+
+    def test_falls_back_when_encoding_cannot_load(self, monkeypatch):
+        # _get_encoding here is the real function, not the autouse patch.
+        monkeypatch.setattr(summarizer, "_encoding", None)
+        monkeypatch.setattr(summarizer, "_encoding_failed_at", None)
+        with patch("tiktoken.get_encoding", side_effect=ConnectionError("offline")) as mock_load:
+            assert _get_encoding() is None
+            # Not retried on every call...
+            assert _get_encoding() is None
+            assert mock_load.call_count == 1
+        # ...but after the retry interval, instead of for the life of the process.
+        encoding = object()
+        monkeypatch.setattr(summarizer, "_encoding_failed_at",
+                            time.monotonic() - summarizer.ENCODING_RETRY_SECONDS - 1)
+        with patch("tiktoken.get_encoding", return_value=encoding):
+            assert _get_encoding() is encoding
+        assert _get_encoding() is encoding
+
+    async def test_counts_tokens_off_the_event_loop(self):
+        on_loop = []
+
+        class _RecordingEncoding(_WordEncoding):
+            def encode_ordinary_batch(self, texts):
+                on_loop.append(asyncio._get_running_loop() is not None)
+                return super().encode_ordinary_batch(texts)
+
+        client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
+        with patch("app.summarizer._get_encoding", return_value=_RecordingEncoding()), \
+             patch("app.summarizer.get_openai_client", return_value=client):
+            await generate_summary(SAMPLE_SEGMENTS)
+        assert on_loop == [False]
+
+
+def _real_encoding():
+    saved = summarizer._encoding, summarizer._encoding_failed_at
+    try:
+        return _get_encoding()
+    finally:
+        summarizer._encoding, summarizer._encoding_failed_at = saved
+
+
+@pytest.mark.skipif(_real_encoding() is None, reason="tiktoken encoding not available offline")
+class TestRealTokenizer:
+    def test_counts_match_tiktoken(self):
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        line = "[01:05] (65.3s) Now let's discuss the main topic."
+        with patch("app.summarizer._get_encoding", return_value=encoding):
+            assert _segment_token_costs(SAMPLE_SEGMENTS[1:2]) == [len(encoding.encode(line)) + 1]
+
+
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch, test_db):
+        monkeypatch.setenv("LLM_CACHE_MAX_BYTES", str(1024 * 1024))
+
+    @patch("app.summarizer.get_openai_client")
+    async def test_same_transcript_is_summarized_once(self, mock_get_client):
+        mock_client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
+        mock_get_client.return_value = mock_client
+
+        first = await generate_summary(SAMPLE_SEGMENTS)
+        second = await generate_summary(SAMPLE_SEGMENTS)
+
+        assert first == second == json.loads(MOCK_SUMMARY_RESPONSE)
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch("app.summarizer.get_openai_client")
+    async def test_retry_after_combine_failure_reuses_chunk_summaries(self, mock_get_client):
+        client = _RecordingClient()
+        calls = []
+        record = client.chat.completions.create.side_effect
+
+        async def flaky(model, messages, **kwargs):
+            calls.append(messages[0]["content"] == SYSTEM_PROMPT)
+            if messages[0]["content"] != SYSTEM_PROMPT and calls.count(False) == 1:
+                raise RuntimeError("combine timed out")
+            return await record(model, messages, **kwargs)
+
+        client.chat.completions.create.side_effect = flaky
+        mock_get_client.return_value = client
+        segments = [{"start": float(i), "text": f"part{i:02d} " + "w " * 10} for i in range(4)]
+
+        with patch.dict("os.environ", {"SUMMARY_MAX_INPUT_TOKENS": "20"}):
+            with pytest.raises(RuntimeError, match="combine timed out"):
+                await generate_summary(segments)
+            chunk_calls_first_attempt = calls.count(True)
+            await generate_summary(segments)
+
+        assert chunk_calls_first_attempt == 4
+        assert calls.count(True) == 4  # no chunk was summarized twice
+
+    @patch("app.summarizer.get_openai_client")
+    async def test_cache_errors_fall_back_to_the_api(self, mock_get_client):
+        mock_client = _make_mock_openai_client(MOCK_SUMMARY_RESPONSE)
+        mock_get_client.return_value = mock_client
+
+        with patch("app.summarizer.get_cached_llm_response", side_effect=RuntimeError("disk I/O error")), \
+             patch("app.summarizer.put_cached_llm_response", side_effect=RuntimeError("disk I/O error")):
+            result = await generate_summary(SAMPLE_SEGMENTS)
+
+        assert result["overview"] == "This video covers testing."
+
+    def test_key_covers_model_prompts_and_temperature(self):
+        request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.3}
+        assert _cache_key(request) == _cache_key(dict(reversed(request.items())))
+        assert _cache_key(request) != _cache_key({**request, "temperature": 0.5})
+        assert _cache_key(request) != _cache_key({**request, "model": "gpt-4o"})
+        assert _cache_key(request) != _cache_key({**request, "messages": [{"role": "user", "content": "hi!"}]})
+
+
+class TestCheckpoints:
+    @patch("app.summarizer.get_openai_client")
+    async def test_retry_resumes_with_cache_disabled(self, mock_get_client):
+        client = _RecordingClient()
+        calls = []
+        record = client.chat.completions.create.side_effect
+
+        async def flaky(model, messages, **kwargs):
+            calls.append(messages[0]["content"] == SYSTEM_PROMPT)
+            if messages[0]["content"] != SYSTEM_PROMPT and calls.count(False) == 1:
+                raise RuntimeError("combine timed out")
+            return await record(model, messages, **kwargs)
+
+        client.chat.completions.create.side_effect = flaky
+        mock_get_client.return_value = client
+        segments = [{"start": float(i), "text": f"part{i:02d} " + "w " * 10} for i in range(4)]
+        checkpoints = Checkpoints(1)
+
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock), \
+             patch.dict("os.environ", {"SUMMARY_MAX_INPUT_TOKENS": "20"}):
+            with pytest.raises(RuntimeError, match="combine timed out"):
+                await generate_summary(segments, checkpoints)
+            result = await generate_summary(segments, checkpoints)
+
+        assert calls.count(True) == 4  # no chunk was summarized twice
+        assert checkpoints.count("llm:") >= 5
+        assert re.findall(r"part\d+", result["overview"]) == ["part00", "part01", "part02", "part03"]
@@ -1,10 +1,35 @@
+import asyncio
+import importlib.util
 import os
+import shutil
+import subprocess
+import sys
 import tempfile
+import time
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
-from app.transcriber import get_transcript, _fetch_youtube_captions, _transcribe_with_whisper
+import app.transcriber as transcriber
+from app.checkpoints import Checkpoints
+from app.transcriber import (
+    FFMPEG_BINARY,
+    download_audio,
+    get_transcript,
+    _fetch_youtube_captions,
+    _transcribe_with_whisper,
+    _download_audio,
+    _audio_envelope,
+    _plan_chunks,
+    _split_audio,
+    _split_audio_fixed,
+    _whisper_chunked,
+    _whisper_single_file,
+    _whisper_transcribe,
+    _local_transcribe,
+    _local_transcribe_file,
+)
 
 
 SAMPLE_VIDEO = {
@@ -63,7 +88,7 @@ class TestGetTranscript:
         segments, source = await get_transcript(SAMPLE_VIDEO)
         assert source == "whisper"
         assert segments[0]["text"] == "Whisper text"
-        mock_whisper.assert_called_once_with(SAMPLE_VIDEO["url"])
+        mock_whisper.assert_called_once_with(SAMPLE_VIDEO["url"], None)
 
     @patch("app.transcriber._transcribe_with_whisper")
     @patch("app.transcriber._fetch_youtube_captions")
@@ -120,3 +145,511 @@ class TestAudioCleanup:
         with pytest.raises(Exception, match="Whisper failed"):
             await _transcribe_with_whisper("https://youtu.be/test12345ab")
         assert not os.path.exists(tmp.name)
+
+
+class _SlowWhisperClient:
+    """Fake OpenAI client whose transcription call sleeps, then returns one segment per chunk."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.audio = MagicMock()
+        self.audio.transcriptions.create = AsyncMock(side_effect=self._create)
+
+    async def _create(self, file, **kwargs):
+        await asyncio.sleep(self.delay)
+        name = os.path.basename(file.name)
+        response = MagicMock()
+        response.segments = [
+            SimpleNamespace(start=0.0, text=f" {name} start "),
+            SimpleNamespace(start=30.0, text=f" {name} middle "),
+        ]
+        return response
+
+
+def _fake_chunks(tmp_path, durations, overlap=0.0):
+    """Chunk dicts as _split_audio returns them, cut back to back with `overlap` padding."""
+    chunks = []
+    cut = 0.0
+    for i, duration in enumerate(durations):
+        path = tmp_path / f"chunk{i}.mp3"
+        path.write_bytes(b"fake")
+        is_last = i == len(durations) - 1
+        chunks.append({
+            "path": str(path),
+            "offset": max(0.0, cut - overlap),
+            "keep_from": cut,
+            "keep_until": float("inf") if is_last else cut + duration,
+        })
+        cut += duration
+    return chunks
+
+
+class TestWhisperSingleFile:
+    async def test_reads_sdk_segment_models(self, tmp_path):
+        from openai.types.audio import TranscriptionSegment
+
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio")
+        segment = TranscriptionSegment.model_validate({
+            "id": 0, "seek": 0, "start": 1.26, "end": 3.0, "text": " Hi there. ", "tokens": [],
+            "temperature": 0.0, "avg_logprob": 0.0, "compression_ratio": 1.0, "no_speech_prob": 0.0,
+        })
+        client = MagicMock()
+        client.audio.transcriptions.create = AsyncMock(return_value=MagicMock(segments=[segment]))
+
+        segments = await _whisper_single_file(client, str(audio))
+
+        assert segments == [{"start": 1.3, "text": "Hi there."}]
+
+
+class TestWhisperChunked:
+    async def test_merges_in_order_with_chunk_offsets(self, tmp_path):
+        chunks = _fake_chunks(tmp_path, [600.0, 450.5, 120.0])
+        client = _SlowWhisperClient(delay=0)
+
+        with patch("app.transcriber._split_audio", return_value=chunks):
+            segments = await _whisper_chunked(client, str(tmp_path / "audio.mp3"))
+
+        assert [s["start"] for s in segments] == [0.0, 30.0, 600.0, 630.0, 1050.5, 1080.5]
+        assert segments[2]["text"] == "chunk1.mp3 start"
+        assert all(not os.path.exists(c["path"]) for c in chunks)
+
+    async def test_drops_segments_duplicated_by_overlap(self, tmp_path):
+        chunks = _fake_chunks(tmp_path, [40.0, 40.0], overlap=15.0)
+        client = _SlowWhisperClient(delay=0)
+
+        with patch("app.transcriber._split_audio", return_value=chunks):
+            segments = await _whisper_chunked(client, str(tmp_path / "audio.mp3"))
+
+        # chunk0 owns [0, 40): 0.0 and 30.0. chunk1 starts at 25 and owns
+        # [40, inf): its 25.0 segment falls in chunk0's range and is dropped.
+        assert [s["start"] for s in segments] == [0.0, 30.0, 55.0]
+        assert [s["text"] for s in segments][-1] == "chunk1.mp3 middle"
+
+    async def test_wall_time_scales_with_ceil_chunks_over_concurrency(self, tmp_path):
+        delay = 0.1
+        chunks = _fake_chunks(tmp_path, [600.0] * 6)
+        client = _SlowWhisperClient(delay=delay)
+
+        with patch("app.transcriber._split_audio", return_value=chunks), \
+             patch.dict("os.environ", {"WHISPER_CHUNK_CONCURRENCY": "3"}):
+            started = time.perf_counter()
+            segments = await _whisper_chunked(client, str(tmp_path / "audio.mp3"))
+            elapsed = time.perf_counter() - started
+
+        assert len(segments) == 12
+        # ceil(6 / 3) = 2 rounds of requests instead of 6.
+        assert 2 * delay <= elapsed < 4 * delay
+
+    async def test_removes_chunks_when_a_request_fails(self, tmp_path):
+        chunks = _fake_chunks(tmp_path, [600.0, 600.0])
+        client = MagicMock()
+        client.audio.transcriptions.create = AsyncMock(side_effect=Exception("Whisper down"))
+
+        with patch("app.transcriber._split_audio", return_value=chunks):
+            with pytest.raises(Exception, match="Whisper down"):
+                await _whisper_chunked(client, str(tmp_path / "audio.mp3"))
+
+        assert all(not os.path.exists(c["path"]) for c in chunks)
+
+    async def test_retry_skips_chunks_finished_by_an_earlier_attempt(self, tmp_path):
+        chunks = _fake_chunks(tmp_path, [600.0, 600.0, 600.0])
+        checkpoints = Checkpoints(1)
+        client = _SlowWhisperClient(delay=0)
+        # The first attempt fails on the last chunk after finishing the others.
+        create = client._create
+
+        async def fail_last(file, **kwargs):
+            if file.name.endswith("chunk2.mp3"):
+                await asyncio.sleep(0.05)
+                raise Exception("Whisper down")
+            return await create(file, **kwargs)
+
+        client.audio.transcriptions.create.side_effect = fail_last
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock), \
+             patch("app.transcriber._split_audio", return_value=chunks):
+            with pytest.raises(Exception, match="Whisper down"):
+                await _whisper_chunked(client, str(tmp_path / "audio.mp3"), checkpoints)
+            assert checkpoints.count("whisper:") == 2
+
+            retry_chunks = _fake_chunks(tmp_path, [600.0, 600.0, 600.0])
+            retry_client = _SlowWhisperClient(delay=0)
+            with patch("app.transcriber._split_audio", return_value=retry_chunks):
+                segments = await _whisper_chunked(retry_client, str(tmp_path / "audio.mp3"), checkpoints)
+
+        assert retry_client.audio.transcriptions.create.await_count == 1
+        assert [s["start"] for s in segments] == [0.0, 30.0, 600.0, 630.0, 1200.0, 1230.0]
+        assert all(not os.path.exists(c["path"]) for c in retry_chunks)
+
+
+class TestAudioCheckpoint:
+    async def test_download_is_saved_and_reused(self, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        checkpoints = Checkpoints(1)
+
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock), \
+             patch("app.transcriber._download_audio", return_value=str(audio)) as mock_download:
+            assert await download_audio("https://youtu.be/test12345ab", checkpoints) == str(audio)
+            assert await download_audio("https://youtu.be/test12345ab", checkpoints) == str(audio)
+
+        mock_download.assert_called_once()
+        assert checkpoints.get("audio") == str(audio)
+
+    async def test_missing_saved_file_is_downloaded_again(self, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        checkpoints = Checkpoints(1, {"audio": str(tmp_path / "gone.ogg")})
+
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock), \
+             patch("app.transcriber._download_audio", return_value=str(audio)):
+            assert await download_audio("https://youtu.be/test12345ab", checkpoints) == str(audio)
+
+    @patch("app.transcriber._whisper_transcribe")
+    @patch("app.transcriber._download_audio")
+    async def test_failed_attempt_keeps_checkpointed_audio(self, mock_download, mock_whisper, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        mock_download.return_value = str(audio)
+        mock_whisper.side_effect = Exception("Whisper failed")
+
+        with patch("app.checkpoints.put_checkpoint", new_callable=AsyncMock):
+            with pytest.raises(Exception, match="Whisper failed"):
+                await _transcribe_with_whisper("https://youtu.be/test12345ab", Checkpoints(1))
+        assert audio.exists()
+
+
+def _envelope(total_seconds, quiet=()):
+    """Flat -20 dB envelope at 0.1 s windows, with -90 dB at the given window starts."""
+    quiet = {round(t, 1) for t in quiet}
+    windows = int(round(total_seconds / 0.1))
+    return [(round(i * 0.1, 1), -90.0 if round(i * 0.1, 1) in quiet else -20.0) for i in range(windows)]
+
+
+class TestPlanChunks:
+    def test_short_audio_is_a_single_chunk(self):
+        plan = _plan_chunks(_envelope(100), 100.0, target_seconds=300, search_seconds=30, overlap_seconds=1)
+        assert plan == [{"start": 0.0, "end": 100.0, "keep_from": 0.0, "keep_until": float("inf")}]
+
+    def test_cuts_snap_to_quietest_window_in_search_range(self):
+        envelope = _envelope(700, quiet=[312.0, 590.0])
+        plan = _plan_chunks(envelope, 700.0, target_seconds=300, search_seconds=30, overlap_seconds=1)
+
+        cuts = [p["keep_from"] for p in plan]
+        assert cuts == pytest.approx([0.0, 312.05, 590.05])
+        assert plan[1]["start"] == pytest.approx(311.05)
+        assert plan[0]["end"] == pytest.approx(313.05)
+        assert plan[0]["keep_until"] == plan[1]["keep_from"]
+        assert plan[-1]["keep_until"] == float("inf")
+        assert plan[-1]["end"] == 700.0
+
+    def test_ignores_silence_outside_search_range(self):
+        envelope = _envelope(700, quiet=[200.0])
+        plan = _plan_chunks(envelope, 700.0, target_seconds=300, search_seconds=30, overlap_seconds=0)
+        # No quiet window near 300 s, so the window at the ideal cut wins the tie.
+        assert plan[1]["keep_from"] == pytest.approx(300.05)
+
+    def test_cuts_move_forward_when_search_reaches_back_past_the_last_cut(self):
+        envelope = _envelope(200, quiet=[5.0])
+        plan = _plan_chunks(envelope, 200.0, target_seconds=20, search_seconds=30, overlap_seconds=1)
+
+        cuts = [p["keep_from"] for p in plan]
+        assert cuts == sorted(set(cuts))
+        assert all(b - a >= 10 for a, b in zip(cuts, cuts[1:]))
+
+
+class TestAudioEnvelope:
+    def test_parses_ffmpeg_metadata_stream(self):
+        output = [
+            "frame:0    pts:0       pts_time:0\n",
+            "lavfi.astats.Overall.RMS_level=-21.5\n",
+            "frame:1    pts:800     pts_time:0.1\n",
+            "lavfi.astats.Overall.RMS_level=-inf\n",
+        ]
+        proc = MagicMock()
+        proc.__enter__.return_value = proc
+        proc.stdout = iter(output)
+        proc.returncode = 0
+
+        with patch("app.transcriber.subprocess.Popen", return_value=proc) as mock_popen:
+            envelope = _audio_envelope("audio.mp3")
+
+        assert envelope == [(0.0, -21.5), (0.1, float("-inf"))]
+        assert "astats" in mock_popen.call_args.args[0][mock_popen.call_args.args[0].index("-af") + 1]
+
+    def test_raises_when_ffmpeg_fails(self):
+        proc = MagicMock()
+        proc.__enter__.return_value = proc
+        proc.stdout = iter([])
+        proc.returncode = 1
+
+        with patch("app.transcriber.subprocess.Popen", return_value=proc):
+            with pytest.raises(RuntimeError):
+                _audio_envelope("audio.mp3")
+
+
+class TestSplitAudio:
+    def test_extracts_each_planned_chunk_with_stream_copy(self, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio")
+
+        with patch("app.transcriber._audio_envelope", return_value=_envelope(700, quiet=[312.0])), \
+             patch("app.transcriber.subprocess.run") as mock_run:
+            chunks = _split_audio(str(audio))
+
+        assert len(chunks) == 3
+        first_cmd = mock_run.call_args_list[0].args[0]
+        assert first_cmd[first_cmd.index("-c") + 1] == "copy"
+        assert chunks[1]["keep_from"] == pytest.approx(312.05)
+        assert chunks[1]["offset"] == pytest.approx(311.05)
+        assert os.path.basename(chunks[0]["path"]) == "audio.mp3.chunk000.mp3"
+
+    def test_falls_back_to_fixed_cuts_without_envelope(self, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio")
+
+        with patch("app.transcriber._audio_envelope", side_effect=RuntimeError("no ffmpeg")), \
+             patch("app.transcriber._split_audio_fixed", return_value=[]) as mock_fixed:
+            _split_audio(str(audio))
+
+        mock_fixed.assert_called_once_with(str(audio), 300)
+
+    @pytest.mark.skipif(shutil.which(FFMPEG_BINARY) is None, reason="ffmpeg not installed")
+    def test_places_cut_in_real_silence(self, tmp_path):
+        audio = tmp_path / "audio.ogg"
+        # 50 s tone, 2 s of silence, 20 s tone.
+        subprocess.run(
+            [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "sine=frequency=440:duration=50",
+             "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono:d=2",
+             "-f", "lavfi", "-i", "sine=frequency=440:duration=20",
+             "-filter_complex", "[0][1][2]concat=n=3:v=0:a=1",
+             "-c:a", "libopus", "-b:a", "24k", str(audio)],
+            check=True,
+        )
+        env = {"WHISPER_CHUNK_SECONDS": "40", "WHISPER_CHUNK_SEARCH_SECONDS": "15",
+               "WHISPER_CHUNK_OVERLAP_SECONDS": "1"}
+        with patch.dict("os.environ", env):
+            chunks = _split_audio(str(audio))
+
+        assert len(chunks) == 2
+        assert 50.0 <= chunks[1]["keep_from"] <= 52.0
+        assert all(os.path.getsize(c["path"]) > 0 for c in chunks)
+
+
+def _fake_ffmpeg_segmenter(durations):
+    """Stand-in for subprocess.run that writes chunk files and the CSV segment list."""
+    def run(cmd, **kwargs):
+        pattern = cmd[-1]
+        list_path = cmd[cmd.index("-segment_list") + 1]
+        start = 0.0
+        with open(list_path, "w") as f:
+            for i, duration in enumerate(durations):
+                path = pattern % i
+                with open(path, "wb") as chunk:
+                    chunk.write(b"chunk")
+                f.write(f"{os.path.basename(path)},{start:.6f},{start + duration:.6f}\n")
+                start += duration
+        return MagicMock(returncode=0)
+    return run
+
+
+class TestSplitAudioFixed:
+    def test_stream_copies_segments_and_reads_boundaries(self, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio")
+
+        with patch("app.transcriber.subprocess.run", side_effect=_fake_ffmpeg_segmenter([600.01, 120.5])) as mock_run:
+            chunks = _split_audio_fixed(str(audio))
+
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        assert cmd[cmd.index("-f") + 1] == "segment"
+        assert [os.path.basename(c["path"]) for c in chunks] == ["audio.mp3.chunk000.mp3", "audio.mp3.chunk001.mp3"]
+        assert [round(c["offset"], 2) for c in chunks] == [0.0, 600.01]
+        assert chunks[0]["keep_until"] == pytest.approx(600.01)
+        assert chunks[-1]["keep_until"] == float("inf")
+        assert not (tmp_path / "audio.mp3.chunks.csv").exists()
+
+    def test_removes_partial_chunks_when_ffmpeg_fails(self, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        audio.write_bytes(b"audio")
+        (tmp_path / "audio.mp3.chunk000.mp3").write_bytes(b"partial")
+
+        error = subprocess.CalledProcessError(1, "ffmpeg")
+        with patch("app.transcriber.subprocess.run", side_effect=error):
+            with pytest.raises(subprocess.CalledProcessError):
+                _split_audio_fixed(str(audio))
+
+        assert sorted(os.listdir(tmp_path)) == ["audio.mp3"]
+
+    @pytest.mark.skipif(shutil.which(FFMPEG_BINARY) is None, reason="ffmpeg not installed")
+    def test_splits_real_audio(self, tmp_path):
+        audio = tmp_path / "audio.mp3"
+        subprocess.run(
+            [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+             "-i", "sine=frequency=440:duration=150", "-b:a", "32k", str(audio)],
+            check=True,
+        )
+        chunks = _split_audio_fixed(str(audio), chunk_seconds=60)
+        assert len(chunks) == 3
+        assert chunks[-1]["offset"] == pytest.approx(120, abs=1)
+        assert all(os.path.getsize(c["path"]) > 0 for c in chunks)
+
+
+def _fake_ydl_writing(filename):
+    """Patchable YoutubeDL class whose download() writes `filename` into the outtmpl directory."""
+    def factory(opts):
+        ydl = MagicMock()
+        ydl.__enter__ = MagicMock(return_value=ydl)
+        ydl.__exit__ = MagicMock(return_value=False)
+
+        def download(urls):
+            directory = os.path.dirname(opts["outtmpl"])
+            with open(os.path.join(directory, filename), "wb") as f:
+                f.write(b"audio")
+
+        ydl.download.side_effect = download
+        return ydl
+    return MagicMock(side_effect=factory)
+
+
+class TestDownloadAudio:
+    def test_compact_profile_keeps_native_stream(self):
+        mock_ydl = _fake_ydl_writing("audio.webm")
+        with patch("app.transcriber.yt_dlp.YoutubeDL", mock_ydl), \
+             patch.dict("os.environ", {"AUDIO_PROFILE": "compact"}):
+            path = _download_audio("https://youtu.be/test12345ab")
+
+        opts = mock_ydl.call_args.args[0]
+        assert opts["format"].startswith("worstaudio")
+        assert "postprocessors" not in opts
+        assert path.endswith("audio.webm")
+        os.remove(path)
+
+    def test_compact_profile_accepts_a_muxed_mp4(self):
+        mock_ydl = _fake_ydl_writing("audio.mp4")
+        with patch("app.transcriber.yt_dlp.YoutubeDL", mock_ydl), \
+             patch.dict("os.environ", {"AUDIO_PROFILE": "compact"}):
+            path = _download_audio("https://youtu.be/test12345ab")
+
+        assert path.endswith("audio.mp4")
+        os.remove(path)
+
+    def test_speech_profile_renames_opus_to_ogg(self):
+        mock_ydl = _fake_ydl_writing("audio.opus")
+        with patch("app.transcriber.yt_dlp.YoutubeDL", mock_ydl), \
+             patch.dict("os.environ", {"AUDIO_PROFILE": "speech"}):
+            path = _download_audio("https://youtu.be/test12345ab")
+
+        opts = mock_ydl.call_args.args[0]
+        assert opts["postprocessors"][0]["preferredcodec"] == "opus"
+        assert opts["postprocessor_args"]["extractaudio"] == ["-ac", "1", "-ar", "16000"]
+        assert path.endswith("audio.ogg")
+        assert os.path.exists(path)
+        os.remove(path)
+
+    def test_mp3_profile_matches_original_behaviour(self):
+        mock_ydl = _fake_ydl_writing("audio.mp3")
+        with patch("app.transcriber.yt_dlp.YoutubeDL", mock_ydl), \
+             patch.dict("os.environ", {"AUDIO_PROFILE": "mp3"}):
+            path = _download_audio("https://youtu.be/test12345ab")
+
+        opts = mock_ydl.call_args.args[0]
+        assert opts["format"] == "bestaudio/best"
+        assert opts["postprocessors"][0]["preferredquality"] == "128"
+        assert path.endswith("audio.mp3")
+        os.remove(path)
+
+    def test_unknown_profile_raises(self):
+        with patch.dict("os.environ", {"AUDIO_PROFILE": "lossless"}):
+            with pytest.raises(ValueError, match="AUDIO_PROFILE"):
+                _download_audio("https://youtu.be/test12345ab")
+
+    def test_missing_output_raises(self):
+        mock_ydl = _fake_ydl_writing("audio.part")
+        with patch("app.transcriber.yt_dlp.YoutubeDL", mock_ydl):
+            with pytest.raises(FileNotFoundError):
+                _download_audio("https://youtu.be/test12345ab")
+
+
+class TestTranscriptionBackends:
+    async def test_defaults_to_openai(self):
+        openai_backend = AsyncMock(return_value=[{"start": 0.0, "text": "api"}])
+        with patch.dict(transcriber._TRANSCRIPTION_BACKENDS, {"openai": openai_backend}):
+            segments = await _whisper_transcribe("audio.mp3")
+        assert segments == [{"start": 0.0, "text": "api"}]
+        openai_backend.assert_awaited_once_with("audio.mp3", None)
+
+    async def test_selects_local_backend(self):
+        local_backend = AsyncMock(return_value=[{"start": 0.0, "text": "local"}])
+        with patch.dict(transcriber._TRANSCRIPTION_BACKENDS, {"local": local_backend}), \
+             patch.dict("os.environ", {"TRANSCRIPTION_BACKEND": "local"}):
+            segments = await _whisper_transcribe("audio.mp3")
+        assert segments == [{"start": 0.0, "text": "local"}]
+
+    async def test_unknown_backend_raises(self):
+        with patch.dict("os.environ", {"TRANSCRIPTION_BACKEND": "nope"}):
+            with pytest.raises(ValueError, match="TRANSCRIPTION_BACKEND"):
+                await _whisper_transcribe("audio.mp3")
+
+
+class TestLocalBackend:
+    @pytest.fixture(autouse=True)
+    def reset_local_state(self):
+        transcriber._local_model = None
+        yield
+        transcriber._local_model = None
+        transcriber.shutdown_local_backend()
+
+    def test_formats_segments_and_loads_model_once(self):
+        model = MagicMock()
+        model.transcribe.return_value = (
+            [MagicMock(start=0.04, text=" Hello "), MagicMock(start=3.26, text=" there ")],
+            MagicMock(),
+        )
+        fake_module = MagicMock()
+        fake_module.WhisperModel.return_value = model
+
+        with patch.dict(sys.modules, {"faster_whisper": fake_module}):
+            first = _local_transcribe_file("audio.ogg")
+            _local_transcribe_file("audio.ogg")
+
+        assert first == [{"start": 0.0, "text": "Hello"}, {"start": 3.3, "text": "there"}]
+        fake_module.WhisperModel.assert_called_once()
+        assert fake_module.WhisperModel.call_args.kwargs["compute_type"] == "int8"
+
+    def test_missing_dependency_has_clear_error(self):
+        with patch.dict(sys.modules, {"faster_whisper": None}):
+            with pytest.raises(RuntimeError, match="faster-whisper"):
+                _local_transcribe_file("audio.ogg")
+
+    async def test_pool_runs_in_a_separate_process(self):
+        pool = transcriber._get_local_pool()
+        pid = await asyncio.get_running_loop().run_in_executor(pool, os.getpid)
+        assert pid != os.getpid()
+        assert transcriber._get_local_pool() is pool
+
+    @pytest.mark.skipif(importlib.util.find_spec("faster_whisper") is not None,
+                        reason="faster-whisper installed")
+    async def test_worker_errors_reach_the_caller(self):
+        with pytest.raises(RuntimeError, match="faster-whisper"):
+            await _local_transcribe("audio.ogg")
+
+    def test_started_by_the_lifespan_only_for_the_local_backend(self, monkeypatch):
+        monkeypatch.setenv("TRANSCRIPTION_BACKEND", "openai")
+        transcriber.start_local_backend()
+        assert transcriber._local_pool is None
+
+        monkeypatch.setenv("TRANSCRIPTION_BACKEND", "local")
+        transcriber.start_local_backend()
+        pool = transcriber._local_pool
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        transcriber.start_local_backend()
+        assert transcriber._get_local_pool() is pool
+
+    async def test_shutdown_is_idempotent(self):
+        transcriber._get_local_pool()
+        transcriber.shutdown_local_backend()
+        transcriber.shutdown_local_backend()
+        assert transcriber._local_pool is None
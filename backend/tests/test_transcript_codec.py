@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+import app.transcript_codec as codec
+from app.transcript_codec import decode_segments, encode_segments, transcript_text
+
+SEGMENTS = [
+    {"start": 0.0, "text": "Hello and welcome."},
+    {"start": 65.3, "text": "Ünïcode, emoji 🎉 and 中文 survive."},
+    {"start": 7199.9, "text": ""},
+    {"start": 36000.1, "text": "Ten hours in."},
+]
+
+
+class TestTranscriptCodec:
+    @pytest.mark.parametrize("compression", ["none", "zlib"])
+    def test_round_trip(self, monkeypatch, compression):
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", compression)
+        assert decode_segments(encode_segments(SEGMENTS)) == SEGMENTS
+
+    def test_round_trip_zstd(self, monkeypatch):
+        pytest.importorskip("zstandard")
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "zstd")
+        assert decode_segments(encode_segments(SEGMENTS)) == SEGMENTS
+
+    def test_zstd_falls_back_to_uncompressed_when_not_installed(self, monkeypatch):
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "zstd")
+        monkeypatch.setattr(codec, "zstandard", None)
+        encoded = encode_segments(SEGMENTS)
+        assert encoded[5] == codec._CODECS["none"]
+        assert decode_segments(encoded) == SEGMENTS
+
+    def test_empty_transcript(self):
+        assert decode_segments(encode_segments([])) == []
+
+    def test_smaller_than_json(self, monkeypatch):
+        segments = [{"start": i * 3.2, "text": f"Segment {i} says something about the topic."}
+                    for i in range(2000)]
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "none")
+        raw = encode_segments(segments)
+        assert len(raw) < len(json.dumps(segments)) * 0.8
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "zlib")
+        assert len(encode_segments(segments)) < len(raw) / 3
+
+    def test_decodes_legacy_json(self):
+        assert decode_segments(json.dumps(SEGMENTS)) == SEGMENTS
+
+    def test_rejects_unknown_data(self):
+        with pytest.raises(ValueError):
+            decode_segments(b"NOPE\x01\x00\x00\x00\x00\x00")
+
+    def test_unknown_compression_setting(self, monkeypatch):
+        monkeypatch.setenv("TRANSCRIPT_COMPRESSION", "brotli")
+        with pytest.raises(ValueError):
+            encode_segments(SEGMENTS)
+
+    def test_transcript_text_joins_segments(self):
+        assert transcript_text(SEGMENTS[:2]) == "Hello and welcome. Ünïcode, emoji 🎉 and 中文 survive."
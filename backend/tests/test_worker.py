@@ -1,4 +1,5 @@
 import asyncio
+from datetime import datetime, timezone
 from unittest.mock import patch, AsyncMock
 
 import pytest
@@ -35,12 +36,11 @@ async def _run_worker_once(get_queued_returns, process_side_effect=None):
     mock_update = AsyncMock()
 
     with patch("app.pipeline.process_video", mock_process), \
-         patch("app.database.get_next_queued_video", side_effect=mock_get_next), \
+         patch("app.database.claim_next_queued_video", side_effect=mock_get_next), \
          patch("app.database.update_video", mock_update), \
          patch.dict("os.environ", {
              "WORKER_POLL_INTERVAL": "0",
              "MAX_RETRY_ATTEMPTS": "3",
-             "RETRY_DELAY_SECONDS": "0",
          }):
 
         worker_module._worker_running = True
@@ -56,8 +56,8 @@ class TestWorkerPicksUpJob:
     async def test_processes_queued_job(self):
         mock_process, mock_update = await _run_worker_once(SAMPLE_VIDEO)
 
-        mock_update.assert_any_call(1, status="processing")
         mock_process.assert_called_once_with(SAMPLE_VIDEO)
+        mock_update.assert_not_called()
 
 
 class TestWorkerRetryOnFailure:
@@ -72,6 +72,48 @@ class TestWorkerRetryOnFailure:
         requeue_call = [c for c in update_calls if c.kwargs.get("status") == "queued"]
         assert len(requeue_call) == 1
         assert requeue_call[0].kwargs["attempt_count"] == 1
+        assert requeue_call[0].kwargs["next_attempt_at"] is not None
+
+    async def test_removes_audio_of_a_video_deleted_while_processing(self, test_db, tmp_path):
+        from app.checkpoints import AUDIO
+        from app.database import create_video, delete_video, get_checkpoints, put_checkpoint, update_video
+
+        video = await create_video(url="https://youtu.be/dele1234567", video_id="dele1234567")
+        video = await update_video(video["id"], status="processing")
+        audio = tmp_path / "audio.ogg"
+        audio.write_bytes(b"audio")
+        await put_checkpoint(video["id"], AUDIO, str(audio))
+
+        await delete_video(video["id"])
+        await worker_module._handle_failure(video, Exception("Transient error"))
+
+        assert not audio.exists()
+        assert await get_checkpoints(video["id"]) == {}
+
+    async def test_requeue_does_not_sleep_for_retry_delay(self):
+        video = {**SAMPLE_VIDEO, "attempt_count": 0}
+        with patch.dict("os.environ", {"RETRY_DELAY_SECONDS": "3600"}):
+            await asyncio.wait_for(
+                _run_worker_once(video, process_side_effect=Exception("Transient error")),
+                timeout=1,
+            )
+
+
+class TestNextAttemptAt:
+    def test_backoff_grows_exponentially_within_jitter(self):
+        now = datetime.now(timezone.utc)
+        delays = []
+        for attempt in (1, 2, 3):
+            scheduled = datetime.fromisoformat(worker_module._next_attempt_at(attempt, 10, 900))
+            delays.append((scheduled - now).total_seconds())
+        assert 8 <= delays[0] <= 12.5
+        assert 16 <= delays[1] <= 24.5
+        assert 32 <= delays[2] <= 48.5
+
+    def test_backoff_is_capped(self):
+        now = datetime.now(timezone.utc)
+        scheduled = datetime.fromisoformat(worker_module._next_attempt_at(20, 10, 60))
+        assert (scheduled - now).total_seconds() <= 60 * 1.2 + 1
 
 
 class TestWorkerPermanentFailure:
@@ -88,6 +130,16 @@ class TestWorkerPermanentFailure:
         assert fail_call[0].kwargs["attempt_count"] == 3
         assert "Persistent error" in fail_call[0].kwargs["error_message"]
 
+    async def test_discards_checkpoints_only_when_out_of_retries(self):
+        with patch("app.checkpoints.discard_checkpoints", new_callable=AsyncMock) as mock_discard:
+            await _run_worker_once({**SAMPLE_VIDEO, "attempt_count": 0},
+                                   process_side_effect=Exception("Transient error"))
+            mock_discard.assert_not_called()
+
+            await _run_worker_once({**SAMPLE_VIDEO, "attempt_count": 2},
+                                   process_side_effect=Exception("Persistent error"))
+            mock_discard.assert_awaited_once_with(SAMPLE_VIDEO["id"])
+
 
 class TestWorkerIdlesWhenEmpty:
     async def test_does_not_process_when_no_jobs(self):
@@ -101,7 +153,7 @@ class TestWorkerIdlesWhenEmpty:
             return None
 
         with patch("app.pipeline.process_video", mock_process), \
-             patch("app.database.get_next_queued_video", side_effect=mock_get_next), \
+             patch("app.database.claim_next_queued_video", side_effect=mock_get_next), \
              patch("app.database.update_video", AsyncMock()), \
              patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "0"}):
 
@@ -114,6 +166,277 @@ class TestWorkerIdlesWhenEmpty:
         mock_process.assert_not_called()
 
 
+class TestWorkerConcurrency:
+    async def _process_batch(self, concurrency, count=6, stage_delay=0.1):
+        """Queue `count` videos and time how long `concurrency` workers take to finish them."""
+        from app.database import create_video, get_all_videos
+
+        for i in range(count):
+            await create_video(url=f"https://youtu.be/conc{i:07d}", video_id=f"conc{i:07d}",
+                               title=f"Video {i}", duration=60)
+
+        async def fake_transcript(video, checkpoints=None):
+            await asyncio.sleep(stage_delay)
+            return [{"start": 0.0, "text": "Hello"}], "youtube_captions"
+
+        async def fake_summary(segments, checkpoints=None):
+            await asyncio.sleep(stage_delay)
+            return {"overview": "Done.", "key_points": []}
+
+        with patch("app.pipeline.get_transcript", side_effect=fake_transcript), \
+             patch("app.pipeline.generate_summary", side_effect=fake_summary), \
+             patch.dict("os.environ", {
+                 "WORKER_POLL_INTERVAL": "0",
+                 "WORKER_CONCURRENCY": str(concurrency),
+             }):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            task = await worker_module.start_worker()
+            try:
+                while True:
+                    videos = await get_all_videos()
+                    if all(v["status"] == "completed" for v in videos):
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await worker_module.stop_worker(task)
+            return loop.time() - started
+
+    async def test_throughput_scales_with_concurrency(self, test_db):
+        serial = await self._process_batch(concurrency=1)
+        # Reset the table for the parallel run.
+        from app.database import get_all_videos, delete_video
+        for v in await get_all_videos():
+            await delete_video(v["id"])
+        parallel = await self._process_batch(concurrency=3)
+
+        assert serial >= 6 * 0.2
+        assert parallel < serial / 2
+
+    async def test_each_video_processed_once(self, test_db):
+        from app.database import create_video
+
+        for i in range(8):
+            await create_video(url=f"https://youtu.be/once{i:07d}", video_id=f"once{i:07d}")
+
+        processed = []
+
+        async def fake_process(video):
+            processed.append(video["id"])
+            await asyncio.sleep(0.01)
+            from app.database import update_video
+            await update_video(video["id"], status="completed")
+
+        with patch("app.pipeline.process_video", side_effect=fake_process), \
+             patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "0", "WORKER_CONCURRENCY": "4"}):
+            task = await worker_module.start_worker()
+            try:
+                while len(processed) < 8:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+            finally:
+                await worker_module.stop_worker(task)
+
+        assert sorted(processed) == sorted(set(processed))
+        assert len(processed) == 8
+
+
+def _stub_stages(delay=0.05):
+    """Stage stand-ins that sleep; captioned videos (odd ids) skip transcode and transcribe."""
+    async def fetch(job):
+        await asyncio.sleep(delay)
+
+    async def transcode(job):
+        if job["video"]["id"] % 2 == 0:
+            await asyncio.sleep(delay)
+
+    async def transcribe(job):
+        if job["video"]["id"] % 2 == 0:
+            await asyncio.sleep(delay)
+
+    async def summarize(job):
+        from app.database import update_video
+        await asyncio.sleep(delay)
+        await update_video(job["video"]["id"], status="completed")
+
+    return {"fetch_stage": fetch, "transcode_stage": transcode,
+            "transcribe_stage": transcribe, "summarize_stage": summarize}
+
+
+class TestStagedWorker:
+    STAGE_ENV = {
+        "WORKER_POLL_INTERVAL": "0",
+        "STAGE_DOWNLOAD_CONCURRENCY": "1",
+        "STAGE_TRANSCODE_CONCURRENCY": "1",
+        "STAGE_TRANSCRIBE_CONCURRENCY": "1",
+        "STAGE_SUMMARIZE_CONCURRENCY": "1",
+    }
+
+    async def _run_batch(self, mode, count=8):
+        from app.database import create_video, get_all_videos
+        from app.pipeline import new_job
+
+        for i in range(count):
+            await create_video(url=f"https://youtu.be/{mode[:4]}{i:07d}", video_id=f"{mode[:4]}{i:07d}",
+                               title=f"Video {i}", duration=60)
+        stages = _stub_stages()
+
+        async def serial_process(video):
+            job = new_job(video)
+            for name in ("fetch_stage", "transcode_stage", "transcribe_stage", "summarize_stage"):
+                await stages[name](job)
+
+        patches = [patch(f"app.pipeline.{name}", side_effect=func) for name, func in stages.items()]
+        patches.append(patch("app.pipeline.process_video", side_effect=serial_process))
+        env = {**self.STAGE_ENV, "WORKER_MODE": mode, "WORKER_CONCURRENCY": "1"}
+        for p in patches:
+            p.start()
+        try:
+            with patch.dict("os.environ", env):
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                task = await worker_module.start_worker()
+                try:
+                    while not all(v["status"] == "completed" for v in await get_all_videos()):
+                        await asyncio.sleep(0.01)
+                finally:
+                    await worker_module.stop_worker(task)
+                return loop.time() - started
+        finally:
+            for p in patches:
+                p.stop()
+
+    async def test_overlapping_stages_beat_serial_on_mixed_batch(self, test_db):
+        serial = await self._run_batch("serial")
+        from app.database import delete_video, get_all_videos
+        for v in await get_all_videos():
+            await delete_video(v["id"])
+        staged = await self._run_batch("staged")
+
+        # Serial: 4 whisper videos x 4 stages + 4 captioned x 2 = 24 stage delays.
+        assert serial >= 24 * 0.05
+        assert staged < serial * 0.6
+
+    async def test_reports_queue_depths_while_running(self, test_db):
+        from app.database import create_video
+
+        for i in range(6):
+            await create_video(url=f"https://youtu.be/deep{i:07d}", video_id=f"deep{i:07d}")
+        release = asyncio.Event()
+
+        async def blocked_fetch(job):
+            await release.wait()
+
+        with patch("app.pipeline.fetch_stage", side_effect=blocked_fetch), \
+             patch.dict("os.environ", {**self.STAGE_ENV, "WORKER_MODE": "staged", "STAGE_QUEUE_SIZE": "2"}):
+            task = await worker_module.start_worker()
+            try:
+                await asyncio.sleep(0.1)
+                stats = worker_module.pipeline_stats()
+            finally:
+                release.set()
+                await worker_module.stop_worker(task)
+
+        assert stats["download"] == {"queued": 2, "capacity": 2, "active": 1}
+        assert stats["summarize"]["queued"] == 0
+        assert worker_module.pipeline_stats() == {}
+
+    async def test_stage_failure_requeues_and_drops_job(self, test_db):
+        from app.database import create_video, get_video_by_id
+
+        video = await create_video(url="https://youtu.be/fail1234567", video_id="fail1234567")
+        summarize = AsyncMock()
+
+        with patch("app.pipeline.fetch_stage", side_effect=RuntimeError("network down")), \
+             patch("app.pipeline.summarize_stage", summarize), \
+             patch.dict("os.environ", {**self.STAGE_ENV, "WORKER_MODE": "staged", "MAX_RETRY_ATTEMPTS": "3"}):
+            task = await worker_module.start_worker()
+            try:
+                for _ in range(100):
+                    row = await get_video_by_id(video["id"])
+                    if row["status"] == "queued" and row["attempt_count"] == 1:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await worker_module.stop_worker(task)
+
+        assert row["error_message"] == "network down"
+        assert row["next_attempt_at"] is not None
+        summarize.assert_not_called()
+
+    async def test_stop_requeues_claimed_but_unfinished_videos(self, test_db):
+        from app.database import create_video, get_all_videos
+
+        for i in range(8):
+            await create_video(url=f"https://youtu.be/stop{i:07d}", video_id=f"stop{i:07d}")
+        fetching = asyncio.Event()
+
+        async def slow_fetch(job):
+            fetching.set()
+            await asyncio.sleep(60)
+
+        with patch("app.pipeline.fetch_stage", side_effect=slow_fetch), \
+             patch.dict("os.environ", {**self.STAGE_ENV, "WORKER_MODE": "staged", "STAGE_QUEUE_SIZE": "2"}):
+            task = await worker_module.start_worker()
+            await asyncio.wait_for(fetching.wait(), 1)
+            await asyncio.sleep(0.05)
+            # In flight, queued, and one held by the feeder waiting on the full queue.
+            assert sum(v["status"] == "processing" for v in await get_all_videos()) == 4
+            await worker_module.stop_worker(task)
+
+        assert {v["status"] for v in await get_all_videos()} == {"queued"}
+        assert all(v["attempt_count"] == 0 for v in await get_all_videos())
+
+    async def test_unknown_mode_raises(self):
+        with patch.dict("os.environ", {"WORKER_MODE": "turbo"}):
+            with pytest.raises(ValueError, match="WORKER_MODE"):
+                await worker_module.start_worker()
+
+
+class TestStopRequeues:
+    async def test_serial_stop_requeues_video_in_progress(self, test_db):
+        from app.database import create_video, get_video_by_id
+
+        video = await create_video(url="https://youtu.be/intr1234567", video_id="intr1234567")
+        started = asyncio.Event()
+
+        async def slow_process(video):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch("app.pipeline.process_video", side_effect=slow_process), \
+             patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "0", "WORKER_CONCURRENCY": "1"}):
+            task = await worker_module.start_worker()
+            await asyncio.wait_for(started.wait(), 1)
+            await worker_module.stop_worker(task)
+
+        assert (await get_video_by_id(video["id"]))["status"] == "queued"
+
+
+class TestWorkerWakeup:
+    async def test_submission_wakes_idle_worker(self, test_db):
+        from app.database import create_video
+
+        claimed = asyncio.Event()
+
+        async def fake_process(video):
+            claimed.set()
+
+        with patch("app.pipeline.process_video", side_effect=fake_process), \
+             patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "30", "WORKER_CONCURRENCY": "1"}):
+            task = await worker_module.start_worker()
+            try:
+                # Let the worker find the empty queue and go idle.
+                await asyncio.sleep(0.05)
+                await create_video(url="https://youtu.be/wake1234567", video_id="wake1234567")
+                await asyncio.wait_for(claimed.wait(), timeout=1)
+            finally:
+                await worker_module.stop_worker(task)
+
+    async def test_notify_without_running_worker_is_noop(self):
+        worker_module.notify_worker()
+
+
 class TestStartStopWorker:
     async def test_start_worker_returns_task_and_sets_running(self):
         with patch("app.worker._worker_loop", new_callable=AsyncMock) as mock_loop:
@@ -136,7 +459,7 @@ class TestWorkerLoopEdgeCases:
             worker_module._worker_running = False
             raise asyncio.CancelledError()
 
-        with patch("app.database.get_next_queued_video", side_effect=mock_get_next), \
+        with patch("app.database.claim_next_queued_video", side_effect=mock_get_next), \
              patch("app.database.update_video", AsyncMock()), \
              patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "0"}):
             worker_module._worker_running = True
@@ -154,7 +477,7 @@ class TestWorkerLoopEdgeCases:
             return None
 
         with patch("app.pipeline.process_video", AsyncMock()), \
-             patch("app.database.get_next_queued_video", side_effect=mock_get_next), \
+             patch("app.database.claim_next_queued_video", side_effect=mock_get_next), \
              patch("app.database.update_video", AsyncMock()), \
              patch.dict("os.environ", {"WORKER_POLL_INTERVAL": "0"}):
             worker_module._worker_running = True
@@ -1,6 +1,10 @@
+import threading
 from unittest.mock import patch, MagicMock
 
-from app.youtube import validate_youtube_url, extract_video_id, fetch_video_metadata
+import pytest
+
+import app.youtube as youtube_module
+from app.youtube import MetadataCache, validate_youtube_url, extract_video_id, fetch_video_metadata
 
 
 class TestValidateYoutubeUrl:
@@ -58,16 +62,23 @@ class TestExtractVideoId:
         assert extract_video_id("  https://youtu.be/dQw4w9WgXcQ  ") == "dQw4w9WgXcQ"
 
 
+@pytest.fixture(autouse=True)
+def reset_metadata_state():
+    """Start each test with an empty cache and no per-thread extractor."""
+    youtube_module.metadata_cache.clear()
+    youtube_module._thread_local.__dict__.clear()
+    yield
+    youtube_module.metadata_cache.clear()
+    youtube_module._thread_local.__dict__.clear()
+
+
 class TestFetchVideoMetadata:
     @patch("app.youtube.yt_dlp.YoutubeDL")
     def test_successful_metadata_fetch(self, mock_ydl_class):
-        mock_ydl = MagicMock()
-        mock_ydl.extract_info.return_value = {
+        mock_ydl_class.return_value.extract_info.return_value = {
             "title": "Test Video",
             "duration": 300,
         }
-        mock_ydl_class.return_value.__enter__ = MagicMock(return_value=mock_ydl)
-        mock_ydl_class.return_value.__exit__ = MagicMock(return_value=False)
 
         result = fetch_video_metadata("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
         assert result["title"] == "Test Video"
@@ -76,12 +87,77 @@ class TestFetchVideoMetadata:
 
     @patch("app.youtube.yt_dlp.YoutubeDL")
     def test_metadata_fetch_failure(self, mock_ydl_class):
-        mock_ydl_class.return_value.__enter__ = MagicMock(
-            side_effect=Exception("Video unavailable")
-        )
-        mock_ydl_class.return_value.__exit__ = MagicMock(return_value=False)
+        mock_ydl_class.return_value.extract_info.side_effect = Exception("Video unavailable")
 
         result = fetch_video_metadata("https://www.youtube.com/watch?v=invalid123")
         assert result["title"] is None
         assert result["duration"] is None
         assert "error" in result
+
+
+class TestSharedExtractor:
+    @patch("app.youtube.yt_dlp.YoutubeDL")
+    def test_extractor_is_reused_within_a_thread(self, mock_ydl_class):
+        mock_ydl_class.return_value.extract_info.return_value = {"title": "T", "duration": 1}
+
+        fetch_video_metadata("https://youtu.be/aaaaaaaaaaa")
+        fetch_video_metadata("https://youtu.be/bbbbbbbbbbb")
+        assert mock_ydl_class.call_count == 1
+
+    @patch("app.youtube.yt_dlp.YoutubeDL")
+    def test_each_thread_gets_its_own_extractor(self, mock_ydl_class):
+        mock_ydl_class.return_value.extract_info.return_value = {"title": "T", "duration": 1}
+
+        fetch_video_metadata("https://youtu.be/aaaaaaaaaaa")
+        thread = threading.Thread(target=fetch_video_metadata, args=("https://youtu.be/bbbbbbbbbbb",))
+        thread.start()
+        thread.join()
+        assert mock_ydl_class.call_count == 2
+
+
+class TestMetadataCache:
+    @patch("app.youtube.yt_dlp.YoutubeDL")
+    def test_same_id_from_different_urls_hits_cache(self, mock_ydl_class):
+        mock_extract = mock_ydl_class.return_value.extract_info
+        mock_extract.return_value = {"title": "Cached", "duration": 42}
+
+        first = fetch_video_metadata("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        second = fetch_video_metadata("https://youtu.be/dQw4w9WgXcQ")
+
+        assert first == second == {"title": "Cached", "duration": 42}
+        assert mock_extract.call_count == 1
+        assert youtube_module.metadata_cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    @patch("app.youtube.yt_dlp.YoutubeDL")
+    def test_errors_are_not_cached(self, mock_ydl_class):
+        mock_extract = mock_ydl_class.return_value.extract_info
+        mock_extract.side_effect = [Exception("Temporary"), {"title": "OK", "duration": 1}]
+
+        assert "error" in fetch_video_metadata("https://youtu.be/dQw4w9WgXcQ")
+        assert fetch_video_metadata("https://youtu.be/dQw4w9WgXcQ")["title"] == "OK"
+
+    def test_entries_expire_after_ttl(self):
+        cache = MetadataCache(max_entries=10, ttl_seconds=60)
+        with patch("app.youtube.time.monotonic", return_value=1000.0):
+            cache.put("a", {"title": "A"})
+        with patch("app.youtube.time.monotonic", return_value=1059.0):
+            assert cache.get("a") == {"title": "A"}
+        with patch("app.youtube.time.monotonic", return_value=1061.0):
+            assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = MetadataCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", {"title": "A"})
+        cache.put("b", {"title": "B"})
+        cache.get("a")
+        cache.put("c", {"title": "C"})
+        assert cache.get("b") is None
+        assert cache.get("a") == {"title": "A"}
+        assert cache.get("c") == {"title": "C"}
+
+    def test_returned_values_are_copies(self):
+        cache = MetadataCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", {"title": "A"})
+        cache.get("a")["title"] = "changed"
+        assert cache.get("a") == {"title": "A"}
@@ -26,3 +26,7 @@ export async function deleteVideo(id) {
   const { data } = await api.delete(`/videos/${id}`);
   return data;
 }
+
+export function videoEventsUrl() {
+  return `${API_BASE}/events`;
+}
@@ -0,0 +1,37 @@
+import { useEffect, useRef } from 'react'
+import { videoEventsUrl } from '../api'
+
+/**
+ * Subscribe to the backend's Server-Sent Events stream of video status changes.
+ *
+ * onVideo(video) receives the list-view fields of a video whose status changed,
+ * onDeleted({ id }) fires when a video is removed, and onReconnect() fires when
+ * the browser re-establishes a dropped connection (events may have been missed).
+ */
+export default function useVideoEvents({ onVideo, onDeleted, onReconnect }) {
+  const handlers = useRef({ onVideo, onDeleted, onReconnect })
+
+  useEffect(() => {
+    handlers.current = { onVideo, onDeleted, onReconnect }
+  })
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined
+
+    const source = new EventSource(videoEventsUrl())
+    let opened = false
+
+    source.addEventListener('video', (e) => {
+      handlers.current.onVideo?.(JSON.parse(e.data))
+    })
+    source.addEventListener('video_deleted', (e) => {
+      handlers.current.onDeleted?.(JSON.parse(e.data))
+    })
+    source.onopen = () => {
+      if (opened) handlers.current.onReconnect?.()
+      opened = true
+    }
+
+    return () => source.close()
+  }, [])
+}
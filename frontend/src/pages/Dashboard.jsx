@@ -2,10 +2,14 @@ import { useState, useEffect, useCallback } from 'react'
 import SubmitForm from '../components/SubmitForm'
 import VideoList from '../components/VideoList'
 import { getVideos, deleteVideo } from '../api'
+import useVideoEvents from '../hooks/useVideoEvents'
 import styles from './Dashboard.module.css'
 
 const FILTERS = ['all', 'queued', 'processing', 'completed', 'failed']
-const POLL_INTERVAL = 5000
+
+function byNewestFirst(a, b) {
+  return b.created_at.localeCompare(a.created_at)
+}
 
 export default function Dashboard() {
   const [videos, setVideos] = useState([])
@@ -25,10 +29,23 @@ export default function Dashboard() {
 
   useEffect(() => {
     fetchVideos()
-    const interval = setInterval(fetchVideos, POLL_INTERVAL)
-    return () => clearInterval(interval)
   }, [fetchVideos])
 
+  const handleVideoEvent = useCallback((video) => {
+    setVideos(prev => {
+      const others = prev.filter(v => v.id !== video.id)
+      if (filter !== 'all' && video.status !== filter) return others
+      const existing = prev.find(v => v.id === video.id)
+      return [...others, { ...existing, ...video }].sort(byNewestFirst)
+    })
+  }, [filter])
+
+  useVideoEvents({
+    onVideo: handleVideoEvent,
+    onDeleted: ({ id }) => setVideos(prev => prev.filter(v => v.id !== id)),
+    onReconnect: fetchVideos,
+  })
+
   async function handleDelete(id) {
     if (!confirm('Delete this video and all its data?')) return
     try {
@@ -1,4 +1,4 @@
-import { useState, useEffect, useMemo } from 'react'
+import { useState, useEffect, useMemo, useCallback, useRef } from 'react'
 import { useParams, Link } from 'react-router-dom'
 import { getVideo } from '../api'
 import StatusBadge from '../components/StatusBadge'
@@ -6,6 +6,7 @@ import TimestampLink from '../components/TimestampLink'
 import { youtubeUrlAtTime } from '../components/TimestampLink'
 import useYouTubePlayer from '../hooks/useYouTubePlayer'
 import useSpeechSynthesis from '../hooks/useSpeechSynthesis'
+import useVideoEvents from '../hooks/useVideoEvents'
 import styles from './VideoDetail.module.css'
 
 const highlightEnabled = import.meta.env.VITE_ENABLE_READING_HIGHLIGHT === 'true'
@@ -43,25 +44,36 @@ export default function VideoDetail() {
   const [loading, setLoading] = useState(true)
   const [showTranscript, setShowTranscript] = useState(false)
 
-  useEffect(() => {
-    let cancelled = false
-    async function fetch() {
-      try {
-        const data = await getVideo(id)
-        if (!cancelled) setVideo(data)
-      } catch (err) {
-        console.error('Failed to fetch video:', err)
-      } finally {
-        if (!cancelled) setLoading(false)
-      }
+  const latestRequest = useRef(0)
+
+  // Only the newest request for the video on screen may update state, so a
+  // late response can't overwrite a newer one or land after navigating away.
+  const fetchVideo = useCallback(async () => {
+    const request = ++latestRequest.current
+    try {
+      const data = await getVideo(id)
+      if (request === latestRequest.current) setVideo(data)
+    } catch (err) {
+      console.error('Failed to fetch video:', err)
+    } finally {
+      if (request === latestRequest.current) setLoading(false)
     }
-    fetch()
-    const interval = setInterval(fetch, 5000)
+  }, [id])
+
+  useEffect(() => {
+    fetchVideo()
     return () => {
-      cancelled = true
-      clearInterval(interval)
+      latestRequest.current += 1
     }
-  }, [id])
+  }, [fetchVideo])
+
+  // Re-read the full record (transcript, summary) only when this video changes.
+  useVideoEvents({
+    onVideo: (event) => {
+      if (String(event.id) === String(id)) fetchVideo()
+    },
+    onReconnect: fetchVideo,
+  })
 
   const showPlayer = video && video.status === 'completed'
   const { containerRef, isReady, error: playerError, seekTo } = useYouTubePlayer(
@@ -1,11 +1,15 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest'
-import { render, screen, fireEvent } from '@testing-library/react'
+import { render, screen, fireEvent, act } from '@testing-library/react'
 import { MemoryRouter, Route, Routes } from 'react-router-dom'
 
 vi.mock('../api', () => ({
   getVideo: vi.fn(),
 }))
 
+vi.mock('../hooks/useVideoEvents', () => ({
+  default: vi.fn(),
+}))
+
 vi.mock('../hooks/useYouTubePlayer', () => ({
   default: vi.fn(() => ({
     containerRef: { current: null },
@@ -17,6 +21,7 @@ vi.mock('../hooks/useYouTubePlayer', () => ({
 
 import { getVideo } from '../api'
 import useYouTubePlayer from '../hooks/useYouTubePlayer'
+import useVideoEvents from '../hooks/useVideoEvents'
 import VideoDetail from './VideoDetail'
 
 function renderWithRouter(videoId = '1') {
@@ -178,4 +183,42 @@ describe('VideoDetail', () => {
     renderWithRouter('2')
     expect(await screen.findByText('Transcription failed')).toBeInTheDocument()
   })
+
+  it('refetches when a status event arrives for this video', async () => {
+    getVideo.mockResolvedValueOnce(queuedVideo).mockResolvedValueOnce({
+      ...completedVideo,
+      id: 2,
+    })
+    renderWithRouter('2')
+    expect(await screen.findByText('Queued Video')).toBeInTheDocument()
+
+    const { onVideo } = useVideoEvents.mock.calls.at(-1)[0]
+    await act(async () => onVideo({ id: 1, status: 'completed' }))
+    expect(getVideo).toHaveBeenCalledTimes(1)
+
+    await act(async () => onVideo({ id: 2, status: 'completed' }))
+    expect(await screen.findByText('Test Video Title')).toBeInTheDocument()
+    expect(getVideo).toHaveBeenCalledTimes(2)
+  })
+
+  it('ignores a response that arrives after a newer refetch', async () => {
+    let resolveStale
+    getVideo
+      .mockResolvedValueOnce(queuedVideo)
+      .mockReturnValueOnce(new Promise((resolve) => { resolveStale = resolve }))
+      .mockResolvedValueOnce({ ...completedVideo, id: 2 })
+    renderWithRouter('2')
+    expect(await screen.findByText('Queued Video')).toBeInTheDocument()
+
+    const { onVideo, onReconnect } = useVideoEvents.mock.calls.at(-1)[0]
+    await act(async () => {
+      onVideo({ id: 2, status: 'processing' })
+    })
+    await act(async () => onReconnect())
+    expect(await screen.findByText('Test Video Title')).toBeInTheDocument()
+
+    await act(async () => resolveStale(queuedVideo))
+    expect(screen.getByText('Test Video Title')).toBeInTheDocument()
+    expect(screen.queryByText('Queued Video')).not.toBeInTheDocument()
+  })
 })